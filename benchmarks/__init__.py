@@ -0,0 +1,22 @@
+"""
+Benchmarks of the simulation hot path: backtests of reference strategies on several
+route layouts, warm-up injection, loading candles and indicators.
+
+Run from the root of the repository (no database is needed, candles are synthetic):
+
+    python -m benchmarks
+    python -m benchmarks --days 30 --repeat 5 -k backtest
+    python -m benchmarks --output benchmarks/results/0.28.1.json
+    python -m benchmarks --compare benchmarks/results/0.28.1.json --max-regression 10
+
+Results are written as JSON, so that they can be compared across releases
+(on the same machine) with --compare.
+
+The startup time of the CLI and of importing the indicators is benchmarked separately:
+
+    python -m benchmarks.startup
+
+and so are the writes of candles to the database (which it needs):
+
+    python -m benchmarks.candle_writes
+"""
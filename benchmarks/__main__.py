@@ -0,0 +1,93 @@
+import json
+import os
+import platform
+import sys
+
+import click
+
+from jesse.config import config
+
+# the same as the unit tests: no database connection, and the reference strategies
+# are loaded from jesse.strategies
+config['app']['is_unit_testing'] = True
+
+import numpy as np  # noqa: E402
+
+import jesse.helpers as jh  # noqa: E402
+from jesse.services import table  # noqa: E402
+from jesse.version import __version__  # noqa: E402
+from .suites import BENCHMARKS  # noqa: E402
+
+
+@click.command()
+@click.option('--days', default=60, show_default=True, help='Days of 1m candles each benchmark runs on.')
+@click.option('--repeat', default=3, show_default=True, help='Runs of each benchmark; the fastest one is kept.')
+@click.option('-k', 'keyword', default=None, help='Only runs the benchmarks whose name includes this.')
+@click.option('--output', default=None, help='Path of the JSON results file.  [default: benchmarks/results/<version>.json]')
+@click.option('--compare', default=None, help='Path of a previous JSON results file to compare with.')
+@click.option('--max-regression', default=None, type=float,
+              help='Exits with an error if any benchmark got slower than this percentage compared to --compare.')
+def main(days: int, repeat: int, keyword: str, output: str, compare: str, max_regression: float) -> None:
+    """
+    benchmarks the simulation hot path
+    """
+    names = [name for name in BENCHMARKS if keyword is None or keyword in name]
+    results = {}
+
+    for name in names:
+        seconds = []
+        for _ in range(repeat):
+            count, s = BENCHMARKS[name](days)
+            seconds.append(s)
+        results[name] = {
+            'candles': count,
+            'seconds': round(min(seconds), 6),
+            'candles_per_second': round(count / min(seconds), 1),
+        }
+        print(f"{name}: {results[name]['candles_per_second']:,.0f} candles/second")
+
+    data = {
+        'version': __version__,
+        'created_at': jh.timestamp_to_time(jh.now_to_timestamp()),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)',
+        'days': days,
+        'repeat': repeat,
+        'results': results,
+    }
+
+    output = output or f'benchmarks/results/{__version__}.json'
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f'\nResults saved to {output}')
+
+    if compare is None:
+        return
+
+    with open(compare) as f:
+        previous = json.load(f)
+
+    rows = [['Benchmark', f"Before: {previous['version']} (candles/s)", f'After: {__version__} (candles/s)', 'Change']]
+    regressions = []
+    for name in names:
+        if name not in previous['results']:
+            continue
+        before = previous['results'][name]['candles_per_second']
+        after = results[name]['candles_per_second']
+        change = (after - before) / before * 100
+        rows.append([name, f'{before:,.0f}', f'{after:,.0f}', f'{change:+.1f}%'])
+        if max_regression is not None and change < -max_regression:
+            regressions.append(name)
+
+    print('\n')
+    table.multi_value(rows, with_headers=True, alignments=('left', 'right', 'right', 'right'))
+
+    if regressions:
+        print(jh.color(f'\nSlower than {max_regression}%: {", ".join(regressions)}', 'red'))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmarks storing candles in the database: insert_many of row dicts (how candles used to
+be stored, one chunk of the importer at a time) against COPY through a staging table.
+
+It needs the database of the config (or of the ENV_DATABASES_POSTGRES_* environment
+variables). The candles are stored under a throwaway exchange which is deleted afterwards.
+
+    python -m benchmarks.candle_writes
+    python -m benchmarks.candle_writes --rows 5000000 --chunk 1000
+"""
+import time
+
+import click
+import numpy as np
+
+import jesse.helpers as jh
+
+EXCHANGE = 'Benchmark'
+
+
+def fake_candles(count: int, start_timestamp: int = 1_577_836_800_000) -> np.ndarray:
+    candles = np.empty((count, 6))
+    candles[:, 0] = start_timestamp + np.arange(count, dtype=np.int64) * 60_000
+    prices = 100 + np.cumsum(np.random.normal(0, 0.1, count))
+    candles[:, 1] = prices
+    candles[:, 2] = prices + 0.05
+    candles[:, 3] = prices + 0.1
+    candles[:, 4] = prices - 0.1
+    candles[:, 5] = np.random.uniform(0, 10, count)
+    return candles
+
+
+def as_dicts(candles: np.ndarray, symbol: str) -> list:
+    return [{
+        'id': jh.generate_unique_id(),
+        'symbol': symbol,
+        'exchange': EXCHANGE,
+        'timestamp': c[0],
+        'open': c[1],
+        'close': c[2],
+        'high': c[3],
+        'low': c[4],
+        'volume': c[5]
+    } for c in candles]
+
+
+@click.command()
+@click.option('--rows', default=1_000_000, show_default=True, help='Candles to store with each method.')
+@click.option('--chunk', default=1000, show_default=True, help='Candles per insert_many (the size of a fetched chunk).')
+def main(rows: int, chunk: int) -> None:
+    from jesse.models import Candle
+    from jesse.services import candle_schema
+    from jesse.services.db import db, store_candles, store_candles_array
+
+    candles = fake_candles(rows)
+
+    def insert_many(symbol: str) -> None:
+        for start in range(0, rows, chunk):
+            Candle.insert_many(as_dicts(candles[start:start + chunk], symbol)).on_conflict_ignore().execute()
+
+    def copy_dicts(symbol: str) -> None:
+        for start in range(0, rows, chunk):
+            store_candles(as_dicts(candles[start:start + chunk], symbol))
+
+    methods = {
+        f'insert_many of dicts, {chunk} per query': insert_many,
+        f'store_candles (COPY) of dicts, {chunk} per call': copy_dicts,
+        'store_candles_array (COPY) of the whole array': lambda symbol: store_candles_array(candles, EXCHANGE, symbol),
+    }
+    # "candle" is a view in the compact layout, which can't be inserted into
+    if candle_schema.is_compact():
+        del methods[f'insert_many of dicts, {chunk} per query']
+
+    try:
+        for i, (name, store) in enumerate(methods.items()):
+            symbol = f'BENCH{i}-USD'
+            begin = time.perf_counter()
+            store(symbol)
+            seconds = time.perf_counter() - begin
+            stored = Candle.select().where(Candle.exchange == EXCHANGE, Candle.symbol == symbol).count()
+            print(f'{name}: {seconds:.2f} seconds, {int(rows / seconds):,} candles/s ({stored:,} stored)')
+    finally:
+        if candle_schema.is_compact():
+            db.execute_sql('DELETE FROM candle_compact WHERE market_id IN (SELECT id FROM market WHERE exchange = %s)',
+                           (EXCHANGE,))
+            db.execute_sql('DELETE FROM market WHERE exchange = %s', (EXCHANGE,))
+            candle_schema._market_ids.clear()
+        else:
+            Candle.delete().where(Candle.exchange == EXCHANGE).execute()
+
+
+if __name__ == '__main__':
+    main()
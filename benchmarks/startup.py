@@ -0,0 +1,61 @@
+"""
+Benchmarks the startup time of the CLI and of importing the indicators, which every command
+and every optimize worker pays for. Each one runs in a new python process.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --importtime 15
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+STARTUPS = {
+    'import jesse.indicators': ['-c', 'import jesse.indicators'],
+    'import jesse.indicators + ema': ['-c', 'import jesse.indicators as ta; ta.ema'],
+    'import all the indicators': ['-c', 'from jesse.indicators import *'],
+    'jesse --help': ['-c', 'from jesse import cli; cli()', '--help'],
+    'jesse backtest --help': ['-c', 'from jesse import cli; cli()', 'backtest', '--help'],
+}
+
+
+def seconds_of(args: list) -> float:
+    begin = time.perf_counter()
+    subprocess.run([sys.executable] + args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - begin
+
+
+def slowest_imports(args: list, count: int) -> list:
+    """
+    returns the modules that took the longest to import (including their own imports), by -X importtime
+    """
+    res = subprocess.run([sys.executable, '-X', 'importtime'] + args, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in res.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+@click.command()
+@click.option('--repeat', default=5, show_default=True, help='Runs of each command; the median is reported.')
+@click.option('--importtime', default=0, show_default=True,
+              help='Also lists this many of the slowest imports of "import jesse.indicators".')
+def main(repeat: int, importtime: int) -> None:
+    for name, args in STARTUPS.items():
+        seconds = [seconds_of(args) for _ in range(repeat)]
+        print(f'{name}: {statistics.median(seconds):.3f} seconds')
+
+    if importtime:
+        print('\nSlowest imports of "import jesse.indicators" (cumulative):')
+        for microseconds, module in slowest_imports(STARTUPS['import jesse.indicators'], importtime):
+            print(f'{microseconds / 1_000_000:.3f}s {module}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Every benchmark accepts the number of days of 1m candles to run on, and returns how many
+candles it processed and how many seconds that took (setup excluded).
+"""
+import tempfile
+from functools import partial
+from typing import Callable, Dict, Tuple
+
+import jesse.indicators as ta
+import jesse.indicators.streaming as streaming
+import jesse.services.required_candles as required_candles
+from jesse.config import config
+from jesse.enums import exchanges, timeframes
+from jesse.modes import backtest_mode
+from jesse.services.cache import Cache
+from jesse.services.candle_archive import CandleArchive
+from jesse.store import store
+from .utils import candles_of_considering_candles, fake_candles, set_up, timed
+
+# minutes of warm-up candles injected before each backtest
+WARMUP_MINUTES = 14 * 1440
+
+
+def backtest(days: int, routes: list, extra_candles: list = None, engine: str = 'skip') -> Tuple[int, float]:
+    set_up(routes, extra_candles, engine)
+    all_candles = candles_of_considering_candles(WARMUP_MINUTES + days * 1440)
+
+    store.candles.init_storage(5000)
+    candles = {}
+    for key, c in all_candles.items():
+        required_candles.inject_required_candles_to_store(c['candles'][:WARMUP_MINUTES], c['exchange'], c['symbol'])
+        candles[key] = {**c, 'candles': c['candles'][WARMUP_MINUTES:]}
+
+    seconds, _ = timed(backtest_mode.simulator, candles)
+    return days * 1440 * len(candles), seconds
+
+
+def warmup_injection(days: int) -> Tuple[int, float]:
+    set_up([(exchanges.SANDBOX, 'BTC-USDT', timeframes.HOUR_4, 'Benchmark01')],
+           [(exchanges.SANDBOX, 'BTC-USDT', tf) for tf in [timeframes.MINUTE_5, timeframes.MINUTE_15, timeframes.HOUR_1]])
+    candles = fake_candles(days * 1440)
+    store.candles.init_storage(5000)
+
+    seconds, _ = timed(required_candles.inject_required_candles_to_store, candles, exchanges.SANDBOX, 'BTC-USDT')
+    return len(candles), seconds
+
+
+def load_candles_from_archive(days: int) -> Tuple[int, float]:
+    candles = fake_candles(days * 1440)
+    with tempfile.TemporaryDirectory() as path:
+        archive = CandleArchive(f'{path}/')
+        archive.store(candles, exchanges.SANDBOX, 'BTC-USDT')
+
+        seconds, _ = timed(archive.load, exchanges.SANDBOX, 'BTC-USDT', candles[0][0], candles[-1][0])
+    return len(candles), seconds
+
+
+def load_candles_from_cache(days: int) -> Tuple[int, float]:
+    candles = fake_candles(days * 1440)
+    with tempfile.TemporaryDirectory() as path:
+        config['env']['caching']['driver'] = 'numpy'
+        cache = Cache(f'{path}/')
+        cache.set_candles(exchanges.SANDBOX, 'BTC-USDT', candles)
+
+        seconds, _ = timed(cache.get_candles, exchanges.SANDBOX, 'BTC-USDT', candles[0][0], candles[-1][0])
+    return len(candles), seconds
+
+
+def indicator_sequential(days: int, indicator: Callable) -> Tuple[int, float]:
+    candles = fake_candles(days * 1440)
+    seconds, _ = timed(indicator, candles, sequential=True)
+    return len(candles), seconds
+
+
+def indicator_per_candle(days: int, indicator: Callable) -> Tuple[int, float]:
+    """
+    the way strategies use indicators: the latest value, once per candle (of 240 candles)
+    """
+    count = min(days * 1440, 20_000)
+    candles = fake_candles(count + 240)
+
+    def run():
+        for i in range(count):
+            indicator(candles[i:i + 240])
+
+    seconds, _ = timed(run)
+    return count, seconds
+
+
+def indicator_streaming(days: int, indicator: Callable[[], streaming.StreamingIndicator]) -> Tuple[int, float]:
+    """
+    the same as indicator_per_candle, using the incremental version of the indicator
+    """
+    count = min(days * 1440, 20_000)
+    candles = fake_candles(count + 240)
+    stream = streaming.Stream(indicator(), '1m')
+
+    def run():
+        for i in range(count):
+            stream.read(candles[i:i + 240])
+
+    seconds, _ = timed(run)
+    return count, seconds
+
+
+BENCHMARKS: Dict[str, Callable[[int], Tuple[int, float]]] = {
+    'backtest/simple/1-route-5m': partial(
+        backtest, routes=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, 'Benchmark01')]
+    ),
+    'backtest/sma/1-route-1h-extra-5m': partial(
+        backtest, routes=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.HOUR_1, 'Benchmark02')],
+        extra_candles=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5)]
+    ),
+    'backtest/indicators/3-routes-15m': partial(
+        backtest, routes=[(exchanges.SANDBOX, symbol, timeframes.MINUTE_15, 'Benchmark03')
+                          for symbol in ['BTC-USDT', 'ETH-USDT', 'XRP-USDT']]
+    ),
+    'backtest/sma/1-route-4h-extra-1m': partial(
+        backtest, routes=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.HOUR_4, 'Benchmark02')],
+        extra_candles=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1)]
+    ),
+    'backtest/sma/1-route-4h-extra-1m/event-engine': partial(
+        backtest, routes=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.HOUR_4, 'Benchmark02')],
+        extra_candles=[(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1)], engine='event'
+    ),
+    'warmup-injection': warmup_injection,
+    'load-candles/archive': load_candles_from_archive,
+    'load-candles/cache': load_candles_from_cache,
+}
+
+for _name, _indicator in {
+    'sma': partial(ta.sma, period=20),
+    'ema': partial(ta.ema, period=20),
+    'rsi': partial(ta.rsi, period=14),
+    'atr': partial(ta.atr, period=14),
+    'bollinger_bands': partial(ta.bollinger_bands, period=20),
+    'macd': ta.macd,
+}.items():
+    BENCHMARKS[f'indicators/{_name}/sequential'] = partial(indicator_sequential, indicator=_indicator)
+    BENCHMARKS[f'indicators/{_name}/per-candle'] = partial(indicator_per_candle, indicator=_indicator)
+
+for _name, _indicator in {
+    'ema': partial(streaming.EMA, period=20),
+    'rsi': partial(streaming.RSI, period=14),
+    'atr': partial(streaming.ATR, period=14),
+    'macd': streaming.MACD,
+}.items():
+    BENCHMARKS[f'indicators/{_name}/streaming'] = partial(indicator_streaming, indicator=_indicator)
@@ -0,0 +1,55 @@
+import contextlib
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+import jesse.helpers as jh
+from jesse.config import config, reset_config
+from jesse.enums import exchanges
+from jesse.factories import fake_range_candle_from_range_prices
+from jesse.routes import router
+from jesse.store import store
+
+
+def fake_candles(minutes: int, seed: int = 0) -> np.ndarray:
+    """
+    1m candles of a (reproducible) random walk starting at 100
+    """
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, minutes)))
+    return fake_range_candle_from_range_prices(prices.round(4).tolist())
+
+
+def set_up(routes: List[tuple], extra_candles: List[tuple] = None, engine: str = 'skip') -> None:
+    reset_config()
+    config['env']['exchanges'][exchanges.SANDBOX]['type'] = 'futures'
+    config['env']['backtest']['engine'] = engine
+    router.set_routes(routes)
+    router.set_extra_candles(extra_candles or [])
+    store.reset(True)
+
+
+def candles_of_considering_candles(minutes: int) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    candles of all the considering exchange-symbol pairs, in the format the simulator expects
+    """
+    return {
+        jh.key(exchange, symbol): {
+            'exchange': exchange,
+            'symbol': symbol,
+            'candles': fake_candles(minutes, seed)
+        }
+        for seed, (exchange, symbol) in enumerate(sorted(config['app']['considering_candles']))
+    }
+
+
+def timed(func: Callable, *args, **kwargs) -> Tuple[float, object]:
+    """
+    returns the seconds it took to call func (with its output silenced), and what it returned
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        begin = time.perf_counter()
+        res = func(*args, **kwargs)
+        return time.perf_counter() - begin, res
@@ -257,6 +257,78 @@ def import_candles(exchange: str, symbol: str, start_date: str, skip_confirmatio
     db.close_connection()
 
 
+@cli.command()
+@click.argument('exchange', required=True, type=str)
+@click.argument('symbols', nargs=-1, type=str)
+@click.option('--gaps/--no-gaps', default=False, help='Lists the missing ranges of candles of each symbol too.')
+def candles_coverage(exchange: str, symbols: tuple, gaps: bool) -> None:
+    """
+    reports the stored 1m candles of symbols (all the stored ones if none is entered) and the gaps between them
+    """
+    validate_cwd()
+    from jesse.config import config
+    config['app']['trading_mode'] = 'candles-coverage'
+
+    register_custom_exception_handler()
+
+    from jesse.services import db
+    from jesse.services import candle_coverage
+
+    candle_coverage.print_report(exchange, [s.upper() for s in symbols], gaps)
+
+    db.close_connection()
+
+
+@cli.command()
+@click.option('--partition/--no-partition', default=False, help='Partitions the candles by month.')
+@click.option('--drop-legacy/--no-drop-legacy', default=False,
+              help='Drops the previous table of candles (which is kept as "candle_legacy" otherwise).')
+def migrate_candles(partition: bool, drop_legacy: bool) -> None:
+    """
+    moves the stored candles to the compact layout (a small market id and the timestamp as primary key)
+    """
+    validate_cwd()
+    from jesse.config import config
+    config['app']['trading_mode'] = 'migrate-candles'
+
+    register_custom_exception_handler()
+
+    from jesse.services import db
+    from jesse.services import candle_schema
+
+    count = candle_schema.migrate(partition, drop_legacy)
+    print(f'Moved {count} candles to the compact layout')
+
+    db.close_connection()
+
+
+@cli.command()
+@click.argument('exchange', required=True, type=str)
+@click.argument('symbol', required=True, type=str)
+@click.argument('start_date', required=True, type=str)
+@click.argument('finish_date', required=False, type=str)
+def archive_candles(exchange: str, symbol: str, start_date: str, finish_date: str) -> None:
+    """
+    builds/refreshes the memory-mapped candle archive from the database. Enter in "YYYY-MM-DD" "YYYY-MM-DD"
+    """
+    validate_cwd()
+    from jesse.config import config
+    config['app']['trading_mode'] = 'archive-candles'
+
+    register_custom_exception_handler()
+
+    from jesse.services import db
+    from jesse.services.candle_archive import archive
+
+    start_timestamp = jh.date_to_timestamp(start_date)
+    finish_timestamp = jh.today_to_timestamp() if finish_date is None else jh.date_to_timestamp(finish_date)
+
+    count = archive.build(exchange, symbol.upper(), start_timestamp, finish_timestamp - 60_000)
+    print(f'Archived {count} candles of {exchange} {symbol.upper()}')
+
+    db.close_connection()
+
+
 @cli.command()
 @click.argument('start_date', required=True, type=str)
 @click.argument('finish_date', required=True, type=str)
@@ -274,8 +346,14 @@ def import_candles(exchange: str, symbol: str, start_date: str, skip_confirmatio
               help="Generates an output that can be copy-and-pasted into tradingview.com's pine-editor too see the trades in their charts.")
 @click.option('--full-reports/--no-full-reports', default=False,
               help="Generates QuantStats' HTML output with metrics reports like Sharpe ratio, Win rate, Volatility, etc., and batch plotting for visualizing performance, drawdowns, rolling statistics, monthly returns, etc.")
+@click.option('--shards', default=1, show_default=True,
+              help='Splits routes into this many groups and simulates each group in a separate process. Only use it for routes that are independent of each other (no shared_vars).')
+@click.option('--profile/--no-profile', default=False,
+              help='Prints how the simulation time was spent between strategy code, indicators, the candles store, order execution, etc.')
+@click.option('--profile-output', default=None, type=str,
+              help='Also saves the profile as collapsed stacks (readable by flamegraph.pl, speedscope, etc.) into this file.')
 def backtest(start_date: str, finish_date: str, debug: bool, csv: bool, json: bool, fee: bool, chart: bool,
-             tradingview: bool, full_reports: bool) -> None:
+             tradingview: bool, full_reports: bool, shards: int, profile: bool, profile_output: str) -> None:
     """
     backtest mode. Enter in "YYYY-MM-DD" "YYYY-MM-DD"
     """
@@ -299,8 +377,12 @@ def backtest(start_date: str, finish_date: str, debug: bool, csv: bool, json: bo
             config['env']['exchanges'][e]['fee'] = 0
             get_exchange(e).fee = 0
 
+    if (profile or profile_output) and shards > 1:
+        raise click.UsageError('--profile cannot be used with --shards because shards are simulated in other processes.')
+
     backtest_mode.run(start_date, finish_date, chart=chart, tradingview=tradingview, csv=csv,
-                      json=json, full_reports=full_reports)
+                      json=json, full_reports=full_reports, shards=shards,
+                      profile=profile or profile_output is not None, profile_output=profile_output)
 
     db.close_connection()
 
@@ -10,7 +10,17 @@ config = {
         },
 
         'caching': {
-            'driver': 'pickle'
+            # accepted values are: 'numpy' and None
+            'driver': 'numpy',
+            # least recently used candle ranges are evicted once the cache grows bigger than this
+            'max_size_mb': 2048,
+        },
+
+        'import_candles': {
+            # concurrent requests (per import); they still don't exceed the rate limit of the exchange
+            'max_workers': 8,
+            # fetched chunks of candles waiting to be stored, beyond which fetching pauses
+            'write_queue_size': 10,
         },
 
         'logging': {
@@ -215,6 +225,19 @@ config = {
             'total_losing_trades': False,
         },
 
+        # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+        # Backtest mode
+        # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+        #
+        # Below configurations are related to the backtest simulation (also used by the optimize mode)
+        # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+        'backtest': {
+            # accepted values are: 'skip' and 'event'. The 'event' engine jumps straight to the next
+            # candle that touches an order (or a liquidation price) or is due for a strategy execution
+            # instead of stepping through the greatest common divisor of the considering timeframes.
+            'engine': 'skip',
+        },
+
         # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
         # Optimize mode
         # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
@@ -224,6 +247,20 @@ config = {
         'optimization': {
             # sharpe, calmar, sortino, omega, serenity, smart sharpe, smart sortino
             'ratio': 'sharpe',
+            # rules for giving up on the training backtest of hopeless DNAs before it's
+            # finished (checked once a day). Terminated DNAs get the minimum fitness score.
+            # Set to None to disable.
+            'early_termination': {
+                # drawdown (in percentage) of the portfolio balance, e.g. 50
+                'max_drawdown': None,
+                # portfolio balance, e.g. 5000
+                'min_balance': None,
+                # portion of candles after which a DNA with no trades is given up on, e.g. 0.3
+                'no_trades_after': None,
+            },
+            # megabytes of precomputed indicator values that each process keeps
+            # in memory for the next backtests (DNAs) on the same candles
+            'indicator_cache_size': 512,
         },
 
         # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
@@ -235,6 +272,9 @@ config = {
         'data': {
             # The minimum number of warmup candles that is loaded before each session.
             'warmup_candles_num': 240,
+            # Load backtest candles from the memory-mapped archive (built via "jesse archive-candles")
+            # instead of the database.
+            'candles_archive': False,
         }
     },
 
@@ -68,3 +68,11 @@ class NegativeBalance(Exception):
 
 class InsufficientMargin(Exception):
     pass
+
+
+class EarlyTermination(Exception):
+    pass
+
+
+class LookAheadBias(Exception):
+    pass
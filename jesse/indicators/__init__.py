@@ -1,176 +1,219 @@
-from .acosc import acosc
-from .ad import ad
-from .adosc import adosc
-from .adx import adx
-from .adxr import adxr
-from .alligator import alligator
-from .alma import alma
-from .ao import ao
-from .apo import apo
-from .aroon import aroon
-from .aroonosc import aroonosc
-from .atr import atr
-from .avgprice import avgprice
-from .bandpass import bandpass
-from .beta import beta
-from .bollinger_bands import bollinger_bands
-from .bollinger_bands_width import bollinger_bands_width
-from .bop import bop
-from .cc import cc
-from .cci import cci
-from .cfo import cfo
-from .cg import cg
-from .chande import chande
-from .chop import chop
-from .cksp import cksp
-from .cmo import cmo
-from .correl import correl
-from .correlation_cycle import correlation_cycle
-from .cvi import cvi
-from .cwma import cwma
-from .damiani_volatmeter import damiani_volatmeter
-from .dec_osc import dec_osc
-from .decycler import decycler
-from .dema import dema
-from .devstop import devstop
-from .di import di
-from .dm import dm
-from .donchian import donchian
-from .dpo import dpo
-from .dti import dti
-from .dx import dx
-from .edcf import edcf
-from .efi import efi
-from .ema import ema
-from .emd import emd
-from .emv import emv
-from .epma import epma
-from .er import er
-from .eri import eri
-from .fisher import fisher
-from .fosc import fosc
-from .frama import frama
-from .fwma import fwma
-from .gatorosc import gatorosc
-from .gauss import gauss
-from .high_pass import high_pass
-from .high_pass_2_pole import high_pass_2_pole
-from .hma import hma
-from .ht_dcperiod import ht_dcperiod
-from .ht_dcphase import ht_dcphase
-from .ht_phasor import ht_phasor
-from .ht_sine import ht_sine
-from .ht_trendline import ht_trendline
-from .ht_trendmode import ht_trendmode
-from .hurst_exponent import hurst_exponent
-from .hwma import hwma
-from .ichimoku_cloud import ichimoku_cloud
-from .ichimoku_cloud_seq import ichimoku_cloud_seq
-from .ift_rsi import ift_rsi
-from .itrend import itrend
-from .jma import jma
-from .jsa import jsa
-from .kama import kama
-from .kaufmanstop import kaufmanstop
-from .kdj import kdj
-from .keltner import keltner
-from .kst import kst
-from .kurtosis import kurtosis
-from .kvo import kvo
-from .linearreg import linearreg
-from .linearreg_angle import linearreg_angle
-from .linearreg_intercept import linearreg_intercept
-from .linearreg_slope import linearreg_slope
-from .lrsi import lrsi
-from .ma import ma
-from .maaq import maaq
-from .mab import mab
-from .macd import macd
-from .macdext import macdext
-from .mama import mama
-from .marketfi import marketfi
-from .mass import mass
-from .mcginley_dynamic import mcginley_dynamic
-from .mean_ad import mean_ad
-from .median_ad import median_ad
-from .medprice import medprice
-from .mfi import mfi
-from .midpoint import midpoint
-from .midprice import midprice
-from .minmax import minmax
-from .mom import mom
-from .msw import msw
-from .mwdx import mwdx
-from .natr import natr
-from .nma import nma
-from .nvi import nvi
-from .obv import obv
-from .pattern_recognition import pattern_recognition
-from .pfe import pfe
-from .pivot import pivot
-from .pma import pma
-from .ppo import ppo
-from .pvi import pvi
-from .pwma import pwma
-from .qstick import qstick
-from .reflex import reflex
-from .rma import rma
-from .roc import roc
-from .rocp import rocp
-from .rocr import rocr
-from .rocr100 import rocr100
-from .roofing import roofing
-from .rsi import rsi
-from .rsmk import rsmk
-from .rsx import rsx
-from .rvi import rvi
-from .safezonestop import safezonestop
-from .sar import sar
-from .sarext import sarext
-from .sinwma import sinwma
-from .skew import skew
-from .sma import sma
-from .smma import smma
-from .sqwma import sqwma
-from .srsi import srsi
-from .srwma import srwma
-from .stc import stc
-from .stddev import stddev
-from .stochastic import stoch
-from .stochf import stochf
-from .supersmoother import supersmoother
-from .supersmoother_3_pole import supersmoother_3_pole
-from .supertrend import supertrend
-from .swma import swma
-from .t3 import t3
-from .tema import tema
-from .trange import trange
-from .trendflex import trendflex
-from .trima import trima
-from .trix import trix
-from .tsf import tsf
-from .tsi import tsi
-from .ttm_trend import ttm_trend
-from .typprice import typprice
-from .ui import ui
-from .ultosc import ultosc
-from .var import var
-from .vi import vi
-from .vidya import vidya
-from .vlma import vlma
-from .vosc import vosc
-from .voss import voss
-from .vpci import vpci
-from .vpt import vpt
-from .vpwma import vpwma
-from .vwap import vwap
-from .vwma import vwma
-from .vwmacd import vwmacd
-from .wad import wad
-from .wclprice import wclprice
-from .wilders import wilders
-from .willr import willr
-from .wma import wma
-from .wt import wt
-from .zlema import zlema
-from .zscore import zscore
+"""
+The indicators are imported lazily (PEP 562): accessing one of them, e.g. jesse.indicators.ema,
+imports its module only. Importing all of them at once would pull in talib, scipy, numba, etc.
+and compile numba kernels, which every command and every optimize worker would pay for.
+"""
+import importlib
+import sys
+from types import ModuleType
+
+from .cache import cache as _cache
+
+# the name of each indicator and the module it is defined in
+_INDICATORS = {
+    'acosc': 'acosc',
+    'ad': 'ad',
+    'adosc': 'adosc',
+    'adx': 'adx',
+    'adxr': 'adxr',
+    'alligator': 'alligator',
+    'alma': 'alma',
+    'ao': 'ao',
+    'apo': 'apo',
+    'aroon': 'aroon',
+    'aroonosc': 'aroonosc',
+    'atr': 'atr',
+    'avgprice': 'avgprice',
+    'bandpass': 'bandpass',
+    'beta': 'beta',
+    'bollinger_bands': 'bollinger_bands',
+    'bollinger_bands_width': 'bollinger_bands_width',
+    'bop': 'bop',
+    'cc': 'cc',
+    'cci': 'cci',
+    'cfo': 'cfo',
+    'cg': 'cg',
+    'chande': 'chande',
+    'chop': 'chop',
+    'cksp': 'cksp',
+    'cmo': 'cmo',
+    'correl': 'correl',
+    'correlation_cycle': 'correlation_cycle',
+    'cvi': 'cvi',
+    'cwma': 'cwma',
+    'damiani_volatmeter': 'damiani_volatmeter',
+    'dec_osc': 'dec_osc',
+    'decycler': 'decycler',
+    'dema': 'dema',
+    'devstop': 'devstop',
+    'di': 'di',
+    'dm': 'dm',
+    'donchian': 'donchian',
+    'dpo': 'dpo',
+    'dti': 'dti',
+    'dx': 'dx',
+    'edcf': 'edcf',
+    'efi': 'efi',
+    'ema': 'ema',
+    'emd': 'emd',
+    'emv': 'emv',
+    'epma': 'epma',
+    'er': 'er',
+    'eri': 'eri',
+    'fisher': 'fisher',
+    'fosc': 'fosc',
+    'frama': 'frama',
+    'fwma': 'fwma',
+    'gatorosc': 'gatorosc',
+    'gauss': 'gauss',
+    'high_pass': 'high_pass',
+    'high_pass_2_pole': 'high_pass_2_pole',
+    'hma': 'hma',
+    'ht_dcperiod': 'ht_dcperiod',
+    'ht_dcphase': 'ht_dcphase',
+    'ht_phasor': 'ht_phasor',
+    'ht_sine': 'ht_sine',
+    'ht_trendline': 'ht_trendline',
+    'ht_trendmode': 'ht_trendmode',
+    'hurst_exponent': 'hurst_exponent',
+    'hwma': 'hwma',
+    'ichimoku_cloud': 'ichimoku_cloud',
+    'ichimoku_cloud_seq': 'ichimoku_cloud_seq',
+    'ift_rsi': 'ift_rsi',
+    'itrend': 'itrend',
+    'jma': 'jma',
+    'jsa': 'jsa',
+    'kama': 'kama',
+    'kaufmanstop': 'kaufmanstop',
+    'kdj': 'kdj',
+    'keltner': 'keltner',
+    'kst': 'kst',
+    'kurtosis': 'kurtosis',
+    'kvo': 'kvo',
+    'linearreg': 'linearreg',
+    'linearreg_angle': 'linearreg_angle',
+    'linearreg_intercept': 'linearreg_intercept',
+    'linearreg_slope': 'linearreg_slope',
+    'lrsi': 'lrsi',
+    'ma': 'ma',
+    'maaq': 'maaq',
+    'mab': 'mab',
+    'macd': 'macd',
+    'macdext': 'macdext',
+    'mama': 'mama',
+    'marketfi': 'marketfi',
+    'mass': 'mass',
+    'mcginley_dynamic': 'mcginley_dynamic',
+    'mean_ad': 'mean_ad',
+    'median_ad': 'median_ad',
+    'medprice': 'medprice',
+    'mfi': 'mfi',
+    'midpoint': 'midpoint',
+    'midprice': 'midprice',
+    'minmax': 'minmax',
+    'mom': 'mom',
+    'msw': 'msw',
+    'mwdx': 'mwdx',
+    'natr': 'natr',
+    'nma': 'nma',
+    'nvi': 'nvi',
+    'obv': 'obv',
+    'pattern_recognition': 'pattern_recognition',
+    'pfe': 'pfe',
+    'pivot': 'pivot',
+    'pma': 'pma',
+    'ppo': 'ppo',
+    'pvi': 'pvi',
+    'pwma': 'pwma',
+    'qstick': 'qstick',
+    'reflex': 'reflex',
+    'rma': 'rma',
+    'roc': 'roc',
+    'rocp': 'rocp',
+    'rocr': 'rocr',
+    'rocr100': 'rocr100',
+    'roofing': 'roofing',
+    'rsi': 'rsi',
+    'rsmk': 'rsmk',
+    'rsx': 'rsx',
+    'rvi': 'rvi',
+    'safezonestop': 'safezonestop',
+    'sar': 'sar',
+    'sarext': 'sarext',
+    'sinwma': 'sinwma',
+    'skew': 'skew',
+    'sma': 'sma',
+    'smma': 'smma',
+    'sqwma': 'sqwma',
+    'srsi': 'srsi',
+    'srwma': 'srwma',
+    'stc': 'stc',
+    'stddev': 'stddev',
+    'stoch': 'stochastic',
+    'stochf': 'stochf',
+    'supersmoother': 'supersmoother',
+    'supersmoother_3_pole': 'supersmoother_3_pole',
+    'supertrend': 'supertrend',
+    'swma': 'swma',
+    't3': 't3',
+    'tema': 'tema',
+    'trange': 'trange',
+    'trendflex': 'trendflex',
+    'trima': 'trima',
+    'trix': 'trix',
+    'tsf': 'tsf',
+    'tsi': 'tsi',
+    'ttm_trend': 'ttm_trend',
+    'typprice': 'typprice',
+    'ui': 'ui',
+    'ultosc': 'ultosc',
+    'var': 'var',
+    'vi': 'vi',
+    'vidya': 'vidya',
+    'vlma': 'vlma',
+    'vosc': 'vosc',
+    'voss': 'voss',
+    'vpci': 'vpci',
+    'vpt': 'vpt',
+    'vpwma': 'vpwma',
+    'vwap': 'vwap',
+    'vwma': 'vwma',
+    'vwmacd': 'vwmacd',
+    'wad': 'wad',
+    'wclprice': 'wclprice',
+    'wilders': 'wilders',
+    'willr': 'willr',
+    'wma': 'wma',
+    'wt': 'wt',
+    'zlema': 'zlema',
+    'zscore': 'zscore',
+}
+
+__all__ = list(_INDICATORS)
+
+
+def __getattr__(name: str):
+    module = _INDICATORS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    # identical calls within a candle are computed once (see cache.py)
+    indicator = _cache.wrap(getattr(importlib.import_module(f'.{module}', __name__), name))
+    globals()[name] = indicator
+    return indicator
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_INDICATORS))
+
+
+class _Indicators(ModuleType):
+    def __setattr__(self, name: str, value) -> None:
+        # importing the module of an indicator (which is mostly named the same) binds the
+        # module to this package, which would hide the indicator from __getattr__
+        if isinstance(value, ModuleType) and name in _INDICATORS:
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Indicators
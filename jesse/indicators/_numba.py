@@ -0,0 +1,22 @@
+"""
+The njit decorator of the compiled kernels of the indicators.
+
+Kernels are cached on disk (cache=True), so that only the first process compiles them
+and the next ones (later runs, optimize mode's workers, ...) load them. If numba is not
+installed, kernels are left as plain python functions.
+"""
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+
+def njit(func=None, **options):
+    """
+    works both as @njit and as @njit(**options)
+    """
+    if _njit is None:
+        return func if func is not None else (lambda f: f)
+
+    options.setdefault('cache', True)
+    return _njit(**options)(func) if func is not None else _njit(**options)
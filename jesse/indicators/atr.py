@@ -4,20 +4,56 @@ import numpy as np
 import talib
 
 from jesse.helpers import slice_candles
+from ._numba import njit
 
 
-def atr(candles: np.ndarray, period: int = 14, sequential: bool = False) -> Union[float, np.ndarray]:
+def atr(candles: np.ndarray, period: Union[int, list] = 14, sequential: bool = False) -> Union[float, np.ndarray]:
     """
     ATR - Average True Range
 
     :param candles: np.ndarray
-    :param period: int - default: 14
+    :param period: int - default: 14 (or a list of periods, to compute all of them in one pass)
     :param sequential: bool - default: False
 
     :return: float | np.ndarray
     """
     candles = slice_candles(candles, sequential)
 
+    if np.ndim(period):
+        res = atr_batch(candles[:, 3], candles[:, 4], candles[:, 2], np.asarray(period, dtype=np.int64))
+        return res if sequential else res[:, -1]
+
     res = talib.ATR(candles[:, 3], candles[:, 4], candles[:, 2], timeperiod=period)
 
     return res if sequential else res[-1]
+
+
+@njit
+def atr_batch(high, low, close, periods):
+    """
+    one row per period, computed the same way as talib.ATR
+    """
+    n = close.shape[0]
+    true_range = np.full(n, np.nan)
+    for i in range(1, n):
+        true_range[i] = max(high[i], close[i - 1]) - min(low[i], close[i - 1])
+
+    res = np.full((periods.shape[0], n), np.nan)
+    for p in range(periods.shape[0]):
+        period = periods[p]
+        if period < 1 or period >= n:
+            continue
+        if period <= 1:
+            res[p, 1:] = true_range[1:]
+            continue
+        total = 0.0
+        for i in range(1, period + 1):
+            total += true_range[i]
+        prev = total / period
+        res[p, period] = prev
+        for i in range(period + 1, n):
+            prev *= period - 1
+            prev += true_range[i]
+            prev /= period
+            res[p, i] = prev
+    return res
@@ -0,0 +1,74 @@
+from functools import wraps
+from typing import Callable
+
+import numpy as np
+
+
+class IndicatorCache:
+    """
+    Caches the results of the indicators for the current candle, so that identical calls
+    (e.g. ta.ema(self.candles, 20) in both should_long() and update_position(), or in
+    several routes of the same symbol) are computed once.
+
+    Only the candles of the store are cached, which are recognized by being read-only.
+    The key is the memory they are stored at, their shape, their latest candle and the
+    parameters of the call. It is cleared whenever a candle is added to the store.
+
+    The cache keeps a read-only copy of each result, and every caller gets its own copy
+    of it, so callers can still modify the arrays they get like without the cache.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._results = {}
+
+    def clear(self) -> None:
+        if self._results:
+            self._results = {}
+
+    def wrap(self, func: Callable) -> Callable:
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(candles, *args, **kwargs):
+            if (not self.enabled or type(candles) is not np.ndarray or candles.flags.writeable
+                    or candles.ndim != 2 or not len(candles)):
+                return func(candles, *args, **kwargs)
+
+            key = (name, candles.__array_interface__['data'][0], candles.shape, candles[-1].tobytes(), args,
+                   tuple(sorted(kwargs.items())) if kwargs else None)
+            try:
+                res = self._results.get(key)
+            except TypeError:
+                # unhashable parameters
+                return func(candles, *args, **kwargs)
+
+            if res is not None:
+                self.hits += 1
+                return _copy(res)
+
+            self.misses += 1
+            res = func(candles, *args, **kwargs)
+            self._results[key] = _copy(res, read_only=True)
+            return res
+
+        return wrapper
+
+
+def _copy(res, read_only: bool = False):
+    """
+    copies the arrays of a result of an indicator (an array, a namedtuple of them, or a number)
+    """
+    if isinstance(res, np.ndarray):
+        res = res.copy()
+        res.flags.writeable = not read_only
+        return res
+    if isinstance(res, tuple):
+        values = [_copy(value, read_only) for value in res]
+        return type(res)(*values) if hasattr(res, '_fields') else type(res)(values)
+    return res
+
+
+cache = IndicatorCache()
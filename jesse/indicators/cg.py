@@ -1,10 +1,7 @@
 from typing import Union
 
 import numpy as np
-try:
-    from numba import njit
-except ImportError:
-    njit = lambda a : a
+from ._numba import njit
 
 from jesse.helpers import get_candle_source, same_length, slice_candles
 
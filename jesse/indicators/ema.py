@@ -4,15 +4,16 @@ import numpy as np
 import talib
 
 from jesse.helpers import get_candle_source, slice_candles
+from ._numba import njit
 
 
-def ema(candles: np.ndarray, period: int = 5, source_type: str = "close", sequential: bool = False) -> Union[
+def ema(candles: np.ndarray, period: Union[int, list] = 5, source_type: str = "close", sequential: bool = False) -> Union[
     float, np.ndarray]:
     """
     EMA - Exponential Moving Average
 
     :param candles: np.ndarray
-    :param period: int - default: 5
+    :param period: int - default: 5 (or a list of periods, to compute all of them in one pass)
     :param source_type: str - default: "close"
     :param sequential: bool - default: False
 
@@ -24,6 +25,32 @@ def ema(candles: np.ndarray, period: int = 5, source_type: str = "close", sequen
         candles = slice_candles(candles, sequential)
         source = get_candle_source(candles, source_type=source_type)
 
+    if np.ndim(period):
+        res = ema_batch(source, np.asarray(period, dtype=np.int64))
+        return res if sequential else res[:, -1]
+
     res = talib.EMA(source, timeperiod=period)
 
     return res if sequential else res[-1]
+
+
+@njit
+def ema_batch(source, periods):
+    """
+    one row per period, computed the same way as talib.EMA
+    """
+    res = np.full((periods.shape[0], source.shape[0]), np.nan)
+    for p in range(periods.shape[0]):
+        period = periods[p]
+        if period < 1 or period > source.shape[0]:
+            continue
+        k = 2 / (period + 1)
+        total = 0.0
+        for i in range(period):
+            total += source[i]
+        prev = total / period
+        res[p, period - 1] = prev
+        for i in range(period, source.shape[0]):
+            prev = ((source[i] - prev) * k) + prev
+            res[p, i] = prev
+    return res
@@ -36,7 +36,8 @@ def macdext(candles: np.ndarray, fast_period: int = 12, fast_matype: int = 0, sl
     macd = ma_fast - ma_slow
 
     if signal_matype == 24:
-        # volume needed.
+        # volume needed. (candles is a view of the stored candles, so don't modify it in place)
+        candles = candles.copy()
         candles[:, 2] = macd
         candles_without_nan = candles[~np.isnan(candles).any(axis=1)]
         macdsignal = ma(candles_without_nan, period=signal_period, matype=signal_matype, source_type="close", sequential=True)
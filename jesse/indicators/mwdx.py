@@ -2,10 +2,7 @@ from typing import Union
 
 import numpy as np
 
-try:
-    from numba import njit
-except ImportError:
-    njit = lambda a: a
+from ._numba import njit
 
 from jesse.helpers import get_candle_source, slice_candles
 
@@ -5,15 +5,16 @@ import talib
 
 from jesse.helpers import get_candle_source
 from jesse.helpers import slice_candles
+from ._numba import njit
 
 
-def rsi(candles: np.ndarray, period: int = 14, source_type: str = "close", sequential: bool = False) -> Union[
+def rsi(candles: np.ndarray, period: Union[int, list] = 14, source_type: str = "close", sequential: bool = False) -> Union[
     float, np.ndarray]:
     """
     RSI - Relative Strength Index
 
     :param candles: np.ndarray
-    :param period: int - default: 14
+    :param period: int - default: 14 (or a list of periods, to compute all of them in one pass)
     :param source_type: str - default: "close"
     :param sequential: bool - default: False
 
@@ -22,6 +23,40 @@ def rsi(candles: np.ndarray, period: int = 14, source_type: str = "close", seque
     candles = slice_candles(candles, sequential)
 
     source = get_candle_source(candles, source_type=source_type)
+    if np.ndim(period):
+        r = rsi_batch(source, np.asarray(period, dtype=np.int64))
+        return r if sequential else r[:, -1]
+
     r = talib.RSI(source, timeperiod=period)
 
     return r if sequential else r[-1]
+
+
+@njit
+def rsi_batch(source, periods):
+    """
+    one row per period, computed the same way as talib.RSI
+    """
+    res = np.full((periods.shape[0], source.shape[0]), np.nan)
+    for p in range(periods.shape[0]):
+        period = periods[p]
+        if period < 1 or period >= source.shape[0]:
+            continue
+        gain = 0.0
+        loss = 0.0
+        for i in range(1, source.shape[0]):
+            change = source[i] - source[i - 1]
+            if i > period:
+                gain *= period - 1
+                loss *= period - 1
+            if change < 0:
+                loss -= change
+            else:
+                gain += change
+            if i < period:
+                continue
+            gain /= period
+            loss /= period
+            total = gain + loss
+            res[p, i] = 100 * (gain / total) if not -1e-8 < total < 1e-8 else 0.0
+    return res
@@ -5,15 +5,16 @@ import talib
 
 from jesse.helpers import get_candle_source
 from jesse.helpers import slice_candles
+from ._numba import njit
 
 
-def sma(candles: np.ndarray, period: int = 5, source_type: str = "close", sequential: bool = False) -> Union[
+def sma(candles: np.ndarray, period: Union[int, list] = 5, source_type: str = "close", sequential: bool = False) -> Union[
     float, np.ndarray]:
     """
     SMA - Simple Moving Average
 
     :param candles: np.ndarray
-    :param period: int - default: 5
+    :param period: int - default: 5 (or a list of periods, to compute all of them in one pass)
     :param source_type: str - default: "close"
     :param sequential: bool - default: False
 
@@ -26,6 +27,30 @@ def sma(candles: np.ndarray, period: int = 5, source_type: str = "close", sequen
         candles = slice_candles(candles, sequential)
         source = get_candle_source(candles, source_type=source_type)
 
+    if np.ndim(period):
+        res = sma_batch(source, np.asarray(period, dtype=np.int64))
+        return res if sequential else res[:, -1]
+
     res = talib.SMA(source, timeperiod=period)
 
     return res if sequential else res[-1]
+
+
+@njit
+def sma_batch(source, periods):
+    """
+    one row per period, computed the same way as talib.SMA
+    """
+    res = np.full((periods.shape[0], source.shape[0]), np.nan)
+    for p in range(periods.shape[0]):
+        period = periods[p]
+        if period < 1 or period > source.shape[0]:
+            continue
+        total = 0.0
+        for i in range(period - 1):
+            total += source[i]
+        for i in range(period - 1, source.shape[0]):
+            total += source[i]
+            res[p, i] = total / period
+            total -= source[i - period + 1]
+    return res
@@ -0,0 +1,375 @@
+"""
+Incremental versions of the recursive indicators. They carry their state across candles,
+so the value of each new candle costs O(1) instead of recomputing the indicator over the
+last `warmup_candles_num` candles like jesse.indicators does.
+
+Their values match the sequential (sequential=True) output of the batch indicators
+computed on the same candles:
+
+    ema = EMA(period=20)
+    for candle in candles:
+        ema.update(candle)
+    ema.value == ta.ema(candles, 20, sequential=True)[-1]
+
+Strategies don't need to feed them; Strategy.stream() binds one to a route and keeps it
+up to date with the candles of the store:
+
+    self.stream(EMA, 20)
+"""
+import math
+from collections import deque, namedtuple
+from typing import Union
+
+import numpy as np
+
+import jesse.helpers as jh
+from jesse.helpers import get_candle_source
+
+# the same as jesse.indicators.macd's, which isn't imported to not import talib along with it
+MACDValues = namedtuple('MACD', ['macd', 'signal', 'hist'])
+
+# the columns of the source types that don't need to be calculated
+_SOURCE_COLUMNS = {'open': 1, 'close': 2, 'high': 3, 'low': 4, 'volume': 5}
+
+
+class StreamingIndicator:
+    """
+    The base class of the incremental indicators.
+
+    update() commits a closed candle to the state, peek() returns the value the indicator
+    would have if a candle was committed without changing the state, which is what a
+    forming candle needs.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.value = np.nan
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.value = np.nan
+
+    def update(self, candle: np.ndarray) -> Union[float, tuple]:
+        self.value = self._step(candle, True)
+        self.count += 1
+        return self.value
+
+    def peek(self, candle: np.ndarray) -> Union[float, tuple]:
+        return self._step(candle, False)
+
+    def warm_up(self, candles: np.ndarray) -> Union[float, tuple]:
+        for candle in candles:
+            self.update(candle)
+        return self.value
+
+    def _step(self, candle: np.ndarray, commit: bool) -> Union[float, tuple]:
+        raise NotImplementedError
+
+    def _source(self, candle: np.ndarray) -> float:
+        # python floats are much faster than numpy scalars for this kind of arithmetic
+        column = _SOURCE_COLUMNS.get(self.source_type)
+        if column is None:
+            return float(get_candle_source(candle, self.source_type))
+        return float(candle[column])
+
+
+class _SeededAverage:
+    """
+    An exponential moving average which (like TA-Lib's) is seeded with the simple average
+    of its first `period` values
+    """
+
+    def __init__(self, period: int, alpha: float) -> None:
+        self.period = period
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = np.nan
+
+    def step(self, x: float, commit: bool) -> float:
+        count = self.count + 1
+        if count < self.period:
+            if commit:
+                self.total += x
+                self.count = count
+            return np.nan
+
+        if count == self.period:
+            value = (self.total + x) / self.period
+        else:
+            value = (x - self.value) * self.alpha + self.value
+
+        if commit:
+            self.value = value
+            self.count = count
+        return value
+
+
+class SMA(StreamingIndicator):
+    """
+    SMA - Simple Moving Average (same as jesse.indicators.sma)
+    """
+
+    def __init__(self, period: int = 5, source_type: str = "close") -> None:
+        self.period = period
+        self.source_type = source_type
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._window = deque(maxlen=self.period)
+        self._total = 0.0
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        x = self._source(candle)
+        total = self._total + x
+        if len(self._window) == self.period:
+            total -= self._window[0]
+
+        if commit:
+            self._window.append(x)
+            self._total = total
+
+        return total / self.period if self.count + 1 >= self.period else np.nan
+
+
+class EMA(StreamingIndicator):
+    """
+    EMA - Exponential Moving Average (same as jesse.indicators.ema)
+    """
+
+    def __init__(self, period: int = 5, source_type: str = "close") -> None:
+        self.period = period
+        self.source_type = source_type
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._average = _SeededAverage(self.period, 2 / (self.period + 1))
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        return self._average.step(self._source(candle), commit)
+
+
+class RMA(StreamingIndicator):
+    """
+    RMA - the moving average used in RSI, with alpha = 1 / length (same as jesse.indicators.rma)
+
+    Like TradingView's rma, it is seeded with the simple average of the first `length`
+    values, so it matches jesse.indicators.rma once the seed has faded out.
+    """
+
+    def __init__(self, length: int = 14, source_type: str = "close") -> None:
+        if length < 1:
+            raise ValueError('Bad parameters.')
+
+        self.length = length
+        self.source_type = source_type
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._average = _SeededAverage(self.length, 1 / self.length)
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        return self._average.step(self._source(candle), commit)
+
+
+class SMMA(StreamingIndicator):
+    """
+    SMMA - Smoothed Moving Average (same as jesse.indicators.smma)
+    """
+
+    def __init__(self, period: int = 5, source_type: str = "close") -> None:
+        self.period = period
+        self.source_type = source_type
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._numerator = 0.0
+        self._denominator = 0.0
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        decay = 1 - 1 / self.period
+        numerator = self._source(candle) + decay * self._numerator
+        denominator = 1 + decay * self._denominator
+
+        if commit:
+            self._numerator = numerator
+            self._denominator = denominator
+        return numerator / denominator
+
+
+class RSI(StreamingIndicator):
+    """
+    RSI - Relative Strength Index (same as jesse.indicators.rsi)
+    """
+
+    def __init__(self, period: int = 14, source_type: str = "close") -> None:
+        self.period = period
+        self.source_type = source_type
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._previous = np.nan
+        self._gain = _SeededAverage(self.period, 1 / self.period)
+        self._loss = _SeededAverage(self.period, 1 / self.period)
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        x = self._source(candle)
+        if commit:
+            previous, self._previous = self._previous, x
+        else:
+            previous = self._previous
+        if self.count == 0:
+            return np.nan
+
+        change = x - previous
+        gain = self._gain.step(max(change, 0.0), commit)
+        loss = self._loss.step(max(-change, 0.0), commit)
+        if math.isnan(gain):
+            return np.nan
+
+        total = gain + loss
+        return 100 * gain / total if total != 0 else 0.0
+
+
+class ATR(StreamingIndicator):
+    """
+    ATR - Average True Range (same as jesse.indicators.atr)
+    """
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._previous_close = np.nan
+        self._average = _SeededAverage(self.period, 1 / self.period)
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        previous_close = self._previous_close
+        if commit:
+            self._previous_close = float(candle[2])
+        if self.count == 0:
+            return np.nan
+
+        true_range = max(float(candle[3]), previous_close) - min(float(candle[4]), previous_close)
+        return self._average.step(true_range, commit)
+
+
+class MACD(StreamingIndicator):
+    """
+    MACD - Moving Average Convergence/Divergence (same as jesse.indicators.macd)
+
+    Like TA-Lib, the fast average starts at the candle where the slow one is seeded.
+    """
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9,
+                 source_type: str = "close") -> None:
+        # TA-Lib swaps them if they are passed the other way round
+        if slow_period < fast_period:
+            fast_period, slow_period = slow_period, fast_period
+
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.source_type = source_type
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._fast = _SeededAverage(self.fast_period, 2 / (self.fast_period + 1))
+        self._slow = _SeededAverage(self.slow_period, 2 / (self.slow_period + 1))
+        self._signal = _SeededAverage(self.signal_period, 2 / (self.signal_period + 1))
+        self.value = MACDValues(np.nan, np.nan, np.nan)
+
+    def _step(self, candle: np.ndarray, commit: bool) -> MACDValues:
+        x = self._source(candle)
+        slow = self._slow.step(x, commit)
+        fast = self._fast.step(x, commit) if self.count >= self.slow_period - self.fast_period else np.nan
+        if math.isnan(slow):
+            return MACDValues(np.nan, np.nan, np.nan)
+
+        macd = fast - slow
+        signal = self._signal.step(macd, commit)
+        if math.isnan(signal):
+            return MACDValues(np.nan, np.nan, np.nan)
+        return MACDValues(macd, signal, macd - signal)
+
+
+class SuperSmoother(StreamingIndicator):
+    """
+    Super Smoother Filter 2pole Butterworth (same as jesse.indicators.supersmoother)
+    """
+
+    def __init__(self, period: int = 14, source_type: str = "close") -> None:
+        self.period = period
+        self.source_type = source_type
+        a = np.exp(-1.414 * np.pi / period)
+        b = 2 * a * np.cos(1.414 * np.pi / period)
+        self._c1 = (1 + a ** 2 - b) / 2
+        self._c2 = b
+        self._c3 = a ** 2
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self._previous = np.nan
+        # the two latest values
+        self._value1 = np.nan
+        self._value2 = np.nan
+
+    def _step(self, candle: np.ndarray, commit: bool) -> float:
+        x = self._source(candle)
+        if self.count < 2:
+            value = x
+        else:
+            value = self._c1 * (x + self._previous) + self._c2 * self._value1 - self._c3 * self._value2
+
+        if commit:
+            self._previous = x
+            self._value1, self._value2 = value, self._value1
+        return value
+
+
+class Stream:
+    """
+    Keeps an incremental indicator up to date with the candles of one exchange-symbol-timeframe.
+
+    The candles are passed on each read (they are the ones of the store); only the ones
+    that were added since the previous read are committed. The latest candle is never
+    committed because it might still be forming; it is peeked at instead.
+    """
+
+    def __init__(self, indicator: StreamingIndicator, timeframe: str) -> None:
+        self.indicator = indicator
+        self._step_ms = jh.timeframe_to_one_minutes(timeframe) * 60_000
+        # timestamp of the latest committed candle
+        self._committed = None
+
+    def read(self, candles: np.ndarray) -> Union[float, tuple]:
+        if not len(candles):
+            return self.indicator.value
+
+        latest = candles[-1][0]
+        if self._committed is None or latest <= self._committed:
+            # first read, or the candles have been reset
+            self.indicator.reset()
+            new_candles = candles[:-1]
+        else:
+            count = int((latest - self._committed) // self._step_ms) - 1
+            new_candles = candles[max(len(candles) - 1 - count, 0):-1] if count > 0 else candles[:0]
+
+        for candle in new_candles:
+            self.indicator.update(candle)
+        if len(candles) > 1:
+            self._committed = candles[-2][0]
+        elif self._committed is None:
+            self._committed = latest - self._step_ms
+
+        return self.indicator.peek(candles[-1])
@@ -2,7 +2,7 @@ from collections import namedtuple
 
 import numpy as np
 import talib as ta
-from numba import njit
+from ._numba import njit
 
 from jesse.helpers import get_candle_source, slice_candles
 
@@ -1 +1,2 @@
 from .dynamic_numpy_array import DynamicNumpyArray
+from .price_range_index import PriceRangeIndex
@@ -1,25 +1,53 @@
 import numpy as np
 
-from jesse.helpers import np_shift
+
+def read_only(arr: np.ndarray) -> np.ndarray:
+    """
+    returns a write-protected view of arr without copying it
+    """
+    view = arr.view()
+    view.flags.writeable = False
+    return view
 
 
 class DynamicNumpyArray:
     """
     Dynamic Numpy Array
 
-    A data structure containing a numpy array which expands its memory
-    allocation every N number. Hence, it's both fast and dynamic.
+    A data structure containing a numpy array which is both fast and dynamic.
+
+    Without drop_at, the allocated memory grows geometrically (it's doubled
+    whenever it gets full), hence appending is amortized O(1).
+
+    With drop_at, it is a circular buffer that keeps only the latest drop_at
+    items, so the memory stays bounded. Every item is written twice (at its
+    position and at its position + the buffer length) so the kept items can
+    always be returned as one contiguous view without any copying.
+
+    One extra slot is always available after the last item, which is used
+    for forming items (see get_view_with_forming_item()).
     """
 
     def __init__(self, shape: tuple, drop_at=None):
-        self.index = -1
-        self.array = np.zeros(shape)
-        self.bucket_size = shape[0]
         self.shape = shape
+        self.bucket_size = shape[0]
         self.drop_at = drop_at
+        # position of the first item in self.array
+        self.head = 0
+        # index of the last item (relative to the first item)
+        self.index = -1
+        # number of items appended since the last flush (including the dropped ones)
+        self.total_count = 0
+
+        if self.drop_at is None:
+            self.array = np.zeros(shape)
+        else:
+            # the ring holds drop_at items plus the forming slot, and is mirrored
+            self.ring_size = self.drop_at + 1
+            self.array = np.zeros((self.ring_size * 2, *shape[1:]))
 
     def __str__(self) -> str:
-        return str(self.array[:self.index + 1])
+        return str(self[:])
 
     def __len__(self) -> int:
         return self.index + 1
@@ -29,10 +57,12 @@ class DynamicNumpyArray:
             start = 0 if i.start is None else i.start
             stop = self.index + 1 if i.stop is None else i.stop
 
+            if start < 0:
+                start = max((self.index + 1) - abs(start), 0)
             if stop < 0:
                 stop = (self.index + 1) - abs(stop)
-            stop = min(stop, self.index + 1)
-            return self.array[start:stop]
+            stop = max(min(stop, self.index + 1), start)
+            return self.array[self.head + start:self.head + stop]
         else:
             if i < 0:
                 i = (self.index + 1) - abs(i)
@@ -41,7 +71,7 @@ class DynamicNumpyArray:
             if self.index == -1 or i > self.index or i < 0:
                 raise IndexError('list assignment index out of range')
 
-            return self.array[i]
+            return self.array[self.head + i]
 
     def __setitem__(self, i, item) -> None:
         if i < 0:
@@ -51,49 +81,72 @@ class DynamicNumpyArray:
         if i > self.index or i < 0:
             raise IndexError('list assignment index out of range')
 
-        self.array[i] = item
+        self._write(self.head + i, item)
 
     def append(self, item: np.ndarray) -> None:
-        self.index += 1
-
-        # expand if the arr is almost full
-        if self.index != 0 and (self.index + 1) % self.bucket_size == 0:
-            new_bucket = np.zeros(self.shape)
-            self.array = np.concatenate((self.array, new_bucket), axis=0)
-
-        # drop N% of the beginning values to free memory
-        if (
-            self.drop_at is not None
-            and self.index != 0
-            and (self.index + 1) % self.drop_at == 0
-        ):
-            shift_num = int(self.drop_at / 2)
-            self.index -= shift_num
-            self.array = np_shift(self.array, -shift_num)
-
-        self.array[self.index] = item
-
-    def append_multiple(self,  items: np.ndarray) -> None:
-
-        self.index += 1
-
-        # expand if the arr is almost full
-        while self.index != 0 and len(items) > len(self.array) - self.index:
-            new_bucket = np.zeros(self.shape)
-            self.array = np.concatenate((self.array, new_bucket), axis=0)
-
-        # drop N% of the beginning values to free memory
-        # todo: imlemeant drop_at
-
-        self.array[self.index: self.index + len(items)] = items
-        self.index += len(items) - 1
+        self.total_count += 1
+
+        if self.drop_at is None:
+            self.index += 1
+            # expand if the arr is almost full (keep the forming slot available)
+            if self.index + 1 >= len(self.array):
+                self._grow(self.index + 2)
+            self.array[self.index] = item
+            return
+
+        # full: drop the oldest item
+        if self.index + 1 == self.drop_at:
+            self.head = (self.head + 1) % self.ring_size
+        else:
+            self.index += 1
+
+        self._write(self.head + self.index, item)
+
+    def append_multiple(self, items: np.ndarray) -> None:
+        count = len(items)
+        self.total_count += count
+
+        if self.drop_at is None:
+            # expand if the arr is almost full (this applies to an empty arr as well)
+            if self.index + count + 1 >= len(self.array):
+                self._grow(self.index + count + 2)
+            self.array[self.index + 1:self.index + 1 + count] = items
+            self.index += count
+            return
+
+        # only the latest drop_at items are kept
+        if count >= self.drop_at:
+            self.head = 0
+            self.index = self.drop_at - 1
+            self.array[:self.drop_at] = items[-self.drop_at:]
+            self.array[self.ring_size:self.ring_size + self.drop_at] = items[-self.drop_at:]
+            return
+
+        positions = (self.head + self.index + 1 + np.arange(count)) % self.ring_size
+        self.array[positions] = items
+        self.array[positions + self.ring_size] = items
+        self.index += count
+
+        # drop the oldest items
+        if self.index + 1 > self.drop_at:
+            self.head = (self.head + self.index + 1 - self.drop_at) % self.ring_size
+            self.index = self.drop_at - 1
+
+    def get_view_with_forming_item(self, item: np.ndarray) -> np.ndarray:
+        """
+        writes item into the slot right after the last item (without appending it)
+        and returns a read-only view of all items followed by it. It is meant for
+        forming candles: the slot gets overwritten by the next append().
+        """
+        self._write(self.head + self.index + 1, item)
+        return read_only(self.array[self.head:self.head + self.index + 2])
 
     def get_last_item(self):
         # validation
         if self.index == -1:
             raise IndexError('list assignment index out of range')
 
-        return self.array[self.index]
+        return self.array[self.head + self.index]
 
     def get_past_item(self, past_index) -> np.ndarray:
         # validation
@@ -103,9 +156,25 @@ class DynamicNumpyArray:
         if (self.index - past_index) < 0:
             raise IndexError('list assignment index out of range')
 
-        return self.array[self.index - past_index]
+        return self.array[self.head + self.index - past_index]
 
     def flush(self) -> None:
+        # the allocated memory is reused
+        self.head = 0
         self.index = -1
-        self.array = np.zeros(self.shape)
-        self.bucket_size = self.shape[0]
+        self.total_count = 0
+
+    def _write(self, position: int, item: np.ndarray) -> None:
+        if self.drop_at is None:
+            self.array[position] = item
+            return
+
+        position %= self.ring_size
+        self.array[position] = item
+        self.array[position + self.ring_size] = item
+
+    def _grow(self, min_size: int) -> None:
+        new_size = max(len(self.array) * 2, min_size)
+        new_array = np.zeros((new_size, *self.shape[1:]))
+        new_array[:self.index + 1] = self.array[:self.index + 1]
+        self.array = new_array
@@ -0,0 +1,95 @@
+from typing import Union
+
+import numpy as np
+
+
+class PriceRangeIndex:
+    """
+    Price Range Index
+
+    Answers "what is the highest high / lowest low between two candles" in (nearly)
+    constant time, which is used to find the first future candle that touches a price
+    with a binary search instead of scanning the candles.
+
+    Candles are split into blocks of block_size, and a sparse table of the block
+    highs/lows is kept: level k of the table holds the high/low of 2^k consecutive
+    blocks. A range is answered by two overlapping runs of whole blocks plus the
+    partial blocks at its ends. Keeping the table over blocks (instead of single
+    candles) keeps its memory a small fraction of the candles themselves.
+    """
+
+    def __init__(self, candles: np.ndarray, block_size: int = 64) -> None:
+        self.highs = np.ascontiguousarray(candles[:, 3])
+        self.lows = np.ascontiguousarray(candles[:, 4])
+        self.block_size = block_size
+
+        blocks_count = len(candles) // block_size
+        self._max_table = [self.highs[:blocks_count * block_size].reshape(blocks_count, block_size).max(axis=1)]
+        self._min_table = [self.lows[:blocks_count * block_size].reshape(blocks_count, block_size).min(axis=1)]
+        width = 1
+        while width * 2 <= blocks_count:
+            self._max_table.append(np.maximum(self._max_table[-1][:-width], self._max_table[-1][width:]))
+            self._min_table.append(np.minimum(self._min_table[-1][:-width], self._min_table[-1][width:]))
+            width *= 2
+
+    def __len__(self) -> int:
+        return len(self.highs)
+
+    def max_high(self, start: int, end: int) -> float:
+        """
+        returns the highest high of candles[start:end]
+        """
+        return self._query(self.highs, self._max_table, np.maximum, int(start), int(end))
+
+    def min_low(self, start: int, end: int) -> float:
+        """
+        returns the lowest low of candles[start:end]
+        """
+        return self._query(self.lows, self._min_table, np.minimum, int(start), int(end))
+
+    def first_touch(self, price: float, start: int, end: int, previous_close: float = None) -> Union[int, None]:
+        """
+        returns the index of the first candle in candles[start:end] by which the price has
+        been touched (since start), or None if it isn't touched in that range.
+
+        previous_close is included in the range as the price the candles jump from.
+        """
+        if end <= start or not self._touches(price, start, end, previous_close):
+            return None
+
+        # the touched range only grows with its end, so it can be binary searched
+        low, high = start, end - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._touches(price, start, middle + 1, previous_close):
+                high = middle
+            else:
+                low = middle + 1
+
+        return low
+
+    def _touches(self, price: float, start: int, end: int, previous_close: Union[float, None]) -> bool:
+        lowest = self.min_low(start, end)
+        highest = self.max_high(start, end)
+        if previous_close is not None:
+            lowest = min(lowest, previous_close)
+            highest = max(highest, previous_close)
+        return lowest <= price <= highest
+
+    def _query(self, values: np.ndarray, table: list, ufunc: np.ufunc, start: int, end: int) -> float:
+        first_block = -(-start // self.block_size)
+        last_block = end // self.block_size
+
+        # too short to contain whole blocks
+        if last_block <= first_block:
+            return ufunc.reduce(values[start:end])
+
+        level = (last_block - first_block).bit_length() - 1
+        result = ufunc(table[level][first_block], table[level][last_block - (1 << level)])
+
+        # partial blocks at the ends
+        for part in (values[start:first_block * self.block_size], values[last_block * self.block_size:end]):
+            if len(part):
+                result = ufunc(result, ufunc.reduce(part))
+
+        return result
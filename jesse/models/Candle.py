@@ -35,5 +35,8 @@ class Candle(peewee.Model):
 
 
 if not jh.is_unit_testing():
-    # create the table
-    Candle.create_table()
+    from jesse.services import candle_schema
+
+    # create the table (unless it has been replaced with the view of the compact layout)
+    if not candle_schema.is_compact():
+        Candle.create_table()
@@ -11,6 +11,7 @@ from jesse.models.Orderbook import Orderbook
 from jesse.models.Ticker import Ticker
 from jesse.models.Trade import Trade
 from jesse.services import logger
+from jesse.services.db import store_candles_array
 
 
 def store_candle_into_db(exchange: str, symbol: str, candle: np.ndarray) -> None:
@@ -27,7 +28,7 @@ def store_candle_into_db(exchange: str, symbol: str, candle: np.ndarray) -> None
     }
 
     def async_save() -> None:
-        Candle.insert(**d).on_conflict_ignore().execute()
+        store_candles_array(np.array([candle], dtype=np.float64), exchange, symbol)
         print(
             jh.color(
                 f"candle: {jh.timestamp_to_time(d['timestamp'])}-{exchange}-{symbol}: {candle}",
@@ -1,4 +1,8 @@
+import multiprocessing
+import os
+import sys
 import time
+import traceback
 from typing import Dict, Union
 
 import arrow
@@ -14,23 +18,29 @@ import jesse.services.table as table
 from jesse import exceptions
 from jesse.config import config
 from jesse.enums import timeframes, order_types, order_roles, order_flags
+from jesse.libs import PriceRangeIndex
 from jesse.models import Candle, Order, Position
 from jesse.modes.utils import save_daily_portfolio_balance
 from jesse.routes import router
 from jesse.services import charts
 from jesse.services import logger
+from jesse.services import precomputed_indicators
 from jesse.services import quantstats
 from jesse.services import report
 from jesse.services.cache import cache
-from jesse.services.candle import generate_candle_from_one_minutes, print_candle, candle_includes_price, split_candle
+from jesse.services.candle_archive import archive
+from jesse.services.candle import batch_generate_candles_from_one_minutes, generate_candle_from_one_minutes, print_candle, \
+    candle_includes_price, split_candle
 from jesse.services.file import store_logs
+from jesse.services.profiler import profiler
 from jesse.services.validators import validate_routes
 from jesse.store import store
 
 
 def run(start_date: str, finish_date: str, candles: Dict[str, Dict[str, Union[str, np.ndarray]]] = None,
         chart: bool = False, tradingview: bool = False, full_reports: bool = False,
-        csv: bool = False, json: bool = False, hyperparameters: dict = None) -> None:
+        csv: bool = False, json: bool = False, hyperparameters: dict = None, shards: int = 1,
+        profile: bool = False, profile_output: str = None) -> None:
     # clear the screen
     if not jh.should_execute_silently():
         click.clear()
@@ -63,7 +73,23 @@ def run(start_date: str, finish_date: str, candles: Dict[str, Dict[str, Union[st
             
     # print('backtest:: I got hyperparameters: ', hyperparameters)
     # run backtest simulation
-    simulator(candles, hyperparameters)
+    if profile:
+        profiler.enable()
+    try:
+        with profiler.measure('simulation'):
+            if shards > 1 and len(router.routes) > 1:
+                sharded_simulator(candles, hyperparameters, shards)
+            else:
+                simulator(candles, hyperparameters)
+    finally:
+        profiler.disable()
+
+    if profile:
+        print('\n')
+        profiler.print_report()
+        if profile_output:
+            profiler.dump_collapsed_stacks(profile_output)
+            print(f'\nProfile saved as collapsed stacks to: {profile_output}')
 
     if not jh.should_execute_silently():
         # print trades metrics
@@ -172,17 +198,20 @@ def load_candles(start_date_str: str, finish_date_str: str) -> Dict[str, Dict[st
         from_db = False
         key = jh.key(exchange, symbol)
 
-        cache_key = f"{start_date_str}-{finish_date_str}-{key}"
-        if jh.get_config('env.caching.recycle'):  # TODO Override?
-            print('Recycling enabled!')
-            cached_value = cache.slice_pickles(cache_key, start_date_str, finish_date_str, key)
-        else:
-            cached_value = cache.get_value(cache_key)
-            print('Recycling disabled, falling back to vanilla driver!')
+        # read straight from the memory-mapped archive if it's enabled
+        if archive.is_enabled():
+            candles[key] = {
+                'exchange': exchange,
+                'symbol': symbol,
+                'candles': archive.load(exchange, symbol, start_date, finish_date)
+            }
+            continue
+
+        cached_value = cache.get_candles(exchange, symbol, start_date, finish_date)
         # if cache exists
-        if cached_value:
-            candles_tuple = cached_value
-        # not cached, get and cache for later calls in the next 5 minutes
+        if cached_value is not None:
+            candles_arr = cached_value
+        # not cached, get and cache for later calls
         else:
             # fetch from database
             candles_tuple = Candle.select(
@@ -193,25 +222,26 @@ def load_candles(start_date_str: str, finish_date_str: str) -> Dict[str, Dict[st
                 Candle.exchange == exchange,
                 Candle.symbol == symbol
             ).order_by(Candle.timestamp.asc()).tuples()
+            candles_arr = np.array(tuple(candles_tuple))
             from_db = True
 
         # validate that there are enough candles for selected period
         required_candles_count = (finish_date - start_date) / 60_000
-        if len(candles_tuple) == 0 or candles_tuple[-1][0] != finish_date or candles_tuple[0][0] != start_date:
+        if len(candles_arr) == 0 or candles_arr[-1][0] != finish_date or candles_arr[0][0] != start_date:
             raise exceptions.CandleNotFoundInDatabase(
                 f'Not enough candles for {symbol}. Try running "jesse import-candles"')
-        elif len(candles_tuple) != required_candles_count + 1:
+        elif len(candles_arr) != required_candles_count + 1:
             raise exceptions.CandleNotFoundInDatabase(
                 f'There are missing candles between {start_date_str} => {finish_date_str}')
 
         # cache it for near future calls if it's from db. If not it's already cached
         if from_db:
-            cache.set_value(cache_key, tuple(candles_tuple), expire_seconds=60 * 60 * 24 * 7)
+            cache.set_candles(exchange, symbol, candles_arr)
 
         candles[key] = {
             'exchange': exchange,
             'symbol': symbol,
-            'candles': np.array(candles_tuple)
+            'candles': candles_arr
         }
 
     return candles
@@ -219,7 +249,110 @@ def load_candles(start_date_str: str, finish_date_str: str) -> Dict[str, Dict[st
 
 def simulator(*args, **kwargs):
     # iterative_simulator(*args, **kwargs)
-    skip_simulator(*args, **kwargs)
+    if jh.get_config('env.backtest.engine', 'skip') == 'event':
+        event_simulator(*args, **kwargs)
+    else:
+        skip_simulator(*args, **kwargs)
+
+
+def sharded_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperparameters: dict = None,
+                      shards: int = 2) -> None:
+    """
+    Splits routes into groups and simulates each group in a separate process
+    with its own store. Routes must be independent of each other (no shared_vars),
+    and each group trades with the full starting balance of its exchanges. When
+    all groups are done, their completed trades and daily balances are merged into
+    the store of this process as if they were simulated together.
+    """
+    begin_time_track = time.time()
+    groups = [router.routes[i::shards] for i in range(min(shards, len(router.routes)))]
+
+    if not jh.should_execute_silently():
+        print(f'Executing simulation in {len(groups)} processes...')
+
+    # workers are forked so they inherit the loaded (warm-up) candles
+    ctx = multiprocessing.get_context('fork')
+    with ctx.Manager() as manager:
+        results = manager.list([])
+        workers = []
+
+        try:
+            for group in groups:
+                w = ctx.Process(target=_simulate_shard, args=(group, candles, hyperparameters, results))
+                w.start()
+                workers.append(w)
+
+            for w in workers:
+                w.join()
+                if w.exitcode != 0:
+                    raise RuntimeError(f'A backtest process exited with exitcode: {w.exitcode}')
+        except BaseException:
+            # terminate all workers
+            for w in workers:
+                w.terminate()
+            raise
+
+        results = list(results)
+
+    _merge_shard_results(results)
+
+    key = jh.key(*config['app']['considering_candles'][0][:2])
+    store.app.starting_time = candles[key]['candles'][0][0]
+    store.app.time = candles[key]['candles'][-1][0] + 60_000
+
+    # strategies have run in the workers, but routes need them for reporting
+    _initialized_strategies(hyperparameters)
+
+    if not jh.should_execute_silently():
+        print('Executed backtest simulation in: ', f'{round(time.time() - begin_time_track, 2)} seconds')
+
+
+def _simulate_shard(routes: list, candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperparameters: dict,
+                    results: list) -> None:
+    # the progressbar of each worker would mess up the output
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        router.routes = routes
+
+        # only simulate candles that this group's routes (and extra candles) need
+        keys = [jh.key(r.exchange, r.symbol) for r in routes] + [
+            jh.key(e['exchange'], e['symbol']) for e in router.extra_candles
+        ]
+        config['app']['considering_candles'] = [
+            c for c in config['app']['considering_candles'] if jh.key(c[0], c[1]) in keys
+        ]
+        simulator({k: candles[k] for k in candles if k in keys}, hyperparameters)
+
+        results.append({
+            'trades': store.completed_trades.trades,
+            'daily_balance': store.app.daily_balance,
+            'balances': {
+                name: (e.starting_assets[jh.app_currency()], e.assets[jh.app_currency()])
+                for name, e in store.exchanges.storage.items()
+            },
+        })
+    except Exception:
+        traceback.print_exc()
+        raise
+
+
+def _merge_shard_results(results: list) -> None:
+    """
+    merges results of shards into the store. The combined balance is
+    the starting balance plus the sum of each shard's profit and loss.
+    """
+    trades = [t for r in results for t in r['trades']]
+    store.completed_trades.trades = sorted(trades, key=lambda t: t.closed_at)
+
+    daily_balances = np.array([r['daily_balance'] for r in results])
+    starting_balance = daily_balances[0][0]
+    store.app.daily_balance = (starting_balance + (daily_balances - daily_balances[:, :1]).sum(axis=0)).tolist()
+
+    for name, e in store.exchanges.storage.items():
+        e.assets[jh.app_currency()] = e.starting_assets[jh.app_currency()] + sum(
+            r['balances'][name][1] - r['balances'][name][0] for r in results
+        )
 
 
 def iterative_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperparameters: dict = None) -> None:
@@ -265,6 +398,11 @@ def iterative_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], h
 
         selectors.get_position(r.exchange, r.symbol).strategy = r.strategy
 
+    # generate candles of bigger timeframes for the whole simulation up front
+    bigger_timeframes_candles = _generate_bigger_timeframes_candles(candles)
+    # and the indicators the strategies declared
+    precomputed_indicators.precompute([r.strategy for r in router.routes], candles, bigger_timeframes_candles)
+
     # add initial balance
     save_daily_portfolio_balance()
 
@@ -301,9 +439,7 @@ def iterative_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], h
                     # until = count - ((i + 1) % count)
 
                     if (i + 1) % count == 0:
-                        generated_candle = generate_candle_from_one_minutes(
-                            timeframe,
-                            candles[j]['candles'][(i - (count - 1)):(i + 1)])
+                        generated_candle = bigger_timeframes_candles[j][timeframe][(i + 1) // count - 1]
                         store.candles.add_candle(generated_candle, exchange, symbol, timeframe, with_execution=False,
                                                  with_generation=False)
 
@@ -346,7 +482,12 @@ def iterative_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], h
     save_daily_portfolio_balance()
 
 
-def skip_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperparameters: dict = None) -> None:
+def skip_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperparameters: dict = None,
+                   early_termination: dict = None) -> None:
+    """
+    :param early_termination: optional rules (see env.optimization.early_termination) which
+    raise exceptions.EarlyTermination as soon as one of them is met
+    """
     print('hyperparameters', hyperparameters)
     begin_time_track = time.time()
     key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
@@ -359,6 +500,11 @@ def skip_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperp
     # initiate strategies
     min_timeframe = _initialized_strategies(hyperparameters)
 
+    # generate candles of bigger timeframes for the whole simulation up front
+    bigger_timeframes_candles = _generate_bigger_timeframes_candles(candles)
+    # and the indicators the strategies declared
+    precomputed_indicators.precompute([r.strategy for r in router.routes], candles, bigger_timeframes_candles)
+
     # add initial balance
     save_daily_portfolio_balance()
 
@@ -370,44 +516,72 @@ def skip_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperp
             # update time
             store.app.time = first_candles_set[i - 1][0] + 60_000
 
-            # add candles
-            for j in candles:
+            _simulate_candles(candles, bigger_timeframes_candles, i, skip)
 
-                short_candles = candles[j]['candles'][i - skip: i]
-                # remove previous_short_candle fix
-                exchange = candles[j]['exchange']
-                symbol = candles[j]['symbol']
+            # update progressbar
+            if not jh.is_debugging() and not jh.should_execute_silently():
+                progressbar.update(skip)
 
-                store.candles.add_candle(short_candles, exchange, symbol, '1m', with_execution=False,
-                                         with_generation=False)
+            # now that all new generated candles are ready, execute
+            _execute_candles(i)
 
-                # print short candle
-                if jh.is_debuggable('shorter_period_candles'):
-                    print_candle(short_candles[-1], True, symbol)
+            if i % 1440 == 0:
+                save_daily_portfolio_balance()
+                if early_termination:
+                    _check_early_termination(early_termination, i, length)
 
-                current_temp_candle = generate_candle_from_one_minutes('',
-                                                                       short_candles,
-                                                                       accept_forming_candles=True)
+            skip = _skip_n_candles(candles, min_timeframe_remainder, i)
+            if skip < min_timeframe_remainder:
+                min_timeframe_remainder -= skip
+            elif skip == min_timeframe_remainder:
+                min_timeframe_remainder = min_timeframe
+            i += skip
 
-                if i - skip > 0:
-                    current_temp_candle = _get_fixed_jumped_candle(candles[j]['candles'][i - skip - 1], current_temp_candle)
-                # in this new prices update there might be an order that needs to be executed
-                _simulate_price_change_effect(current_temp_candle, exchange, symbol)
+    _finish_simulation(begin_time_track)
 
-                # generate and add candles for bigger timeframes
-                for timeframe in config['app']['considering_timeframes']:
-                    # for 1m, no work is needed
-                    if timeframe == '1m':
-                        continue
 
-                    count = jh.timeframe_to_one_minutes(timeframe)
+def event_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperparameters: dict = None,
+                    early_termination: dict = None) -> None:
+    """
+    Same as skip_simulator, except that instead of stepping through the greatest common divisor
+    of the considering timeframes (and halving the step whenever more than one order might get
+    executed), it jumps straight to the next candle that either touches an active order or the
+    liquidation price of a position, or is due for a strategy execution or the daily balance.
+    The candles that touch a price are found with a PriceRangeIndex of each candles set.
+    """
+    begin_time_track = time.time()
+    key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
+    first_candles_set = candles[key]['candles']
+    # steps don't stop at multiples of any timeframe, so a longer candles set mustn't be read past the others
+    length = min(len(candles[j]['candles']) for j in candles)
+    store.app.starting_time = first_candles_set[0][0]
+    store.app.time = first_candles_set[0][0]
 
-                    if i % count == 0:
-                        generated_candle = generate_candle_from_one_minutes(
-                            timeframe,
-                            candles[j]['candles'][i - count:i])
-                        store.candles.add_candle(generated_candle, exchange, symbol, timeframe, with_execution=False,
-                                                 with_generation=False)
+    # initiate strategies
+    _initialized_strategies(hyperparameters)
+
+    # generate candles of bigger timeframes for the whole simulation up front
+    bigger_timeframes_candles = _generate_bigger_timeframes_candles(candles)
+    # and the indicators the strategies declared
+    precomputed_indicators.precompute([r.strategy for r in router.routes], candles, bigger_timeframes_candles)
+    price_indexes = {j: PriceRangeIndex(candles[j]['candles']) for j in candles}
+    # periods (in minutes) at which the simulation has to stop: strategy executions and daily balances
+    periods = {jh.timeframe_to_one_minutes(r.timeframe) for r in router.routes} | {1440}
+
+    # add initial balance
+    save_daily_portfolio_balance()
+
+    with click.progressbar(length=length, label='Executing simulation...') as progressbar:
+        # i is the number of candles simulated so far
+        i = 0
+        while i < length:
+            skip = _next_event_step(candles, price_indexes, periods, i, length)
+            i += skip
+
+            # update time
+            store.app.time = first_candles_set[i - 1][0] + 60_000
+
+            _simulate_candles(candles, bigger_timeframes_candles, i, skip)
 
             # update progressbar
             if not jh.is_debugging() and not jh.should_execute_silently():
@@ -418,17 +592,117 @@ def skip_simulator(candles: Dict[str, Dict[str, Union[str, np.ndarray]]], hyperp
 
             if i % 1440 == 0:
                 save_daily_portfolio_balance()
-
-            skip = _skip_n_candles(candles, min_timeframe_remainder, i)
-            if skip < min_timeframe_remainder:
-                min_timeframe_remainder -= skip
-            elif skip == min_timeframe_remainder:
-                min_timeframe_remainder = min_timeframe
-            i += skip
+                if early_termination:
+                    _check_early_termination(early_termination, i, length)
 
     _finish_simulation(begin_time_track)
 
 
+def _next_event_step(candles: Dict[str, Dict[str, Union[str, np.ndarray]]],
+                     price_indexes: Dict[str, PriceRangeIndex], periods: set, i: int, length: int) -> int:
+    """
+    returns how many candles can be simulated at once after the i'th one: up to (and including)
+    the next candle that is either due for execution or touches an active order's price or the
+    liquidation price of a position
+    """
+    end = min(length, min((i // period + 1) * period for period in periods))
+
+    for j in candles:
+        exchange = candles[j]['exchange']
+        symbol = candles[j]['symbol']
+
+        prices = [o.price for o in store.orders.get_orders(exchange, symbol) if o.is_active]
+        p = selectors.get_position(exchange, symbol)
+        if p and p.is_open and p.mode == 'isolated':
+            prices.append(p.liquidation_price)
+
+        previous_close = candles[j]['candles'][i - 1][2] if i > 0 else None
+        for price in prices:
+            touched_at = price_indexes[j].first_touch(price, i, end, previous_close)
+            if touched_at is not None:
+                # searching the rest of the prices in a shorter range is cheaper
+                end = touched_at + 1
+
+    return end - i
+
+
+def _simulate_candles(candles: Dict[str, Dict[str, Union[str, np.ndarray]]],
+                      bigger_timeframes_candles: Dict[str, Dict[str, np.ndarray]], i: int, skip: int) -> None:
+    """
+    adds the 1m candles of [i - skip, i) and the bigger timeframe candles closed within them
+    to the store, and simulates the effect of their price change on orders and positions
+    """
+    for j in candles:
+        short_candles = candles[j]['candles'][i - skip: i]
+        # remove previous_short_candle fix
+        exchange = candles[j]['exchange']
+        symbol = candles[j]['symbol']
+
+        store.candles.add_candle(short_candles, exchange, symbol, '1m', with_execution=False,
+                                 with_generation=False)
+
+        # print short candle
+        if jh.is_debuggable('shorter_period_candles'):
+            print_candle(short_candles[-1], True, symbol)
+
+        current_temp_candle = generate_candle_from_one_minutes('',
+                                                               short_candles,
+                                                               accept_forming_candles=True)
+
+        if i - skip > 0:
+            current_temp_candle = _get_fixed_jumped_candle(candles[j]['candles'][i - skip - 1], current_temp_candle)
+        # in this new prices update there might be an order that needs to be executed
+        _simulate_price_change_effect(current_temp_candle, exchange, symbol)
+
+        # generate and add candles for bigger timeframes
+        for timeframe in config['app']['considering_timeframes']:
+            # for 1m, no work is needed
+            if timeframe == '1m':
+                continue
+
+            count = jh.timeframe_to_one_minutes(timeframe)
+
+            # every candle closed within this step
+            for k in range((i - skip) // count, i // count):
+                store.candles.add_candle(bigger_timeframes_candles[j][timeframe][k], exchange, symbol, timeframe,
+                                         with_execution=False, with_generation=False)
+
+
+def _check_early_termination(rules: dict, i: int, length: int) -> None:
+    balance = store.app.daily_balance[-1]
+
+    if rules.get('min_balance') is not None and balance < rules['min_balance']:
+        raise exceptions.EarlyTermination(f'Portfolio balance dropped below {rules["min_balance"]}')
+
+    if rules.get('max_drawdown') is not None:
+        peak = max(store.app.daily_balance)
+        if (peak - balance) / peak * 100 > rules['max_drawdown']:
+            raise exceptions.EarlyTermination(f'Drawdown exceeded {rules["max_drawdown"]}%')
+
+    if (
+            rules.get('no_trades_after') is not None
+            and i >= rules['no_trades_after'] * length
+            and store.completed_trades.count == 0
+            and not any(p.is_open for p in store.positions.storage.values())
+    ):
+        raise exceptions.EarlyTermination(
+            f'No trades after {round(rules["no_trades_after"] * 100)}% of the candles')
+
+
+def _generate_bigger_timeframes_candles(candles: Dict[str, Dict[str, Union[str, np.ndarray]]]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    backtest candles are known in advance, so candles of bigger timeframes are
+    generated all at once instead of one at a time inside the simulation loop
+    """
+    bigger_timeframes_candles = {}
+    for j in candles:
+        bigger_timeframes_candles[j] = {
+            timeframe: batch_generate_candles_from_one_minutes(timeframe, candles[j]['candles'])
+            for timeframe in config['app']['considering_timeframes'] if timeframe != '1m'
+        }
+    return bigger_timeframes_candles
+
+
 def _initialized_strategies(hyperparameters: dict = None):
     for r in router.routes:
         StrategyClass = jh.get_strategy_class(r.strategy_name)
@@ -539,7 +813,6 @@ def _skip_n_candles(candles, max_skip: int, i: int) -> int:
             if store.orders.count_active_orders(r.exchange, r.symbol) < 2:
                 continue
 
-            orders = store.orders.get_orders(r.exchange, r.symbol)
             future_candles = candles[f'{r.exchange}-{r.symbol}']['candles']
             if i >= len(future_candles):
                 # if there is a problem with i or with the candles it will raise somewhere else
@@ -550,9 +823,7 @@ def _skip_n_candles(candles, max_skip: int, i: int) -> int:
                                                                    future_candles[i:i+max_skip],
                                                                    accept_forming_candles=True)
 
-            for order in orders:
-                if order.is_active and candle_includes_price(current_temp_candle, order.price):
-                    orders_counter += 1
+            orders_counter += len(store.orders.get_touched_orders(r.exchange, r.symbol, current_temp_candle))
 
         if orders_counter < 2 or max_skip == 1:
             # no more than 2 orders that can interfere each other in this candle.
@@ -565,54 +836,37 @@ def _skip_n_candles(candles, max_skip: int, i: int) -> int:
 
 
 def _simulate_price_change_effect(real_candle: np.ndarray, exchange: str, symbol: str) -> None:
-    orders = store.orders.get_orders(exchange, symbol)
-
     current_temp_candle = real_candle.copy()
-    executed_order = False
 
     while True:
-        if len(orders) == 0:
-            executed_order = False
-        else:
-            for index, order in enumerate(orders):
-                if index == len(orders) - 1 and not order.is_active:
-                    executed_order = False
-
-                if not order.is_active:
-                    continue
-
-                if candle_includes_price(current_temp_candle, order.price):
-                    storable_temp_candle, current_temp_candle = split_candle(current_temp_candle, order.price)
-                    store.candles.add_candle(
-                        storable_temp_candle, exchange, symbol, '1m',
-                        with_execution=False,
-                        with_generation=False
-                    )
-                    p = selectors.get_position(exchange, symbol)
-                    p.current_price = storable_temp_candle[2]
-
-                    executed_order = True
-
-                    order.execute()
-
-                    # break from the for loop, we'll try again inside the while
-                    # loop with the new current_temp_candle
-                    break
-                else:
-                    executed_order = False
-
-        if not executed_order:
-            # add/update the real_candle to the store so we can move on
-            store.candles.add_candle(
-                real_candle, exchange, symbol, '1m',
-                with_execution=False,
-                with_generation=False
-            )
-            p = selectors.get_position(exchange, symbol)
-            if p:
-                p.current_price = real_candle[2]
+        # the first order the price reaches is executed, and the rest of the candle is tried
+        # again since executing it might have changed the other orders
+        touched_orders = store.orders.get_touched_orders(exchange, symbol, current_temp_candle)
+        if not touched_orders:
             break
 
+        order = touched_orders[0]
+        storable_temp_candle, current_temp_candle = split_candle(current_temp_candle, order.price)
+        store.candles.add_candle(
+            storable_temp_candle, exchange, symbol, '1m',
+            with_execution=False,
+            with_generation=False
+        )
+        p = selectors.get_position(exchange, symbol)
+        p.current_price = storable_temp_candle[2]
+
+        order.execute()
+
+    # add/update the real_candle to the store so we can move on
+    store.candles.add_candle(
+        real_candle, exchange, symbol, '1m',
+        with_execution=False,
+        with_generation=False
+    )
+    p = selectors.get_position(exchange, symbol)
+    if p:
+        p.current_price = real_candle[2]
+
     _check_for_liquidations(real_candle, exchange, symbol)
 
 
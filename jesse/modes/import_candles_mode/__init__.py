@@ -1,17 +1,17 @@
 import math
-import threading
-import time
 from typing import Dict, List, Any, Union
 
 import arrow
 import click
-import pydash
+import numpy as np
 
 import jesse.helpers as jh
 from jesse.exceptions import CandleNotFoundInExchange
 from jesse.models import Candle
 from jesse.modes.import_candles_mode.drivers import drivers
 from jesse.modes.import_candles_mode.drivers.interface import CandleExchange
+from jesse.modes.import_candles_mode.pipeline import ImportPipeline, TokenBucket, bucket_of
+from jesse.services.candle_coverage import chunk_starts, missing_ranges
 from jesse.services.db import store_candles
 
 
@@ -37,7 +37,6 @@ def run(exchange: str, symbol: str, start_date_str: str, skip_confirmation: bool
     until_date = arrow.utcnow().floor('day')
     start_date = arrow.get(start_timestamp / 1000)
     days_count = jh.date_diff_in_days(start_date, until_date)
-    candles_count = days_count * 1440
 
     try:
         driver: CandleExchange = drivers[exchange]()
@@ -46,166 +45,127 @@ def run(exchange: str, symbol: str, start_date_str: str, skip_confirmation: bool
     except TypeError:
         raise FileNotFoundError('You are missing the "plugins.py" file')
 
-    loop_length = int(candles_count / driver.count) + 1
     # ask for confirmation
     if not skip_confirmation:
         click.confirm(
             f'Importing {days_count} days candles from "{exchange}" for "{symbol}". Duplicates will be skipped. All good?', abort=True, default=True)
 
-    with click.progressbar(length=loop_length, label='Importing candles...') as progressbar:
-        for _ in range(candles_count):
-            temp_start_timestamp = start_date.int_timestamp * 1000
-            temp_end_timestamp = temp_start_timestamp + (driver.count - 1) * 60000
-
-            # to make sure it won't try to import candles from the future! LOL
-            if temp_start_timestamp > jh.now_to_timestamp():
-                break
-
-            # prevent duplicates calls to boost performance
-            count = Candle.select().where(
-                Candle.timestamp.between(temp_start_timestamp, temp_end_timestamp),
-                Candle.symbol == symbol,
-                Candle.exchange == exchange
-            ).count()
-            already_exists = count == driver.count
-
-            if not already_exists:
-                # it's today's candles if temp_end_timestamp < now
-                if temp_end_timestamp > jh.now_to_timestamp():
-                    temp_end_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
-
-                # fetch from market
-                candles = driver.fetch(symbol, temp_start_timestamp)
-
-                # check if candles have been returned and check those returned start with the right timestamp.
-                # Sometimes exchanges just return the earliest possible candles if the start date doesn't exist.
-                if not len(candles) or arrow.get(candles[0]['timestamp'] / 1000) > start_date:
-                    click.clear()
-                    first_existing_timestamp = driver.get_starting_time(symbol)
-
-                    # if driver can't provide accurate get_starting_time()
-                    if first_existing_timestamp is None:
-                        raise CandleNotFoundInExchange(
-                            f'No candles exists in the market for this day: {jh.timestamp_to_time(temp_start_timestamp)[:10]} \n'
-                            'Try another start_date'
-                        )
-
-                    # handle when there's missing candles during the period
-                    if temp_start_timestamp > first_existing_timestamp:
-                        # see if there are candles for the same date for the backup exchange,
-                        # if so, get those, if not, download from that exchange.
-                        if driver.backup_exchange is not None:
-                            candles = _get_candles_from_backup_exchange(
-                                exchange, driver.backup_exchange, symbol, temp_start_timestamp, temp_end_timestamp
-                            )
-
-                    else:
-                        if not skip_confirmation:
-                            print(jh.color(f'No candle exists in the market for {jh.timestamp_to_time(temp_start_timestamp)[:10]}\n', 'yellow'))
-                            click.confirm(
-                                f'First present candle is since {jh.timestamp_to_time(first_existing_timestamp)[:10]}. Would you like to continue?', abort=True, default=True)
-
-                        run(exchange, symbol, jh.timestamp_to_time(first_existing_timestamp)[:10], True)
-                        return
-
-                # fill absent candles (if there's any)
-                candles = _fill_absent_candles(candles, temp_start_timestamp, temp_end_timestamp)
-
-                # store in the database
-                if skip_confirmation:
-                    store_candles(candles)
-                else:
-                    threading.Thread(target=store_candles, args=[candles]).start()
-
-            # add as much as driver's count to the temp_start_time
-            start_date = start_date.shift(minutes=driver.count)
-
-            progressbar.update(1)
-
-            # sleep so that the exchange won't get angry at us
-            if not already_exists:
-                time.sleep(driver.sleep_time)
+    # only the ranges that aren't stored (by a previous or an interrupted import) are fetched
+    finish_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
+    ranges = missing_ranges(exchange, symbol, start_timestamp, finish_timestamp)
+    start_timestamps = chunk_starts(ranges, driver.count * 60_000)
+
+    bucket = bucket_of(driver)
+    # enough requests in flight to use up the rate limit while waiting for the responses
+    workers = min(int(jh.get_config('env.import_candles.max_workers', 8)),
+                  math.ceil(driver.rate_limit_per_second * 2))
+    pipeline = ImportPipeline(
+        lambda t: _fetch_chunk(driver, bucket, exchange, symbol, t),
+        store_candles,
+        workers=workers,
+        queue_size=int(jh.get_config('env.import_candles.write_queue_size', 10)),
+    )
+
+    first_existing_timestamp = None
+    with click.progressbar(length=len(start_timestamps), label='Importing candles...') as progressbar:
+        pipeline.on_stored = lambda _: progressbar.update(1)
+        try:
+            pipeline.run(start_timestamps)
+        except _StartsBeforeFirstCandle as e:
+            first_existing_timestamp = e.first_existing_timestamp
+
+    if first_existing_timestamp is not None:
+        click.clear()
+        if not skip_confirmation:
+            print(jh.color(f'No candle exists in the market for {jh.timestamp_to_time(start_timestamp)[:10]}\n', 'yellow'))
+            click.confirm(
+                f'First present candle is since {jh.timestamp_to_time(first_existing_timestamp)[:10]}. Would you like to continue?', abort=True, default=True)
+
+        run(exchange, symbol, jh.timestamp_to_time(first_existing_timestamp)[:10], True)
+
+
+class _StartsBeforeFirstCandle(Exception):
+    def __init__(self, first_existing_timestamp: int) -> None:
+        super().__init__(first_existing_timestamp)
+        self.first_existing_timestamp = first_existing_timestamp
+
+
+def _fetch_chunk(driver: CandleExchange, bucket: TokenBucket, exchange: str, symbol: str, start_timestamp: int) -> List[Dict[str, Union[str, Any]]]:
+    """
+    fetches the candles of the chunk starting at start_timestamp (runs on the workers of the pipeline)
+    """
+    end_timestamp = start_timestamp + (driver.count - 1) * 60000
+    # it's today's candles if end_timestamp < now
+    if end_timestamp > jh.now_to_timestamp():
+        end_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
+    if end_timestamp < start_timestamp:
+        return []
+
+    # fetch from market
+    bucket.acquire()
+    candles = driver.fetch(symbol, start_timestamp)
+
+    # check if candles have been returned and check those returned start with the right timestamp.
+    # Sometimes exchanges just return the earliest possible candles if the start date doesn't exist.
+    if not len(candles) or candles[0]['timestamp'] > start_timestamp:
+        bucket.acquire()
+        first_existing_timestamp = driver.get_starting_time(symbol)
+
+        # if driver can't provide accurate get_starting_time()
+        if first_existing_timestamp is None:
+            raise CandleNotFoundInExchange(
+                f'No candles exists in the market for this day: {jh.timestamp_to_time(start_timestamp)[:10]} \n'
+                'Try another start_date'
+            )
+
+        # handle when there's missing candles during the period
+        if start_timestamp > first_existing_timestamp:
+            # see if there are candles for the same date for the backup exchange,
+            # if so, get those, if not, download from that exchange.
+            if driver.backup_exchange is not None:
+                candles = _get_candles_from_backup_exchange(
+                    exchange, driver.backup_exchange, symbol, start_timestamp, end_timestamp
+                )
+        else:
+            # the import has to start from the first existing candle instead
+            raise _StartsBeforeFirstCandle(first_existing_timestamp)
+
+    # fill absent candles (if there's any)
+    return _fill_absent_candles(candles, start_timestamp, end_timestamp)
 
 
 def _get_candles_from_backup_exchange(exchange: str, backup_driver: CandleExchange, symbol: str, start_timestamp: int,
                                       end_timestamp: int) -> List[Dict[str, Union[str, Any]]]:
     total_candles = []
-    # try fetching from database first
-    backup_candles = Candle.select(
-        Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
-        Candle.volume
-    ).where(
-        Candle.timestamp.between(start_timestamp, end_timestamp),
-        Candle.exchange == backup_driver.name,
-        Candle.symbol == symbol).order_by(Candle.timestamp.asc()).tuples()
-    already_exists = len(backup_candles) == (end_timestamp - start_timestamp) / 60_000 + 1
-    if already_exists:
-        # loop through them and set new ID and exchange
-        for c in backup_candles:
-            total_candles.append({
-                'id': jh.generate_unique_id(),
-                'symbol': symbol,
-                'exchange': exchange,
-                'timestamp': c[0],
-                'open': c[1],
-                'close': c[2],
-                'high': c[3],
-                'low': c[4],
-                'volume': c[5]
-            })
-
-        return total_candles
-
-    # try fetching from market now
-    days_count = jh.date_diff_in_days(jh.timestamp_to_arrow(start_timestamp), jh.timestamp_to_arrow(end_timestamp))
-    # make sure it's rounded up so that we import maybe more candles, but not less
-    days_count = max(days_count, 1)
-    if type(days_count) is float and not days_count.is_integer():
-        days_count = math.ceil(days_count)
-    candles_count = days_count * 1440
-    start_date = jh.timestamp_to_arrow(start_timestamp).floor('day')
-    for _ in range(candles_count):
-        temp_start_timestamp = start_date.int_timestamp * 1000
+    # fetch only the ranges of the backup exchange that aren't stored already. Whole days are
+    # fetched so that the next requests (of the next chunks) will probably find them stored.
+    days_start_timestamp = jh.timestamp_to_arrow(start_timestamp).floor('day').int_timestamp * 1000
+    days_finish_timestamp = min(
+        jh.timestamp_to_arrow(end_timestamp).floor('day').shift(days=1).int_timestamp * 1000 - 60000,
+        arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
+    )
+    ranges = missing_ranges(backup_driver.name, symbol, days_start_timestamp, days_finish_timestamp)
+    for temp_start_timestamp in chunk_starts(ranges, backup_driver.count * 60_000):
         temp_end_timestamp = temp_start_timestamp + (backup_driver.count - 1) * 60000
+        # it's today's candles if temp_end_timestamp < now
+        if temp_end_timestamp > jh.now_to_timestamp():
+            temp_end_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
 
-        # to make sure it won't try to import candles from the future! LOL
-        if temp_start_timestamp > jh.now_to_timestamp():
-            break
-
-        # prevent duplicates
-        count = Candle.select().where(
-            Candle.timestamp.between(temp_start_timestamp, temp_end_timestamp),
-            Candle.symbol == symbol,
-            Candle.exchange == backup_driver.name
-        ).count()
-        already_exists = count == backup_driver.count
-
-        if not already_exists:
-            # it's today's candles if temp_end_timestamp < now
-            if temp_end_timestamp > jh.now_to_timestamp():
-                temp_end_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
-
-            # fetch from market
-            candles = backup_driver.fetch(symbol, temp_start_timestamp)
-
-            if not len(candles):
-                raise CandleNotFoundInExchange(
-                    f'No candles exists in the market for this day: {jh.timestamp_to_time(temp_start_timestamp)[:10]} \n'
-                    'Try another start_date'
-                )
-
-            # fill absent candles (if there's any)
-            candles = _fill_absent_candles(candles, temp_start_timestamp, temp_end_timestamp)
+        # fetch from market (the workers of the pipeline share the rate limit of the backup exchange)
+        bucket_of(backup_driver).acquire()
+        candles = backup_driver.fetch(symbol, temp_start_timestamp)
 
-            # store in the database
-            store_candles(candles)
+        if not len(candles):
+            raise CandleNotFoundInExchange(
+                f'No candles exists in the market for this day: {jh.timestamp_to_time(temp_start_timestamp)[:10]} \n'
+                'Try another start_date'
+            )
 
-        # add as much as driver's count to the temp_start_time
-        start_date = start_date.shift(minutes=backup_driver.count)
+        # fill absent candles (if there's any)
+        candles = _fill_absent_candles(candles, temp_start_timestamp, temp_end_timestamp)
 
-        # sleep so that the exchange won't get angry at us
-        if not already_exists:
-            time.sleep(backup_driver.sleep_time)
+        # store in the database
+        store_candles(candles)
 
     # now try fetching from database again. Why? because we might have fetched more
     # than what's needed, but we only want as much was requested. Don't worry, the next
@@ -237,6 +197,11 @@ def _get_candles_from_backup_exchange(exchange: str, backup_driver: CandleExchan
 
 
 def _fill_absent_candles(temp_candles: List[Dict[str, Union[str, Any]]], start_timestamp: int, end_timestamp: int) -> List[Dict[str, Union[str, Any]]]:
+    """
+    returns a candle for each minute between start_timestamp and end_timestamp (both included):
+    the fetched one if there is one, or else a filler candle with no volume whose prices are the
+    close of the latest fetched candle before it (or the open of the first fetched candle)
+    """
     if not temp_candles:
         raise CandleNotFoundInExchange(
             f'No candles exists in the market for this day: {jh.timestamp_to_time(start_timestamp)[:10]} \n'
@@ -245,47 +210,52 @@ def _fill_absent_candles(temp_candles: List[Dict[str, Union[str, Any]]], start_t
 
     symbol = temp_candles[0]['symbol']
     exchange = temp_candles[0]['exchange']
+    timestamps = np.fromiter((c['timestamp'] for c in temp_candles), dtype=np.int64, count=len(temp_candles))
+    closes = np.fromiter((c['close'] for c in temp_candles), dtype=np.float64, count=len(temp_candles))
+
+    index = _index_of_each_minute(timestamps, start_timestamp, end_timestamp)
+    prices = _filler_prices(index, closes, temp_candles[0]['open'])
+
     candles = []
-    first_candle = temp_candles[0]
-    started = False
-    loop_length = ((end_timestamp - start_timestamp) / 60000) + 1
-
-    for _ in range(int(loop_length)):
-        candle_for_timestamp = pydash.find(
-            temp_candles, lambda c: c['timestamp'] == start_timestamp)
-
-        if candle_for_timestamp is None:
-            if started:
-                last_close = candles[-1]['close']
-                candles.append({
-                    'id': jh.generate_unique_id(),
-                    'symbol': symbol,
-                    'exchange': exchange,
-                    'timestamp': start_timestamp,
-                    'open': last_close,
-                    'high': last_close,
-                    'low': last_close,
-                    'close': last_close,
-                    'volume': 0
-                })
-            else:
-                candles.append({
-                    'id': jh.generate_unique_id(),
-                    'symbol': symbol,
-                    'exchange': exchange,
-                    'timestamp': start_timestamp,
-                    'open': first_candle['open'],
-                    'high': first_candle['open'],
-                    'low': first_candle['open'],
-                    'close': first_candle['open'],
-                    'volume': 0
-                })
+    for i, (candle_index, price) in enumerate(zip(index.tolist(), prices.tolist())):
         # candle is present
+        if candle_index >= 0:
+            candles.append(temp_candles[candle_index])
         else:
-            started = True
-            candles.append(candle_for_timestamp)
-
-        start_timestamp += 60000
+            candles.append({
+                'id': jh.generate_unique_id(),
+                'symbol': symbol,
+                'exchange': exchange,
+                'timestamp': start_timestamp + i * 60000,
+                'open': price,
+                'high': price,
+                'low': price,
+                'close': price,
+                'volume': 0
+            })
     return candles
 
 
+def _index_of_each_minute(timestamps: np.ndarray, start_timestamp: int, end_timestamp: int) -> np.ndarray:
+    """
+    returns the index in timestamps of the candle of each minute between start_timestamp and
+    end_timestamp (both included), or -1 for the absent ones. The first one of duplicates is used.
+    """
+    count = max(int((end_timestamp - start_timestamp) // 60000) + 1, 0)
+    index = np.full(count, -1, dtype=np.int64)
+
+    offsets = timestamps - int(start_timestamp)
+    in_range = np.flatnonzero((offsets >= 0) & (offsets % 60000 == 0) & (offsets < count * 60000))
+    minutes, first = np.unique(offsets[in_range] // 60000, return_index=True)
+    index[minutes] = in_range[first]
+    return index
+
+
+def _filler_prices(index: np.ndarray, closes: np.ndarray, first_open: float) -> np.ndarray:
+    """
+    returns the price of a filler candle at each minute: the close of the latest present candle
+    up to that minute, or first_open if there's none yet
+    """
+    positions = np.arange(len(index))
+    latest_present = np.maximum.accumulate(np.where(index >= 0, positions, -1)) if len(index) else positions
+    return np.where(latest_present >= 0, closes[index[latest_present]], first_open)
@@ -0,0 +1,145 @@
+"""
+Imports the chunks of candles with several requests in flight at once instead of one
+after the other, while making no more requests per second than each exchange allows.
+
+Fetching and storing are separate stages: a pool of fetch workers pushes the fetched
+chunks to a bounded queue which a single writer thread stores from. When the database
+falls behind, the workers wait for room in the queue instead of piling candles up in
+memory.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+
+# tells the writer that there is nothing more to store
+_DONE = object()
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, and bursts of up to `capacity`.
+    It's thread-safe: acquire() blocks the calling thread until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_of(driver) -> TokenBucket:
+    """
+    returns the token bucket of the driver's exchange, which is shared by all the imports of the process
+    """
+    with _buckets_lock:
+        if driver.name not in _buckets:
+            _buckets[driver.name] = TokenBucket(driver.rate_limit_per_second)
+        return _buckets[driver.name]
+
+
+class ImportPipeline:
+    """
+    Runs fetch_chunk(start_timestamp) for each chunk on `workers` threads and passes the
+    candles it returns to store() on a writer thread, with at most `queue_size` fetched
+    chunks waiting to be stored.
+
+    The first error of a worker or of the writer stops the fetching and is raised by run(),
+    after the chunks that were already fetched are stored, so that a next import can resume
+    from where this one stopped.
+    """
+
+    def __init__(self, fetch_chunk: Callable[[int], list], store: Callable[[list], None], workers: int,
+                 queue_size: int, on_stored: Callable[[int], None] = None) -> None:
+        self.fetch_chunk = fetch_chunk
+        self.store = store
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.on_stored = on_stored
+        self._error = None
+        self._error_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self, start_timestamps: List[int]) -> None:
+        chunks = queue.Queue()
+        for start_timestamp in start_timestamps:
+            chunks.put(start_timestamp)
+        fetched = queue.Queue(maxsize=self.queue_size)
+
+        writer = threading.Thread(target=self._write, args=(fetched,), daemon=True)
+        writer.start()
+        fetchers = [
+            threading.Thread(target=self._fetch, args=(chunks, fetched), daemon=True)
+            for _ in range(min(self.workers, len(start_timestamps)))
+        ]
+        for t in fetchers:
+            t.start()
+        for t in fetchers:
+            t.join()
+
+        fetched.put(_DONE)
+        writer.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def _fetch(self, chunks: queue.Queue, fetched: queue.Queue) -> None:
+        while not self._stopped.is_set():
+            try:
+                start_timestamp = chunks.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                candles = self.fetch_chunk(start_timestamp)
+            except Exception as e:
+                self._fail(e)
+                return
+
+            if candles:
+                # blocks while the queue is full (the writer keeps taking from it until the end)
+                fetched.put(candles)
+
+    def _write(self, fetched: queue.Queue) -> None:
+        failed = False
+        while True:
+            candles = fetched.get()
+            if candles is _DONE:
+                return
+            # after a failure, keep draining the queue so that the workers don't wait on it forever
+            if failed:
+                continue
+
+            try:
+                self.store(candles)
+            except Exception as e:
+                self._fail(e)
+                failed = True
+                continue
+
+            if self.on_stored is not None:
+                self.on_stored(len(candles))
+
+    def _fail(self, error: Exception) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stopped.set()
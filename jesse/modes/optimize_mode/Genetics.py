@@ -9,7 +9,8 @@ from typing import Dict, Union, Any, List
 
 if sys.platform == 'darwin':
     multiprocessing.set_start_method('fork')
-from multiprocessing import Process, Manager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 import click
 import numpy as np
@@ -41,6 +42,9 @@ class Genetics(ABC):
         self.charset = charset
         self.fitness_goal = fitness_goal
         self.cpu_cores = 0
+        self._pool = None
+        # optional FitnessCache; set by subclasses that can decode DNAs
+        self.fitness_cache = None
 
         self.options = {} if options is None else options
         os.makedirs('./storage/temp/optimize', exist_ok=True)
@@ -68,63 +72,23 @@ class Genetics(ABC):
         """
         loop_length = int(self.population_size / self.cpu_cores)
 
+        # the number of different DNAs there are (e.g. only len(charset) for one hyperparameter)
+        dnas_count = len(self.charset) ** self.solution_len
+
         with click.progressbar(length=loop_length, label='Generating initial population...') as progressbar:
             for i in range(loop_length):
-                people = []
-                with Manager() as manager:
-                    dna_bucket = manager.list([])
-                    workers = []
-
-                    def get_fitness(dna: str, dna_bucket: list) -> None:
-                        try:
-                            # check if the DNA is already in the list
-                            if all(dna_tuple[0] != dna for dna_tuple in dna_bucket):
-                                fitness_score, fitness_log_training, fitness_log_testing = self.fitness(dna)
-                                dna_bucket.append((dna, fitness_score, fitness_log_training, fitness_log_testing))
-                            else:
-                                raise ValueError(f"Initial Population: Double DNA: {dna}")
-                        except Exception as e:
-                            proc = os.getpid()
-                            logger.error(f'process failed - ID: {str(proc)}')
-                            logger.error("".join(traceback.TracebackException.from_exception(e).format()))
-                            raise e
-
-                    try:
-                        for _ in range(self.cpu_cores):
-                            dna = ''.join(choices(self.charset, k=self.solution_len))
-                            w = Process(target=get_fitness, args=(dna, dna_bucket))
-                            w.start()
-                            workers.append(w)
-
-                        # join workers
-                        for w in workers:
-                            w.join()
-                            if w.exitcode > 0:
-                                logger.error(f'a process exited with exitcode: {str(w.exitcode)}')
-                    except KeyboardInterrupt:
-                        print(
-                            jh.color('Terminating session...', 'red')
-                        )
-
-                        # terminate all workers
-                        for w in workers:
-                            w.terminate()
-
-                        # shutdown the manager process manually since garbage collection cannot won't get to do it for us
-                        manager.shutdown()
-
-                        # now we can terminate the main session safely
-                        jh.terminate_app()
-                    except:
-                        raise
-
-                    for d in dna_bucket:
-                        people.append({
-                            'dna': d[0],
-                            'fitness': d[1],
-                            'training_log': d[2],
-                            'testing_log': d[3]
-                        })
+                # random DNAs that are not in the population already, as long as there are any left
+                existing = {p['dna'] for p in self.population}
+                wanted = min(self.cpu_cores, dnas_count - len(existing))
+                if wanted <= 0:
+                    break
+                dnas = set()
+                while len(dnas) < wanted:
+                    dna = ''.join(choices(self.charset, k=self.solution_len))
+                    if dna not in existing:
+                        dnas.add(dna)
+
+                people = self._evaluate_dnas(list(dnas))
 
                 # update dashboard
                 click.clear()
@@ -142,6 +106,8 @@ class Genetics(ABC):
                     # ['fitness', round(people[0]['fitness'], 6)],
                     # ['training|testing logs', people[0]['log']],
                 ]
+                if self.fitness_cache is not None:
+                    table_items.insert(3, ['Fitness cache hits', self._fitness_cache_stats()])
                 if jh.is_debugging():
                     table_items.insert(3, ['Population Size', self.population_size])
                     table_items.insert(3, ['Iterations', self.iterations])
@@ -161,48 +127,130 @@ class Genetics(ABC):
         # sort the population
         self.population = list(sorted(self.population, key=lambda x: x['fitness'], reverse=True))
 
-    def mutate(self, baby: Dict[str, Union[str, Any]]) -> Dict[str, Union[str, Any]]:
+    def mutate(self, dna: str) -> str:
         replace_at = randint(0, self.solution_len - 1)
         replace_with = choice(self.charset)
-        dna = f"{baby['dna'][:replace_at]}{replace_with}{baby['dna'][replace_at + 1:]}"
+        return f"{dna[:replace_at]}{replace_with}{dna[replace_at + 1:]}"
 
-        try:
-            # check if already exists and then return it
-            return next(item for item in self.population if item["dna"] == dna)
-        except StopIteration:
-            # not found - so run the backtest
-            fitness_score, fitness_log_training, fitness_log_testing = self.fitness(dna)
-
-        return {
-            'dna': dna,
-            'fitness': fitness_score,
-            'training_log': fitness_log_training,
-            'testing_log': fitness_log_testing
-        }
-
-    def make_love(self) -> Dict[str, Union[str, Any]]:
+    def make_love(self) -> str:
         mommy = self.select_person()
         daddy = self.select_person()
 
-        dna = ''.join(
+        return ''.join(
             daddy['dna'][i] if i % 2 == 0 else mommy['dna'][i]
             for i in range(self.solution_len)
         )
 
+    def _evaluate_dnas(self, dnas: List[str]) -> List[Dict[str, Union[str, Any]]]:
+        """
+        returns people of the DNAs. Fitness of the DNAs that are neither in the population
+        nor in the fitness cache is calculated by the worker pool, and streamed back as
+        they get ready.
+        """
+        people = []
+        new_dnas = []
+        # DNAs of the batch that decode to the same thing as one of new_dnas
+        duplicates = {}
+        for dna in dnas:
+            try:
+                # check if already exists and then use it
+                people.append(next(item for item in self.population if item["dna"] == dna))
+                continue
+            except StopIteration:
+                pass
+
+            if self.fitness_cache is None:
+                new_dnas.append(dna)
+                continue
+
+            cached = self.fitness_cache.get(dna)
+            if cached is not None:
+                people.append(self._make_person(dna, *cached))
+                continue
+
+            key = self.fitness_cache.key(dna)
+            if key in duplicates:
+                duplicates[key].append(dna)
+            else:
+                duplicates[key] = []
+                new_dnas.append(dna)
+
+        futures = []
         try:
-            # check if already exists and then return it
-            return next(item for item in self.population if item["dna"] == dna)
-        except StopIteration:
-            # not found - so run the backtest
-            fitness_score, fitness_log_training, fitness_log_testing = self.fitness(dna)
-
+            pool = self._get_pool()
+            futures = [pool.submit(_evaluate_dna, dna) for dna in new_dnas]
+            for future in as_completed(futures):
+                try:
+                    res = future.result()
+                except BrokenProcessPool:
+                    # a worker died (e.g. exited or got killed) so the DNAs that were not
+                    # evaluated yet are lost, like the ones of failed backtests
+                    if self._pool is pool:
+                        logger.error('a process of the optimizer pool exited abruptly')
+                        pool.shutdown(wait=False)
+                        self._pool = None
+                    continue
+
+                # the backtest failed (it is logged by the worker)
+                if res is None:
+                    continue
+
+                people.append(self._make_person(*res))
+
+                if self.fitness_cache is not None:
+                    self.fitness_cache.set(res[0], res[1:])
+                    for dna in duplicates[self.fitness_cache.key(res[0])]:
+                        people.append(self._make_person(dna, *res[1:]))
+        except KeyboardInterrupt:
+            print(
+                jh.color('Terminating session...', 'red')
+            )
+
+            # stop all workers
+            for future in futures:
+                future.cancel()
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+
+            # now we can terminate the main session safely
+            jh.terminate_app()
+
+        if self.fitness_cache is not None:
+            self.fitness_cache.save()
+
+        return people
+
+    @staticmethod
+    def _make_person(dna: str, fitness: float, training_log: dict, testing_log: dict) -> Dict[str, Union[str, Any]]:
         return {
             'dna': dna,
-            'fitness': fitness_score,
-            'training_log': fitness_log_training,
-            'testing_log': fitness_log_testing
+            'fitness': fitness,
+            'training_log': training_log,
+            'testing_log': testing_log
         }
 
+    def _fitness_cache_stats(self) -> str:
+        return f'{self.fitness_cache.hits}/{self.fitness_cache.hits + self.fitness_cache.misses} ' \
+               f'({round(self.fitness_cache.hit_rate * 100, 1)}%)'
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Workers are forked once and kept alive for the whole session, so they inherit the
+        already loaded candles and don't pay for a new process on every evaluation. If a
+        worker dies, the pool is broken and a new one is made on the next call.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.cpu_cores, mp_context=multiprocessing.get_context('fork'),
+                initializer=_init_worker, initargs=(self,)
+            )
+        return self._pool
+
+    def _close_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
     def select_person(self) -> Dict[str, Union[str, Any]]:
         # len(self.population) instead of self.population_size because some DNAs might not have been created due errors
         random_index = np.random.choice(len(self.population), int(len(self.population) / 100), replace=False)
@@ -231,158 +279,122 @@ class Genetics(ABC):
         i = self.started_index
         with click.progressbar(length=loop_length, label='Evolving...') as progressbar:
             while i < loop_length:
-                with Manager() as manager:
-                    people = manager.list([])
-                    workers = []
-
-                    def get_baby(people: List) -> None:
-                        try:
-                            # let's make a baby together LOL
-                            baby = self.make_love()
-                            # let's mutate baby's genes, who knows, maybe we create a x-man or something
-                            baby = self.mutate(baby)
-                            people.append(baby)
-                        except Exception as e:
-                            proc = os.getpid()
-                            logger.error(f'process failed - ID: {str(proc)}')
-                            logger.error("".join(traceback.TracebackException.from_exception(e).format()))
-                            raise e
+                # let's make babies together LOL, and mutate their genes, who knows, maybe we create a x-man or something
+                people = self._evaluate_dnas([self.mutate(self.make_love()) for _ in range(self.cpu_cores)])
 
-                    try:
-                        for _ in range(self.cpu_cores):
-                            w = Process(target=get_baby, args=[people])
-                            w.start()
-                            workers.append(w)
-
-                        for w in workers:
-                            w.join()
-                            if w.exitcode > 0:
-                                logger.error(f'a process exited with exitcode: {str(w.exitcode)}')
-                    except KeyboardInterrupt:
-                        print(
-                            jh.color('Terminating session...', 'red')
-                        )
+                # update dashboard
+                click.clear()
+                progressbar.update(1)
+                print('\n')
 
-                        # terminate all workers
-                        for w in workers:
-                            w.terminate()
+                table_items = [
+                    ['Started At', jh.timestamp_to_arrow(self.start_time).humanize()],
+                    ['Index/Total', f'{(i + 1) * self.cpu_cores}/{self.iterations}'],
+                    ['errors/info', f'{len(store.logs.errors)}/{len(store.logs.info)}'],
+                    ['Route', f'{router.routes[0].exchange}, {router.routes[0].symbol}, {router.routes[0].timeframe}, {router.routes[0].strategy_name}']
+                ]
+                if self.fitness_cache is not None:
+                    table_items.insert(3, ['Fitness cache hits', self._fitness_cache_stats()])
+                if jh.is_debugging():
+                    table_items.insert(
+                        3,
+                        ['Population Size, Solution Length',
+                         f'{self.population_size}, {self.solution_len}']
+                    )
 
-                        # shutdown the manager process manually since garbage collection cannot won't get to do it for us
-                        manager.shutdown()
+                table.key_value(table_items, 'info', alignments=('left', 'right'))
 
-                        # now we can terminate the main session safely
-                        jh.terminate_app()
-                    except:
-                        raise
-
-                    # update dashboard
-                    click.clear()
-                    progressbar.update(1)
+                # errors
+                if jh.is_debugging() and len(report.errors()):
                     print('\n')
+                    table.key_value(report.errors(), 'Error Logs')
 
-                    table_items = [
-                        ['Started At', jh.timestamp_to_arrow(self.start_time).humanize()],
-                        ['Index/Total', f'{(i + 1) * self.cpu_cores}/{self.iterations}'],
-                        ['errors/info', f'{len(store.logs.errors)}/{len(store.logs.info)}'],
-                        ['Route', f'{router.routes[0].exchange}, {router.routes[0].symbol}, {router.routes[0].timeframe}, {router.routes[0].strategy_name}']
-                    ]
+                print('\n')
+                print('Best DNA candidates:')
+                print('\n')
+
+                # print fittest individuals
+                if jh.is_debugging():
+                    fittest_list = [['Rank', 'DNA', 'Fitness', 'Training log || Testing log'], ]
+                else:
+                    fittest_list = [['Rank', 'DNA', 'Training log || Testing log'], ]
+                if self.population_size > 50:
+                    number_of_ind_to_show = 15
+                elif self.population_size > 20:
+                    number_of_ind_to_show = 10
+                elif self.population_size > 9:
+                    number_of_ind_to_show = 9
+                else:
+                    raise ValueError('self.population_size cannot be less than 10')
+
+                for j in range(number_of_ind_to_show):
+                    log = f"win-rate: {self.population[j]['training_log']['win-rate']}%, total: {self.population[j]['training_log']['total']}, PNL: {self.population[j]['training_log']['PNL']}% || win-rate: {self.population[j]['testing_log']['win-rate']}%, total: {self.population[j]['testing_log']['total']}, PNL: {self.population[j]['testing_log']['PNL']}%"
+                    if self.population[j]['testing_log']['PNL'] is not None and self.population[j]['training_log'][
+                        'PNL'] > 0 and self.population[j]['testing_log'][
+                        'PNL'] > 0:
+                        log = jh.style(log, 'bold')
                     if jh.is_debugging():
-                        table_items.insert(
-                            3,
-                            ['Population Size, Solution Length',
-                             f'{self.population_size}, {self.solution_len}']
+                        fittest_list.append(
+                            [
+                                j + 1,
+                                self.population[j]['dna'],
+                                self.population[j]['fitness'],
+                                log
+                            ],
+                        )
+                    else:
+                        fittest_list.append(
+                            [
+                                j + 1,
+                                self.population[j]['dna'],
+                                log
+                            ],
                         )
 
-                    table.key_value(table_items, 'info', alignments=('left', 'right'))
+                if jh.is_debugging():
+                    table.multi_value(fittest_list, with_headers=True, alignments=('left', 'left', 'right', 'left'))
+                else:
+                    table.multi_value(fittest_list, with_headers=True, alignments=('left', 'left', 'left'))
+
+                # one person has to die and be replaced with the newborn baby
+                for baby in people:
+                    random_index = randint(1, len(self.population) - 1)  # never kill our best perforemr
+                    try:
+                        self.population[random_index] = baby
+                    except IndexError:
+                        print('=============')
+                        print(f'self.population_size: {self.population_size}')
+                        print(f'self.population length: {len(self.population)}')
+                        jh.terminate_app()
+
+                    self.population = list(sorted(self.population, key=lambda x: x['fitness'], reverse=True))
 
-                    # errors
-                    if jh.is_debugging() and len(report.errors()):
+                    # reaching the fitness goal could also end the process
+                    if baby['fitness'] >= self.fitness_goal:
+                        progressbar.update(self.iterations - i)
                         print('\n')
-                        table.key_value(report.errors(), 'Error Logs')
+                        print(f'fitness goal reached after iteration {i}')
+                        return baby
 
-                    print('\n')
-                    print('Best DNA candidates:')
-                    print('\n')
+                # save progress after every n iterations
+                if i != 0 and int(i * self.cpu_cores) % 50 == 0:
+                    self.save_progress(i)
 
-                    # print fittest individuals
-                    if jh.is_debugging():
-                        fittest_list = [['Rank', 'DNA', 'Fitness', 'Training log || Testing log'], ]
-                    else:
-                        fittest_list = [['Rank', 'DNA', 'Training log || Testing log'], ]
-                    if self.population_size > 50:
-                        number_of_ind_to_show = 15
-                    elif self.population_size > 20:
-                        number_of_ind_to_show = 10
-                    elif self.population_size > 9:
-                        number_of_ind_to_show = 9
-                    else:
-                        raise ValueError('self.population_size cannot be less than 10')
-
-                    for j in range(number_of_ind_to_show):
-                        log = f"win-rate: {self.population[j]['training_log']['win-rate']}%, total: {self.population[j]['training_log']['total']}, PNL: {self.population[j]['training_log']['PNL']}% || win-rate: {self.population[j]['testing_log']['win-rate']}%, total: {self.population[j]['testing_log']['total']}, PNL: {self.population[j]['testing_log']['PNL']}%"
-                        if self.population[j]['testing_log']['PNL'] is not None and self.population[j]['training_log'][
-                            'PNL'] > 0 and self.population[j]['testing_log'][
-                            'PNL'] > 0:
-                            log = jh.style(log, 'bold')
-                        if jh.is_debugging():
-                            fittest_list.append(
-                                [
-                                    j + 1,
-                                    self.population[j]['dna'],
-                                    self.population[j]['fitness'],
-                                    log
-                                ],
-                            )
-                        else:
-                            fittest_list.append(
-                                [
-                                    j + 1,
-                                    self.population[j]['dna'],
-                                    log
-                                ],
-                            )
+                # store a take_snapshot of the fittest individuals of the population
+                if i != 0 and i % int(100 / self.cpu_cores) == 0:
+                    self.take_snapshot(i * self.cpu_cores)
 
-                    if jh.is_debugging():
-                        table.multi_value(fittest_list, with_headers=True, alignments=('left', 'left', 'right', 'left'))
-                    else:
-                        table.multi_value(fittest_list, with_headers=True, alignments=('left', 'left', 'left'))
-
-                    # one person has to die and be replaced with the newborn baby
-                    for baby in people:
-                        random_index = randint(1, len(self.population) - 1)  # never kill our best perforemr
-                        try:
-                            self.population[random_index] = baby
-                        except IndexError:
-                            print('=============')
-                            print(f'self.population_size: {self.population_size}')
-                            print(f'self.population length: {len(self.population)}')
-                            jh.terminate_app()
-
-                        self.population = list(sorted(self.population, key=lambda x: x['fitness'], reverse=True))
-
-                        # reaching the fitness goal could also end the process
-                        if baby['fitness'] >= self.fitness_goal:
-                            progressbar.update(self.iterations - i)
-                            print('\n')
-                            print(f'fitness goal reached after iteration {i}')
-                            return baby
-
-                    # save progress after every n iterations
-                    if i != 0 and int(i * self.cpu_cores) % 50 == 0:
-                        self.save_progress(i)
-
-                    # store a take_snapshot of the fittest individuals of the population
-                    if i != 0 and i % int(100 / self.cpu_cores) == 0:
-                        self.take_snapshot(i * self.cpu_cores)
-
-                    i += 1
+                i += 1
 
         print('\n\n')
         print(f'Finished {self.iterations} iterations.')
         return self.population
 
     def run(self) -> List[Any]:
-        return self.evolve()
+        try:
+            return self.evolve()
+        finally:
+            self._close_pool()
 
     def save_progress(self, iterations_index: int) -> None:
         """
@@ -480,3 +492,26 @@ class Genetics(ABC):
                     file.seek(0)
                     json.dump(data, file, ensure_ascii=False)
                 file.write('\n')
+
+
+# the Genetics instance of the worker process (set once when the worker starts)
+_genetics: Genetics = None
+
+
+def _init_worker(genetics: Genetics) -> None:
+    global _genetics
+    _genetics = genetics
+
+
+def _evaluate_dna(dna: str) -> Union[tuple, None]:
+    try:
+        fitness_score, fitness_log_training, fitness_log_testing = _genetics.fitness(dna)
+        return dna, fitness_score, fitness_log_training, fitness_log_testing
+    except KeyboardInterrupt:
+        raise
+    # SystemExit too, which would kill the worker otherwise
+    except BaseException as e:
+        proc = os.getpid()
+        logger.error(f'process failed - ID: {str(proc)}')
+        logger.error("".join(traceback.TracebackException.from_exception(e).format()))
+        return None
@@ -1,3 +1,4 @@
+import inspect
 import os
 from math import log10
 from multiprocessing import cpu_count
@@ -17,6 +18,7 @@ from jesse.services import metrics as stats
 from jesse.services.validators import validate_routes
 from jesse.store import store
 from .Genetics import Genetics
+from .fitness_cache import FitnessCache
 
 os.environ['NUMEXPR_MAX_THREADS'] = str(cpu_count())
 
@@ -67,6 +69,10 @@ class Optimizer(Genetics):
         self.training_candles = training_candles
         self.testing_candles = testing_candles
 
+        # rules for giving up on hopeless DNAs before their training backtest is finished
+        early_termination = jh.get_config('env.optimization.early_termination') or {}
+        self.early_termination = {k: v for k, v in early_termination.items() if v is not None}
+
         key = jh.key(self.exchange, self.symbol)
         training_candles_start_date = jh.timestamp_to_time(self.training_candles[key]['candles'][0][0]).split('T')[0]
         training_candles_finish_date = jh.timestamp_to_time(self.training_candles[key]['candles'][-1][0]).split('T')[0]
@@ -84,7 +90,30 @@ class Optimizer(Genetics):
                 required_candles.load_required_candles(c[0], c[1], testing_candles_start_date,
                                                        testing_candles_finish_date))
 
+        # anything that could change the score of the same hyperparameters is part of the identity
+        with open(inspect.getfile(StrategyClass), 'rb') as f:
+            strategy_source = f.read()
+        self.fitness_cache = FitnessCache('./storage/temp/optimize/fitness/', self.strategy_hp, {
+            'strategy_name': self.strategy_name,
+            'strategy_source': jh.insecure_hash(strategy_source.decode(errors='replace')),
+            'route': (self.exchange, self.symbol, self.timeframe),
+            'considering_candles': tuple(tuple(c) for c in config['app']['considering_candles']),
+            'training_candles': (int(self.training_candles[key]['candles'][0][0]),
+                                 int(self.training_candles[key]['candles'][-1][0])),
+            'testing_candles': (int(self.testing_candles[key]['candles'][0][0]),
+                                int(self.testing_candles[key]['candles'][-1][0])),
+            'optimal_total': self.optimal_total,
+            'ratio': jh.get_config('env.optimization.ratio', 'sharpe'),
+            'exchange_config': repr(jh.get_config(f'env.exchanges.{self.exchange}')),
+            'warmup_candles_num': jh.get_config('env.data.warmup_candles_num', 240),
+            'early_termination': tuple(sorted(self.early_termination.items())),
+        })
+
     def fitness(self, dna: str) -> tuple:
+        cached = self.fitness_cache.get(dna)
+        if cached is not None:
+            return cached
+
         hp = jh.dna_to_hp(self.strategy_hp, dna)
 
         # init candle store
@@ -98,14 +127,18 @@ class Optimizer(Genetics):
                 c[1]
             )
 
-        # run backtest simulation
-        simulator(self.training_candles, hp)
-
         training_log = {'win-rate': None, 'total': None,
                         'PNL': None}
         testing_log = {'win-rate': None, 'total': None,
                        'PNL': None}
 
+        # run backtest simulation
+        try:
+            simulator(self.training_candles, hp, early_termination=self.early_termination)
+        except exceptions.EarlyTermination:
+            store.reset()
+            return 0.0001, training_log, testing_log
+
         # TODO: some of these have to be dynamic based on how many days it's trading for like for example "total"
         # I'm guessing we should accept "optimal" total from command line
         if store.completed_trades.count > 5:
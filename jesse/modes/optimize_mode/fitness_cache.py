@@ -0,0 +1,69 @@
+import os
+import pickle
+from typing import Any, Dict, List, Union
+
+import jesse.helpers as jh
+
+
+class FitnessCache:
+    """
+    Persistent cache of fitness results of the optimize mode.
+
+    Many different DNAs decode into the same hyperparameters, so results are keyed by
+    the decoded hyperparameters rather than the DNA itself. Each cache file belongs to
+    one "session identity" (strategy, its source code, route, candle ranges and the
+    configs affecting the score), so results are reused across generations and resumed
+    sessions but never between sessions that could score differently.
+    """
+
+    def __init__(self, path: str, strategy_hp: List[Dict[str, Any]], identity: Dict[str, Any]) -> None:
+        self.strategy_hp = strategy_hp
+        self.hits = 0
+        self.misses = 0
+        self.db = {}
+        self._unsaved = 0
+
+        os.makedirs(path, exist_ok=True)
+        self.path = f'{path}{jh.insecure_hash(repr(sorted(identity.items())))}.pickle'
+
+        if jh.file_exists(self.path):
+            try:
+                with open(self.path, 'rb') as f:
+                    self.db = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                # corrupted file; it's just a cache
+                self.db = {}
+
+    def key(self, dna: str) -> tuple:
+        return tuple(sorted(jh.dna_to_hp(self.strategy_hp, dna).items()))
+
+    def get(self, dna: str) -> Union[tuple, None]:
+        """
+        returns the cached (score, training_log, testing_log) of the DNA or None
+        """
+        result = self.db.get(self.key(dna))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def set(self, dna: str, result: tuple) -> None:
+        self.db[self.key(dna)] = result
+        self._unsaved += 1
+
+    def save(self) -> None:
+        if not self._unsaved:
+            return
+
+        # write to a temp file first so an interrupted session can't corrupt the cache
+        temp_path = f'{self.path}.{os.getpid()}'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(self.db, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self._unsaved = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
@@ -1,5 +1,5 @@
 from .get_candles import get_candles
-from jesse.services.db import store_candles as store_candles_from_list
+from jesse.services.db import store_candles_array
 import jesse.helpers as jh
 import numpy as np
 
@@ -30,16 +30,4 @@ def init() -> None:
 
 
 def store_candles(candles: np.ndarray, exchange: str, symbol: str) -> None:
-    arr = [{
-            'id': jh.generate_unique_id(),
-            'symbol': symbol,
-            'exchange': exchange,
-            'timestamp': c[0],
-            'open': c[1],
-            'close': c[2],
-            'high': c[3],
-            'low': c[4],
-            'volume': c[5]
-        } for c in candles]
-
-    store_candles_from_list(arr)
+    store_candles_array(candles, exchange, symbol)
@@ -1,174 +1,180 @@
 import os
 import pickle
+from bisect import bisect_right
 from time import time
-from typing import Any
+from typing import Union
 from functools import lru_cache
 
+import numpy as np
+
 import jesse.helpers as jh
 
 
 class Cache:
+    """
+    Range-aware cache of 1m candles.
+
+    Candles of each exchange-symbol pair are kept as contiguous numpy arrays (one .npy
+    file per covered interval). An index of the covered intervals is kept sorted by
+    their start so that any sub-range of a cached interval can be found with a binary
+    search and sliced out of a memory-mapped file. Overlapping and adjacent intervals
+    are merged on write, and the least recently used intervals are evicted when the
+    cache grows larger than env.caching.max_size_mb.
+    """
+
     def __init__(self, path: str) -> None:
         self.path = path
-        self.driver = jh.get_config('env.caching.driver', 'pickle')
+        self.driver = jh.get_config('env.caching.driver', 'numpy')
+        self.db = {}
 
-        if self.driver == 'pickle':
+        if self.driver is not None:
             # make sure path exists
             os.makedirs(path, exist_ok=True)
+            self._load_db()
 
-            # if cache_database exists, load the dictionary
-            if os.path.isfile(f"{self.path}cache_database.pickle"):
-                with open(f"{self.path}cache_database.pickle", 'rb') as f:
-                    self.db = pickle.load(f)
-            # if not, create a dict object. We'll create the file when using set_value()
-            else:
-                self.db = {}
-
-    def set_value(self, key: str, data: Any, expire_seconds: int = 60 * 60) -> None:
+    def get_candles(self, exchange: str, symbol: str, start_timestamp: int, finish_timestamp: int) -> Union[np.ndarray, None]:
+        """
+        returns candles between start_timestamp and finish_timestamp (both included)
+        if the whole range is cached, otherwise None
+        """
         if self.driver is None:
-            return
+            return None
 
-        # add record into the database
-        expire_at = None if expire_seconds is None else time() + expire_seconds
-        data_path = f"{self.path}{key}.pickle"
-        self.db[key] = {
-            'expire_seconds': expire_seconds,
-            'expire_at': expire_at,
-            'path': data_path,
-        }
-        self._update_db()
-
-        # store file
-        with open(data_path, 'wb') as f:
-            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
-
-    def get_value(self, key: str) -> Any:
-        if self.driver is None:
-            return
+        intervals = self.db.get(jh.key(exchange, symbol), [])
+        i = bisect_right([item['start'] for item in intervals], start_timestamp) - 1
+        if i < 0 or intervals[i]['finish'] < finish_timestamp:
+            return None
 
+        item = intervals[i]
         try:
-            item = self.db[key]
-        except KeyError:
-            return False
+            arr = np.load(item['path'], mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            # removed by another process
+            return None
+
+        begin = int((start_timestamp - item['start']) / 60_000)
+        end = int((finish_timestamp - item['start']) / 60_000) + 1
+        candles = np.array(arr[begin:end])
+        del arr
+
+        # kept in memory only, and written with the index by the next set_candles()
+        item['last_used'] = time()
+
+        return candles
+
+    def set_candles(self, exchange: str, symbol: str, candles: np.ndarray) -> None:
+        """
+        caches a contiguous range of 1m candles, merging it with cached
+        intervals that overlap or touch it
+        """
+        if self.driver is None or not len(candles):
+            return
 
-        # if expired, remove file, and database record
-        # if item['expire_at'] is not None and time() > item['expire_at']:
-        #     os.remove(item['path'])
-        #     del self.db[key]
-        #     self._update_db()
-        #     return False
+        start, finish = int(candles[0][0]), int(candles[-1][0])
+        # only complete ranges can be served by slicing
+        if finish - start != (len(candles) - 1) * 60_000:
+            return
 
-        # renew cache expiration time
-        # if item['expire_at'] is not None:
-        #     item['expire_at'] = time() + item['expire_seconds']
-        #     self._update_db()
+        # pick up intervals written by other processes in the meantime
+        self._load_db()
 
-        with open(item['path'], 'rb') as f:
-            return pickle.load(f)
+        key = jh.key(exchange, symbol)
+        intervals = self.db.get(key, [])
+        overlapping = [
+            item for item in intervals if item['start'] <= finish + 60_000 and item['finish'] >= start - 60_000
+        ]
+        # nothing new to store
+        if any(item['start'] <= start and item['finish'] >= finish for item in overlapping):
+            return
 
-    def _update_db(self) -> None:
-        # store/update database
-        with open(f"{self.path}cache_database.pickle", 'wb') as f:
-            pickle.dump(self.db, f, protocol=pickle.HIGHEST_PROTOCOL)
+        merged_start = min([start] + [item['start'] for item in overlapping])
+        merged_finish = max([finish] + [item['finish'] for item in overlapping])
+        merged = np.empty((int((merged_finish - merged_start) / 60_000) + 1, 6))
+        for item in overlapping:
+            offset = int((item['start'] - merged_start) / 60_000)
+            arr = np.load(item['path'], mmap_mode='r')
+            merged[offset:offset + len(arr)] = arr
+            del arr
+        offset = int((start - merged_start) / 60_000)
+        merged[offset:offset + len(candles)] = candles
+
+        path = f"{self.path}{key}-{merged_start}-{merged_finish}.npy"
+        np.save(path, merged)
+
+        for item in overlapping:
+            if item['path'] != path:
+                self._remove_file(item['path'])
+        intervals = [item for item in intervals if item not in overlapping]
+        intervals.append({
+            'start': merged_start,
+            'finish': merged_finish,
+            'path': path,
+            'size': merged.nbytes,
+            'last_used': time(),
+        })
+        self.db[key] = sorted(intervals, key=lambda item: item['start'])
+
+        self._evict()
+        self._update_db()
 
     def flush(self) -> None:
         if self.driver is None:
             return
 
-        for key, item in self.db.items():
-            os.remove(item['path'])
+        for intervals in self.db.values():
+            for item in intervals:
+                self._remove_file(item['path'])
         self.db = {}
+        self._update_db()
 
-    def slice_pickles(self, cache_key: str, start_date_str: str, finish_date_str: str, key: str,
-                      warm_up: bool = False) -> Any:
-        if self.driver is None:
-            return
+    def _evict(self) -> None:
+        """
+        removes least recently used intervals until the cache fits in env.caching.max_size_mb
+        """
+        max_size = jh.get_config('env.caching.max_size_mb', 2048) * 1024 * 1024
+        items = sorted(
+            ((key, item) for key, intervals in self.db.items() for item in intervals),
+            key=lambda ki: ki[1]['last_used']
+        )
+        total_size = sum(item['size'] for _, item in items)
+
+        # the most recently used one is always kept
+        for key, item in items[:-1]:
+            if total_size <= max_size:
+                break
+            self._remove_file(item['path'])
+            self.db[key].remove(item)
+            total_size -= item['size']
+
+    def _load_db(self) -> None:
+        # the intervals read since the index was last written have a newer last_used than the file
+        last_used = {item['path']: item['last_used'] for intervals in self.db.values() for item in intervals}
+
+        # if the index exists, load it
+        if os.path.isfile(f"{self.path}candles_index.pickle"):
+            with open(f"{self.path}candles_index.pickle", 'rb') as f:
+                self.db = pickle.load(f)
+        # if not, start with an empty one. We'll create the file when using set_candles()
+        else:
+            self.db = {}
+
+        for intervals in self.db.values():
+            for item in intervals:
+                item['last_used'] = max(item['last_used'], last_used.get(item['path'], 0))
+
+    def _update_db(self) -> None:
+        # store/update database. Written to a temp file first so concurrent readers never see a partial file
+        temp_path = f"{self.path}candles_index.pickle.{os.getpid()}"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(self.db, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, f"{self.path}candles_index.pickle")
 
+    @staticmethod
+    def _remove_file(path: str) -> None:
         try:
-            item = self.db[cache_key]
-            # print('item:', item)
-            # if expired, remove file, and database record
-            # if item['expire_at'] is not None and time() > item['expire_at']:
-            #     os.remove(item['path'])
-            #     del self.db[cache_key]
-            #     self._update_db()
-            #     return False
-
-            # renew cache expiration time
-            # if item['expire_at'] is not None:
-            #     item['expire_at'] = time() + item['expire_seconds']
-            #     self._update_db()
-
-            with open(item['path'], 'rb') as f:
-                return pickle.load(f)
-        except KeyError:
-            candidates = [pickl for pickl in self.db if key in pickl]
-            # print('Candidates: ', candidates)
-
-            start_date = jh.date_to_timestamp(start_date_str)
-            finish_date = jh.date_to_timestamp(finish_date_str) - 60000
-
-            if warm_up:
-                finish_date += 60_000 * 1440
-
-            candidate_finishdate = 0
-            candidate_startdate = 0
-            parent = {}
-            got_parent = False
-
-            for p in candidates:
-                candidate_dates = p.split(key)[0].split('-')
-                # print(candidate_dates)
-                candidate_startdate_str = f'{candidate_dates[0]}-{candidate_dates[1]}-{candidate_dates[2]}'
-                candidate_finishdate_str = f'{candidate_dates[3]}-{candidate_dates[4]}-{candidate_dates[5]}'
-                # print('candidate start-finish dates in str: ', candidate_startdate_str, candidate_finishdate_str)
-                candidate_startdate = jh.date_to_timestamp(candidate_startdate_str)
-                candidate_finishdate = jh.date_to_timestamp(candidate_finishdate_str)
-                if start_date >= candidate_startdate and finish_date <= candidate_finishdate:
-                    parent = p
-                    print('Found a parent!', parent)
-                    break
-
-            if parent:
-                try:
-                    item = self.db[parent]
-                    # print('item:', item)
-
-                    # if expired, remove file, and database record
-                    # if item['expire_at'] is not None and time() > item['expire_at']:
-                    #     os.remove(item['path'])
-                    #     del self.db[cache_key]
-                    #     self._update_db()
-                    #     return False
-
-                    # renew cache expiration time
-                    # if item['expire_at'] is not None:
-                    #     item['expire_at'] = time() + item['expire_seconds']
-                    #     self._update_db()
-
-                    with open(item['path'], 'rb') as f:
-                        parent_pickles = pickle.load(f)
-
-                    slice_len = int((finish_date / 60_000) - (start_date / 60_000))
-                    slice_start = int((start_date / 60_000) - (candidate_startdate / 60_000))
-                    slice_end = int(candidate_finishdate / 60_000 - finish_date / 60_000)  # for -slice from end
-                    slice_finish = slice_start + slice_len  # wut??????????????????
-                    pickle_slice = parent_pickles[slice_start:slice_finish + 1]
-
-                    print(f'Slice Start: {slice_start} Finish: {slice_finish} | Calculated Slice len: {slice_len} | '
-                          f'Slice len: {len(pickle_slice) / 60 / 24} days | Orphan startdate: {start_date} '
-                          f'Parent startdate: {candidate_startdate}')
-                    print('Len parent_pickles', len(parent_pickles))
-
-                    # print('with enum', parent_pickles[index])
-                    """print('Start with calc', parent_pickles[slice_start],
-                          datetime.datetime.fromtimestamp(parent_pickles[slice_start][0] / 1000))
-                    print('Finish with calc', parent_pickles[slice_finish],
-                          datetime.datetime.fromtimestamp(parent_pickles[slice_finish][0] / 1000))"""
-                    return pickle_slice
-                except KeyError:
-                    return False
-            return False
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
 
 cache = Cache("storage/temp/")
@@ -36,6 +36,38 @@ def generate_candle_from_one_minutes(timeframe: str,
     ])
 
 
+def batch_generate_candles_from_one_minutes(timeframe: str, candles: np.ndarray) -> np.ndarray:
+    """
+    generates all the complete candles of the timeframe from 1m candles at once.
+    Same as calling generate_candle_from_one_minutes() on each consecutive chunk
+    of candles, but done in a single vectorized pass. Trailing 1m candles that
+    don't form a complete candle are ignored.
+    """
+    if len(candles) == 0:
+        raise ValueError('No candles were passed')
+
+    # if there are gaps between 1 minute candles it cant be right to form new candles from it.
+    if candles[-1][0] - candles[0][0] != (len(candles) - 1) * 60_000:
+        raise ValueError(
+            f'There are gaps between he candles, first minute: {datetime.fromtimestamp(candles[0][0] / 1000)},'
+            f' last minute {datetime.fromtimestamp(candles[-1][0] / 1000)}.'
+            f' {(candles[-1][0] - candles[0][0]) / 60_000 + 1} candles needed but only {len(candles)} were given.'
+        )
+
+    count = jh.timeframe_to_one_minutes(timeframe)
+    n = len(candles) // count
+    chunks = candles[:n * count].reshape(n, count, 6)
+
+    generated = np.empty((n, 6))
+    generated[:, 0] = chunks[:, 0, 0]
+    generated[:, 1] = chunks[:, 0, 1]
+    generated[:, 2] = chunks[:, -1, 2]
+    generated[:, 3] = chunks[:, :, 3].max(axis=1)
+    generated[:, 4] = chunks[:, :, 4].min(axis=1)
+    generated[:, 5] = chunks[:, :, 5].sum(axis=1)
+    return generated
+
+
 def print_candle(candle: np.ndarray, is_partial: bool, symbol: str) -> None:
     if jh.should_execute_silently():
         return
@@ -0,0 +1,139 @@
+import os
+from typing import List, Tuple
+
+import arrow
+import numpy as np
+
+import jesse.helpers as jh
+from jesse.exceptions import CandleNotFoundInDatabase
+
+
+class CandleArchive:
+    """
+    On-disk columnar archive of 1m candles.
+
+    Candles of each exchange-symbol pair are stored in one file per month. Each file
+    is a fixed-width, column-major (open, close, high, low, volume) float64 matrix
+    with one row per minute of that month, so it can be memory-mapped and sliced with
+    timestamp arithmetic instead of being parsed. The timestamp column is not stored
+    since it is implied by the row's position. Minutes that are not available are NaN.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def is_enabled(self) -> bool:
+        return bool(jh.get_config('env.data.candles_archive', False))
+
+    def store(self, candles: np.ndarray, exchange: str, symbol: str) -> None:
+        """
+        writes 1m candles into the archive. Already archived minutes get overwritten.
+        """
+        if not len(candles):
+            return
+
+        timestamps = candles[:, 0].astype(np.int64)
+
+        for month_start, month_finish in _months(int(timestamps[0]), int(timestamps[-1])):
+            rows = (timestamps >= month_start) & (timestamps < month_finish)
+            if not rows.any():
+                continue
+
+            arr = self._open(exchange, symbol, month_start, mode='r+')
+            arr[(timestamps[rows] - month_start) // 60_000] = candles[rows][:, 1:]
+            arr.flush()
+            del arr
+
+    def load(self, exchange: str, symbol: str, start_timestamp: int, finish_timestamp: int) -> np.ndarray:
+        """
+        returns 1m candles between start_timestamp and finish_timestamp (both included)
+        """
+        count = int((finish_timestamp - start_timestamp) / 60_000) + 1
+        candles = np.empty((count, 6))
+        candles[:, 0] = start_timestamp + np.arange(count, dtype=np.int64) * 60_000
+
+        for month_start, month_finish in _months(start_timestamp, finish_timestamp):
+            path = self._month_path(exchange, symbol, month_start)
+            if not os.path.isfile(path):
+                raise CandleNotFoundInDatabase(
+                    f'No archived candles for {exchange} {symbol} in {jh.timestamp_to_date(month_start)[:7]}. '
+                    f'Try running "jesse archive-candles"'
+                )
+
+            arr = np.load(path, mmap_mode='r')
+
+            first = max(start_timestamp, month_start)
+            last = min(finish_timestamp, month_finish - 60_000)
+            offset = int((first - start_timestamp) / 60_000)
+            begin = int((first - month_start) / 60_000)
+            end = int((last - month_start) / 60_000) + 1
+            candles[offset:offset + end - begin, 1:] = arr[begin:end]
+            del arr
+
+        if np.isnan(candles[:, 2]).any():
+            raise CandleNotFoundInDatabase(
+                f'There are missing candles in the archive for {exchange} {symbol} between '
+                f'{jh.timestamp_to_time(start_timestamp)} => {jh.timestamp_to_time(finish_timestamp)}. '
+                f'Try running "jesse archive-candles"'
+            )
+
+        return candles
+
+    def build(self, exchange: str, symbol: str, start_timestamp: int, finish_timestamp: int) -> int:
+        """
+        (re)builds the archive from candles stored in the database and
+        returns the number of candles that have been archived
+        """
+        from jesse.models import Candle
+
+        total = 0
+        for month_start, month_finish in _months(start_timestamp, finish_timestamp):
+            candles_tuple = Candle.select(
+                Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
+                Candle.volume
+            ).where(
+                Candle.timestamp.between(max(start_timestamp, month_start), min(finish_timestamp, month_finish - 60_000)),
+                Candle.exchange == exchange,
+                Candle.symbol == symbol
+            ).order_by(Candle.timestamp.asc()).tuples()
+
+            candles = np.array(tuple(candles_tuple), dtype=np.float64)
+            self.store(candles, exchange, symbol)
+            total += len(candles)
+
+        return total
+
+    def _open(self, exchange: str, symbol: str, month_start: int, mode: str) -> np.memmap:
+        path = self._month_path(exchange, symbol, month_start)
+
+        if os.path.isfile(path):
+            return np.lib.format.open_memmap(path, mode=mode)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        month_finish = jh.timestamp_to_arrow(month_start).shift(months=1).int_timestamp * 1000
+        arr = np.lib.format.open_memmap(
+            path, mode='w+', dtype=np.float64, shape=(int((month_finish - month_start) / 60_000), 5),
+            fortran_order=True
+        )
+        arr[:] = np.nan
+        return arr
+
+    def _month_path(self, exchange: str, symbol: str, month_start: int) -> str:
+        return f"{self.path}{exchange}/{symbol}/{jh.timestamp_to_date(month_start)[:7]}.npy"
+
+
+def _months(start_timestamp: int, finish_timestamp: int) -> List[Tuple[int, int]]:
+    """
+    returns (start, finish) timestamps of the months that the range is spread over.
+    The finish timestamp of each month is the start of the next one.
+    """
+    months = []
+    month = arrow.get(start_timestamp / 1000).floor('month')
+    while month.int_timestamp * 1000 <= finish_timestamp:
+        next_month = month.shift(months=1)
+        months.append((month.int_timestamp * 1000, next_month.int_timestamp * 1000))
+        month = next_month
+    return months
+
+
+archive = CandleArchive('storage/candles/')
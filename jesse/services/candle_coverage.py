@@ -0,0 +1,124 @@
+from typing import List, Tuple, Union
+
+import jesse.helpers as jh
+import jesse.services.table as table
+
+# the minutes that are stored around a gap are its neighbours in the order of timestamps. The two
+# sentinel timestamps (a minute before the start and a minute after the finish) make the missing
+# minutes at the start and at the end (or all of them, if nothing is stored) gaps too.
+_MISSING_RANGES_SQL = """
+SELECT previous + 60000, timestamp - 60000 FROM (
+    SELECT timestamp, LAG(timestamp) OVER (ORDER BY timestamp) AS previous FROM (
+        SELECT timestamp FROM candle
+        WHERE exchange = %s AND symbol = %s AND timestamp BETWEEN %s AND %s
+        UNION ALL SELECT %s
+        UNION ALL SELECT %s
+    ) AS timestamps
+) AS neighbours
+WHERE timestamp - previous > 60000
+ORDER BY timestamp
+"""
+
+
+def missing_ranges(exchange: str, symbol: str, start_timestamp: int, finish_timestamp: int) -> List[Tuple[int, int]]:
+    """
+    returns the (first, last) timestamps of each range of 1m candles between start_timestamp and
+    finish_timestamp (both included) that are not stored in the database, in one query
+    """
+    from jesse.models import Candle
+
+    if finish_timestamp < start_timestamp:
+        return []
+
+    cursor = Candle._meta.database.execute_sql(_MISSING_RANGES_SQL, (
+        exchange, symbol, start_timestamp, finish_timestamp, start_timestamp - 60_000, finish_timestamp + 60_000
+    ))
+    return [(int(first), int(last)) for first, last in cursor.fetchall()]
+
+
+def chunk_starts(ranges: List[Tuple[int, int]], chunk_length: int) -> List[int]:
+    """
+    returns the start timestamps of the chunks of chunk_length milliseconds that cover the ranges
+    """
+    starts = []
+    for first, last in ranges:
+        starts.extend(range(first, last + 1, chunk_length))
+    return starts
+
+
+def coverage(exchange: str, symbol: str) -> Union[dict, None]:
+    """
+    returns the first and last stored 1m candles of the symbol, how many are stored
+    and the ranges that are missing between them (None if none is stored)
+    """
+    from peewee import SQL, fn
+    from jesse.models import Candle
+
+    first, last, count = Candle.select(
+        fn.MIN(Candle.timestamp), fn.MAX(Candle.timestamp), fn.COUNT(SQL('*'))
+    ).where(
+        Candle.exchange == exchange,
+        Candle.symbol == symbol
+    ).tuples()[0]
+    if not count:
+        return None
+
+    gaps = missing_ranges(exchange, symbol, first, last)
+    return {
+        'first': first,
+        'last': last,
+        'count': count,
+        'missing': sum((gap_last - gap_first) // 60_000 + 1 for gap_first, gap_last in gaps),
+        'gaps': gaps,
+    }
+
+
+def stored_symbols(exchange: str) -> List[str]:
+    from jesse.models import Candle
+
+    query = Candle.select(Candle.symbol).where(Candle.exchange == exchange).distinct().order_by(Candle.symbol)
+    return [c.symbol for c in query]
+
+
+def print_report(exchange: str, symbols: List[str], show_gaps: bool = False) -> None:
+    """
+    prints the coverage of the stored 1m candles of each symbol (all the symbols of the exchange if none is passed)
+    """
+    if not symbols:
+        symbols = stored_symbols(exchange)
+    if not symbols:
+        print(jh.color(f'No candles of {exchange} are stored', 'yellow'))
+        return
+
+    rows = [['Symbol', 'First candle', 'Last candle', 'Stored', 'Missing', 'Coverage', 'Gaps']]
+    gaps = {}
+    for symbol in symbols:
+        c = coverage(exchange, symbol)
+        if c is None:
+            rows.append([symbol, '-', '-', 0, '-', '-', '-'])
+            continue
+
+        total = c['count'] + c['missing']
+        rows.append([
+            symbol,
+            jh.timestamp_to_time(c['first'])[:16],
+            jh.timestamp_to_time(c['last'])[:16],
+            c['count'],
+            c['missing'],
+            f"{round(c['count'] / total * 100, 2)}%",
+            len(c['gaps']),
+        ])
+        gaps[symbol] = c['gaps']
+
+    table.multi_value(rows, with_headers=True,
+                      alignments=('left', 'left', 'left', 'right', 'right', 'right', 'right'))
+
+    if show_gaps:
+        for symbol, symbol_gaps in gaps.items():
+            if not symbol_gaps:
+                continue
+            print(f'\n{symbol}:')
+            table.multi_value([['From', 'To', 'Minutes']] + [
+                [jh.timestamp_to_time(first)[:16], jh.timestamp_to_time(last)[:16], (last - first) // 60_000 + 1]
+                for first, last in symbol_gaps
+            ], with_headers=True, alignments=('left', 'left', 'right'))
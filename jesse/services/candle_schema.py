@@ -0,0 +1,162 @@
+"""
+The compact layout of the candles in the database (optional, see `jesse migrate-candles`).
+
+By default each 1m candle is a row of the "candle" table with a UUID primary key, and its
+exchange and symbol as strings, plus a unique index on (timestamp, exchange, symbol). The
+compact layout stores them in "candle_compact" instead, keyed by an integer id of the
+market (the exchange-symbol pair of the "market" table) and the timestamp, which is the
+primary key. Rows are much narrower and the candles of a market are contiguous in the index,
+so the range scans of loading candles read far fewer pages. The table can also be
+partitioned by month.
+
+"candle" is then a view over both tables, so the reads (through the Candle model) work as
+before. The writes go through jesse.services.db.store_candles_array(), which writes to the
+compact table when it exists.
+"""
+from typing import List
+
+import jesse.helpers as jh
+from jesse.services.candle_archive import _months
+
+_CREATE_MARKET_SQL = """
+CREATE TABLE IF NOT EXISTS market (
+    id SERIAL PRIMARY KEY,
+    exchange VARCHAR(255) NOT NULL,
+    symbol VARCHAR(255) NOT NULL,
+    UNIQUE (exchange, symbol)
+)
+"""
+
+_CREATE_CANDLE_COMPACT_SQL = """
+CREATE TABLE candle_compact (
+    market_id INTEGER NOT NULL REFERENCES market (id),
+    timestamp BIGINT NOT NULL,
+    open DOUBLE PRECISION NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    high DOUBLE PRECISION NOT NULL,
+    low DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (market_id, timestamp)
+)
+"""
+
+# the columns of the Candle model; the id is derived the same way store_candles_array() derives it
+_CREATE_CANDLE_VIEW_SQL = """
+CREATE VIEW candle AS
+SELECT md5(m.exchange || '|' || m.symbol || '|' || c.timestamp::text)::uuid AS id,
+       c.timestamp, c.open, c.close, c.high, c.low, c.volume, m.symbol, m.exchange
+FROM candle_compact c
+JOIN market m ON m.id = c.market_id
+"""
+
+# whether the database has the compact layout, and whether it's partitioned (checked once per process)
+_layout = {}
+# the ids of the markets by (exchange, symbol), which don't change once they are added
+_market_ids = {}
+
+
+def is_compact() -> bool:
+    return _check_layout()['compact']
+
+
+def is_partitioned() -> bool:
+    return _check_layout()['partitioned']
+
+
+def _check_layout() -> dict:
+    if not _layout:
+        from jesse.services.db import db
+
+        compact, partitioned = db.execute_sql(
+            "SELECT to_regclass('candle_compact') IS NOT NULL, "
+            "EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('candle_compact'))"
+        ).fetchone()
+        _layout['compact'] = bool(compact)
+        _layout['partitioned'] = bool(partitioned)
+    return _layout
+
+
+def market_id(cursor, exchange: str, symbol: str) -> int:
+    """
+    returns the id of the market, which is added if it's new.
+
+    It's only inserted when it's missing because every INSERT takes a value of the
+    sequence of the ids, even if it conflicts with the existing row. An id is only cached
+    once it's read back by a SELECT of a later call, i.e. after the transaction that
+    inserted it has committed; if it rolls back, the id is gone.
+    """
+    key = (exchange, symbol)
+    if key not in _market_ids:
+        cursor.execute('SELECT id FROM market WHERE exchange = %s AND symbol = %s', key)
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute(
+                'INSERT INTO market (exchange, symbol) VALUES (%s, %s) ON CONFLICT DO NOTHING RETURNING id', key
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+            # added (and committed) by another process in the meantime
+            cursor.execute('SELECT id FROM market WHERE exchange = %s AND symbol = %s', key)
+            row = cursor.fetchone()
+        _market_ids[key] = row[0]
+    return _market_ids[key]
+
+
+def partition_statements(start_timestamp: int, finish_timestamp: int) -> List[str]:
+    """
+    returns the statements that create the monthly partitions of candle_compact (if they
+    don't exist) that the range of timestamps is spread over
+    """
+    return [
+        f'CREATE TABLE IF NOT EXISTS candle_compact_{jh.timestamp_to_date(month_start)[:7].replace("-", "_")} '
+        f'PARTITION OF candle_compact FOR VALUES FROM ({month_start}) TO ({month_finish})'
+        for month_start, month_finish in _months(int(start_timestamp), int(finish_timestamp))
+    ]
+
+
+def migrate(partition: bool = False, drop_legacy: bool = False) -> int:
+    """
+    moves the candles of the "candle" table to the compact layout, in one transaction, and
+    returns how many were moved. The "candle" table is renamed to "candle_legacy" (or dropped).
+    """
+    from jesse.services.db import db
+
+    if is_compact():
+        raise ValueError('The candles are already in the compact layout')
+
+    with db.atomic():
+        cursor = db.cursor()
+        cursor.execute('ALTER TABLE candle RENAME TO candle_legacy')
+        cursor.execute(_CREATE_MARKET_SQL)
+        cursor.execute(_CREATE_CANDLE_COMPACT_SQL + (' PARTITION BY RANGE (timestamp)' if partition else ''))
+        cursor.execute(
+            'INSERT INTO market (exchange, symbol) SELECT DISTINCT exchange, symbol FROM candle_legacy '
+            'ORDER BY exchange, symbol ON CONFLICT DO NOTHING'
+        )
+
+        if partition:
+            cursor.execute('SELECT MIN(timestamp), MAX(timestamp) FROM candle_legacy')
+            first, last = cursor.fetchone()
+            if first is not None:
+                for statement in partition_statements(first, last):
+                    cursor.execute(statement)
+
+        # ordered by the primary key so that the candles of each market are written contiguously
+        cursor.execute(
+            'INSERT INTO candle_compact (market_id, timestamp, open, close, high, low, volume) '
+            'SELECT m.id, c.timestamp, c.open, c.close, c.high, c.low, c.volume '
+            'FROM candle_legacy c JOIN market m ON m.exchange = c.exchange AND m.symbol = c.symbol '
+            'ORDER BY m.id, c.timestamp '
+            'ON CONFLICT DO NOTHING'
+        )
+        count = cursor.rowcount
+
+        cursor.execute(_CREATE_CANDLE_VIEW_SQL)
+        if drop_legacy:
+            cursor.execute('DROP TABLE candle_legacy')
+
+    db.execute_sql('ANALYZE candle_compact')
+    _layout.clear()
+    _market_ids.clear()
+    return count
@@ -1,6 +1,10 @@
+import io
+import struct
 from playhouse.postgres_ext import PostgresqlExtDatabase
 from typing import Dict, List
 
+import numpy as np
+
 import jesse.helpers as jh
 
 if not jh.is_unit_testing():
@@ -32,6 +36,89 @@ else:
 
 
 def store_candles(candles: List[Dict]) -> None:
-    from jesse.models import Candle
+    """
+    stores candles (as dicts) through store_candles_array(); the ones that are already stored are skipped
+    """
+    pairs = {}
+    for c in candles:
+        pairs.setdefault((c['exchange'], c['symbol']), []).append(
+            (c['timestamp'], c['open'], c['close'], c['high'], c['low'], c['volume'])
+        )
+
+    for (exchange, symbol), rows in pairs.items():
+        store_candles_array(np.array(rows, dtype=np.float64), exchange, symbol)
+
+
+# rows per COPY, to bound the memory of the encoded rows
+_COPY_BATCH_SIZE = 1_000_000
+# the header (signature, flags and header extension length) and trailer of the binary COPY format
+_COPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_COPY_TRAILER = struct.pack('>h', -1)
+# a row of the binary COPY format: the number of fields, then the length and the value of each one
+_COPY_ROW = np.dtype([('fields', '>i2')] + [
+    field for name, kind in [('timestamp', '>i8'), ('open', '>f8'), ('close', '>f8'), ('high', '>f8'),
+                             ('low', '>f8'), ('volume', '>f8')]
+    for field in [(f'{name}_length', '>i4'), (name, kind)]
+])
+
+
+def store_candles_array(candles: np.ndarray, exchange: str, symbol: str) -> None:
+    """
+    stores 1m candles (rows of timestamp, open, close, high, low, volume) of a symbol; the ones
+    that are already stored are skipped.
+
+    The candles are streamed with COPY (in the binary format, which is encoded by numpy) into a
+    temporary staging table and merged into the candle table from there, instead of being
+    inserted row by row. Their ids are derived from the exchange, symbol and timestamp.
+    With the compact layout (see jesse.services.candle_schema) they are merged into the
+    candle_compact table instead.
+    """
+    from jesse.services import candle_schema
+
+    if not len(candles):
+        return
+
+    with db.atomic():
+        cursor = db.cursor()
+        cursor.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS candle_staging (timestamp BIGINT, open DOUBLE PRECISION, '
+            'close DOUBLE PRECISION, high DOUBLE PRECISION, low DOUBLE PRECISION, volume DOUBLE PRECISION) '
+            'ON COMMIT DELETE ROWS'
+        )
+        for start in range(0, len(candles), _COPY_BATCH_SIZE):
+            cursor.copy_expert(
+                'COPY candle_staging FROM STDIN WITH (FORMAT binary)',
+                io.BytesIO(_copy_binary(candles[start:start + _COPY_BATCH_SIZE]))
+            )
+
+        if candle_schema.is_compact():
+            if candle_schema.is_partitioned():
+                for statement in candle_schema.partition_statements(candles[:, 0].min(), candles[:, 0].max()):
+                    cursor.execute(statement)
+            cursor.execute(
+                'INSERT INTO candle_compact (market_id, timestamp, open, close, high, low, volume) '
+                'SELECT %s, timestamp, open, close, high, low, volume FROM candle_staging '
+                'ON CONFLICT DO NOTHING',
+                (candle_schema.market_id(cursor, exchange, symbol),)
+            )
+            return
+
+        cursor.execute(
+            "INSERT INTO candle (id, timestamp, open, close, high, low, volume, exchange, symbol) "
+            "SELECT md5(%s || '|' || %s || '|' || timestamp::text)::uuid, timestamp, open, close, high, low, "
+            "volume, %s, %s FROM candle_staging "
+            "ON CONFLICT DO NOTHING",
+            (exchange, symbol, exchange, symbol)
+        )
+
 
-    Candle.insert_many(candles).on_conflict_ignore().execute()
+def _copy_binary(candles: np.ndarray) -> bytes:
+    """
+    encodes candles in the binary format of COPY
+    """
+    rows = np.empty(len(candles), dtype=_COPY_ROW)
+    rows['fields'] = 6
+    for i, name in enumerate(['timestamp', 'open', 'close', 'high', 'low', 'volume']):
+        rows[f'{name}_length'] = 8
+        rows[name] = candles[:, i]
+    return _COPY_HEADER + rows.tobytes() + _COPY_TRAILER
@@ -0,0 +1,262 @@
+"""
+In backtests all the candles are known ahead of time, so the indicators a strategy declares
+in precomputed_indicators() are computed once over the whole series (with sequential=True)
+before the simulation starts, instead of over the last `warmup_candles_num` candles on
+every candle. Strategy.indicator() then reads the value of the current candle by index.
+
+Look-ahead is prevented in two ways:
+- the value that is read is always the one of the latest candle that is closed at the
+  current time of the simulation (never of a forming candle)
+- an indicator's values must not depend on the candles that come after them, which is
+  checked by computing it over parts of the series too
+
+The computed values are also kept (in memory, up to env.optimization.indicator_cache_size
+megabytes) for the next backtests of the same process on the same candles. In optimize
+mode, when an indicator that accepts a list of periods is declared with a period within
+the range of an integer hyperparameter, the values of every period of that range are
+computed in one pass, so that the DNAs evaluated later by the same worker reuse them.
+"""
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, Union
+
+import numpy as np
+
+import jesse.helpers as jh
+from jesse import exceptions
+from jesse.config import config
+from jesse.store import store
+
+# the indicators whose "period" accepts a list of periods too
+BATCH_INDICATORS = {'sma', 'ema', 'rsi', 'atr'}
+
+
+class PrecomputedIndicator:
+    """
+    The values of an indicator for every candle of a series
+    """
+
+    def __init__(self, values: Union[np.ndarray, tuple], timestamps: np.ndarray, timeframe: str) -> None:
+        self.values = values
+        self.timestamps = timestamps
+        self._step = jh.timeframe_to_one_minutes(timeframe) * 60_000
+        self._first_timestamp = timestamps[0] if len(timestamps) else 0
+
+    def value_at(self, time: int) -> Union[float, tuple]:
+        """
+        returns the value of the latest candle that is closed at `time`
+        """
+        index = self._latest_closed_index(time)
+        if index < 0:
+            return self._at(None)
+        return self._at(index)
+
+    def _latest_closed_index(self, time: int) -> int:
+        # candles are one step apart, unless there are gaps in the series
+        index = int((time - self._first_timestamp) // self._step) - 1
+        if 0 <= index < len(self.timestamps) and self.timestamps[index] + self._step <= time and (
+                index + 1 == len(self.timestamps) or self.timestamps[index + 1] + self._step > time):
+            return index
+        return int(np.searchsorted(self.timestamps, time - self._step, side='right')) - 1
+
+    def _at(self, index: int = None) -> Union[float, tuple]:
+        if isinstance(self.values, tuple):
+            return type(self.values)(*(np.nan if index is None else v[index] for v in self.values))
+        return np.nan if index is None else self.values[index]
+
+
+class SeriesCache:
+    """
+    The values of indicators by the candles they were computed on and their parameters.
+    The least recently used ones are dropped once they take more than the maximum size.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._values = OrderedDict()
+
+    @staticmethod
+    def max_bytes() -> int:
+        return int(jh.get_config('env.optimization.indicator_cache_size', 512) * 1024 ** 2)
+
+    def get(self, key: tuple) -> Union[np.ndarray, tuple, None]:
+        values = self._values.get(key)
+        if values is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._values.move_to_end(key)
+        return values
+
+    def set(self, key: tuple, values: Union[np.ndarray, tuple]) -> None:
+        if key in self._values:
+            return
+        self._values[key] = values
+        self.nbytes += _nbytes(values)
+
+        max_bytes = self.max_bytes()
+        while self.nbytes > max_bytes and self._values:
+            _, dropped = self._values.popitem(last=False)
+            self.nbytes -= _nbytes(dropped)
+
+    def clear(self) -> None:
+        self._values = OrderedDict()
+        self.nbytes = 0
+
+
+series_cache = SeriesCache()
+
+
+def declarations(strategy) -> Dict[str, dict]:
+    """
+    returns the validated indicators declared by the strategy, by name
+    """
+    import jesse.indicators as ta
+
+    res = {}
+    for d in strategy.precomputed_indicators():
+        if 'name' not in d or 'indicator' not in d:
+            raise exceptions.InvalidStrategy(
+                f'Each of precomputed_indicators() must have a "name" and an "indicator". Got: {d}'
+            )
+        if not callable(getattr(ta, d['indicator'], None)):
+            raise exceptions.InvalidStrategy(f'"{d["indicator"]}" is not an indicator of jesse.indicators')
+
+        timeframe = d.get('timeframe', strategy.timeframe)
+        if timeframe not in config['app']['considering_timeframes']:
+            raise exceptions.InvalidStrategy(
+                f'The "{d["name"]}" indicator uses the {timeframe} timeframe which is not in the routes. '
+                f'Add it to the extra candles.'
+            )
+
+        res[d['name']] = {
+            'indicator': d['indicator'],
+            'params': d.get('params', {}),
+            'exchange': strategy.exchange,
+            'symbol': strategy.symbol,
+            'timeframe': timeframe,
+        }
+    return res
+
+
+def precompute(strategies: list, candles: dict, bigger_timeframes_candles: dict) -> None:
+    """
+    computes the declared indicators of the strategies over the warm-up candles in the store
+    followed by the candles of the backtest. Identical declarations are computed once.
+    """
+    computed = {}
+    for strategy in strategies:
+        strategy._precomputed = {}
+        for name, d in declarations(strategy).items():
+            key = (d['exchange'], d['symbol'], d['timeframe'], d['indicator'], _params_key(d['params']))
+            if key not in computed:
+                series = _series(d['exchange'], d['symbol'], d['timeframe'], candles, bigger_timeframes_candles)
+                computed[key] = PrecomputedIndicator(_values(name, d, series, strategy), series[:, 0], d['timeframe'])
+            strategy._precomputed[name] = computed[key]
+
+
+def current_value(d: dict) -> Union[float, tuple]:
+    """
+    computes the value of a declared indicator on the spot (for when it is not precomputed,
+    like in live trading), from the same candles it would be read from if it was
+    """
+    import jesse.indicators as ta
+
+    candles = store.candles.get_candles(d['exchange'], d['symbol'], d['timeframe'])
+    step = jh.timeframe_to_one_minutes(d['timeframe']) * 60_000
+    # leave out the forming candle
+    if len(candles) and candles[-1][0] + step > jh.now():
+        candles = candles[:-1]
+    return getattr(ta, d['indicator'])(candles, **d['params'])
+
+
+def _series(exchange: str, symbol: str, timeframe: str, candles: dict, bigger_timeframes_candles: dict) -> np.ndarray:
+    key = jh.key(exchange, symbol)
+    # closed candles only, no forming one
+    warmup = store.candles.get_storage(exchange, symbol, timeframe)[:]
+    simulated = candles[key]['candles'] if timeframe == '1m' else bigger_timeframes_candles[key][timeframe]
+    return np.concatenate((warmup, simulated)) if len(warmup) else simulated
+
+
+def _values(name: str, d: dict, series: np.ndarray, strategy) -> Union[np.ndarray, tuple]:
+    fingerprint = blake2b(series.tobytes(), digest_size=16).digest()
+    key = (fingerprint, d['indicator'], _params_key(d['params']))
+    values = series_cache.get(key)
+    if values is not None:
+        return values
+
+    periods = _batch_periods(strategy, d, len(series))
+    if periods is None:
+        values = _compute(name, d, series)
+        series_cache.set(key, values)
+        return values
+
+    batch = _compute(name, {**d, 'params': {**d['params'], 'period': periods}}, series)
+    for period, row in zip(periods, batch):
+        series_cache.set((fingerprint, d['indicator'], _params_key({**d['params'], 'period': period})), row)
+    return batch[periods.index(int(d['params']['period']))]
+
+
+def _batch_periods(strategy, d: dict, length: int) -> Union[list, None]:
+    """
+    in optimize mode, returns all the periods of the integer hyperparameter
+    which the declared period is (probably) taken from
+    """
+    period = d['params'].get('period')
+    if not jh.is_optimizing() or d['indicator'] not in BATCH_INDICATORS or not isinstance(period, (int, np.integer)):
+        return None
+
+    # at most half of the cache
+    max_count = SeriesCache.max_bytes() // 2 // (length * 8)
+    for hp in strategy.hyperparameters():
+        if hp['type'] in [int, 'int'] and hp['min'] <= period <= hp['max'] and hp['max'] - hp['min'] < max_count:
+            return list(range(hp['min'], hp['max'] + 1))
+    return None
+
+
+def _compute(name: str, d: dict, series: np.ndarray) -> Union[np.ndarray, tuple]:
+    """
+    :return: the values (one row per period if a list of periods is passed)
+    """
+    import jesse.indicators as ta
+
+    indicator = getattr(ta, d['indicator'])
+    values = indicator(series, sequential=True, **d['params'])
+    if _first(values).shape[-1] != len(series):
+        raise exceptions.InvalidStrategy(
+            f'The "{name}" indicator can not be precomputed: it returns {_first(values).shape[-1]} values '
+            f'for {len(series)} candles.'
+        )
+
+    # the values of a part of the series must be the same as the ones of the whole of it
+    for end in {len(series) // 2, len(series) - len(series) // 4}:
+        if end < 1:
+            continue
+        part = indicator(series[:end], sequential=True, **d['params'])
+        if not all(np.allclose(p[..., -1], v[..., end - 1], equal_nan=True)
+                   for p, v in zip(_fields(part), _fields(values))):
+            raise exceptions.LookAheadBias(
+                f'The "{name}" indicator ({d["indicator"]}) can not be precomputed because its values depend on '
+                f'the candles that come after them.'
+            )
+
+    return values
+
+
+def _params_key(params: dict) -> str:
+    return repr(sorted((k, v.item() if isinstance(v, np.generic) else v) for k, v in params.items()))
+
+
+def _nbytes(values: Union[np.ndarray, tuple]) -> int:
+    return sum(np.asarray(v).nbytes for v in _fields(values))
+
+
+def _fields(values: Union[np.ndarray, tuple]) -> tuple:
+    return values if isinstance(values, tuple) else (values,)
+
+
+def _first(values: Union[np.ndarray, tuple]) -> np.ndarray:
+    return _fields(values)[0]
@@ -0,0 +1,150 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Callable, List
+
+import jesse.services.table as table
+
+
+class Profiler:
+    """
+    Attributes the time of a simulation to the stages of its hot path (strategy code,
+    indicators, candles store, order execution, ...).
+
+    The stages are instrumented by replacing their functions with timed wrappers only
+    while the profiler is enabled, so it costs nothing otherwise. For each stage the
+    calls, total time (including the stages it calls) and self time (excluding them)
+    are kept. Self times are also kept per call stack, which can be dumped in the
+    "collapsed stacks" format that flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stats = {}
+        self.stacks = defaultdict(float)
+        # the stages being measured, outermost first
+        self._frames = []
+        self._originals = []
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+
+        self.stats = {}
+        self.stacks = defaultdict(float)
+        self._frames = []
+        self.enabled = True
+
+        from jesse.models import Order, Position
+        from jesse.modes import backtest_mode
+        from jesse.store.state_candles import CandlesState
+        from jesse.strategies import Strategy
+        import jesse.indicators as indicators
+
+        self.instrument(Strategy, '_execute', 'Strategy._execute')
+        self.instrument(Strategy, '_check', 'Strategy._check')
+        self.instrument(CandlesState, 'get_candles', 'CandlesState.get_candles')
+        self.instrument(CandlesState, 'add_candle', 'CandlesState.add_candle')
+        self.instrument(Order, 'execute', 'Order.execute')
+        self.instrument(Position, '_on_executed_order', 'Position._on_executed_order')
+        for name in ['save_daily_portfolio_balance', '_simulate_price_change_effect', '_skip_n_candles',
+                     '_next_event_step', '_execute_candles']:
+            self.instrument(backtest_mode, name, name)
+        for name in indicators.__all__:
+            self.instrument(indicators, name, f'indicators.{name}')
+
+    def disable(self) -> None:
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+        self.enabled = False
+
+    def instrument(self, owner: object, attribute: str, name: str) -> None:
+        """
+        replaces owner.attribute (a function of a module or a method of a class) with a timed wrapper
+        """
+        original = getattr(owner, attribute)
+        self._originals.append((owner, attribute, original))
+        setattr(owner, attribute, self._timed(original, name))
+
+    def _timed(self, func: Callable, name: str) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            frame = self._start(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._stop(frame)
+
+        return wrapper
+
+    @contextmanager
+    def measure(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        frame = self._start(name)
+        try:
+            yield
+        finally:
+            self._stop(frame)
+
+    def _start(self, name: str) -> list:
+        # [name, children time, begin]
+        frame = [name, 0.0, perf_counter()]
+        self._frames.append(frame)
+        return frame
+
+    def _stop(self, frame: list) -> None:
+        elapsed = perf_counter() - frame[2]
+        name = frame[0]
+        stack = ';'.join(f[0] for f in self._frames)
+        self._frames.pop()
+
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = {'calls': 0, 'total': 0.0, 'self': 0.0}
+        stat['calls'] += 1
+        stat['self'] += elapsed - frame[1]
+        # don't count the time of recursive calls twice
+        if all(f[0] != name for f in self._frames):
+            stat['total'] += elapsed
+
+        self.stacks[stack] += elapsed - frame[1]
+        if self._frames:
+            self._frames[-1][1] += elapsed
+
+    def report(self) -> List[list]:
+        """
+        returns the rows of the breakdown table, ordered by self time
+        """
+        overall = sum(stat['self'] for stat in self.stats.values()) or 1
+        rows = [['Stage', 'Calls', 'Total (s)', 'Self (s)', 'Mean (ms)', 'Self %']]
+        for name, stat in sorted(self.stats.items(), key=lambda item: item[1]['self'], reverse=True):
+            rows.append([
+                name,
+                stat['calls'],
+                round(stat['total'], 4),
+                round(stat['self'], 4),
+                round(stat['total'] / stat['calls'] * 1000, 4),
+                f"{round(stat['self'] / overall * 100, 1)}%",
+            ])
+        return rows
+
+    def print_report(self) -> None:
+        table.multi_value(self.report(), with_headers=True,
+                          alignments=('left', 'right', 'right', 'right', 'right', 'right'))
+
+    def dump_collapsed_stacks(self, path: str) -> None:
+        """
+        writes the self time of each call stack in microseconds as "stage;stage;stage count"
+        lines which are readable by flamegraph.pl, speedscope, etc.
+        """
+        with open(path, 'w') as f:
+            for stack, seconds in self.stacks.items():
+                f.write(f'{stack} {int(seconds * 1_000_000)}\n')
+
+
+profiler = Profiler()
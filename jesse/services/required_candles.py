@@ -6,7 +6,8 @@ from jesse.config import config
 from jesse.exceptions import CandleNotFoundInDatabase
 from jesse.models import Candle
 from jesse.services.cache import cache
-from jesse.services.candle import generate_candle_from_one_minutes
+from jesse.services.candle_archive import archive
+from jesse.services.candle import batch_generate_candles_from_one_minutes
 from jesse.store import store
 
 
@@ -35,17 +36,19 @@ def load_required_candles(exchange: str, symbol: str, start_date_str: str, finis
     # update candles_count to count from the beginning of the day instead
     short_candles_count = int((pre_finish_date - pre_start_date) / 60_000)
 
-    key = jh.key(exchange, symbol)
-    cache_key = f'{jh.timestamp_to_date(pre_start_date)}-{jh.timestamp_to_date(pre_finish_date)}-{key}'
-    cached_value = cache.get_value(cache_key)
+    # read straight from the memory-mapped archive if it's enabled
+    if archive.is_enabled():
+        return archive.load(exchange, symbol, pre_start_date, pre_finish_date)
+
+    cached_value = cache.get_candles(exchange, symbol, pre_start_date, pre_finish_date)
 
     # if cache exists
-    if cached_value:
-        candles_tuple = cached_value
-    # not cached, get and cache for later calls in the next 5 minutes
+    if cached_value is not None:
+        candles = cached_value
+    # not cached, get and cache for later calls
     else:
         # fetch from database
-        candles_tuple = tuple(
+        candles = np.array(tuple(
             Candle.select(
                 Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
                 Candle.volume
@@ -54,12 +57,11 @@ def load_required_candles(exchange: str, symbol: str, start_date_str: str, finis
                 Candle.exchange == exchange,
                 Candle.symbol == symbol
             ).order_by(Candle.timestamp.asc()).tuples()
-        )
+        ))
 
-        # cache it for near future calls
-        cache.set_value(cache_key, candles_tuple, expire_seconds=60 * 60 * 24 * 7)
-
-    candles = np.array(candles_tuple)
+        # cache it for near future calls. Only complete ranges are cached
+        if len(candles) == short_candles_count + 1:
+            cache.set_candles(exchange, symbol, candles)
 
     if len(candles) < short_candles_count + 1:
         first_existing_candle = tuple(
@@ -108,27 +110,16 @@ def inject_required_candles_to_store(candles: np.ndarray, exchange: str, symbol:
     # batch add 1m candles:
     store.candles.batch_add_candle(candles, exchange, symbol, '1m', with_generation=False)
 
-    # loop to generate, and add candles (without execution)
-    for i in range(len(candles)):
-        for timeframe in config['app']['considering_timeframes']:
-            # skip 1m. already added
-            if timeframe == '1m':
-                continue
-
-            num = jh.timeframe_to_one_minutes(timeframe)
-
-            if (i + 1) % num == 0:
-                generated_candle = generate_candle_from_one_minutes(
-                    timeframe,
-                    candles[(i - (num - 1)):(i + 1)],
-                    True
-                )
-
-                store.candles.add_candle(
-                    generated_candle,
-                    exchange,
-                    symbol,
-                    timeframe,
-                    with_execution=False,
-                    with_generation=False
-                )
+    # generate, and batch add candles of bigger timeframes (without execution)
+    for timeframe in config['app']['considering_timeframes']:
+        # skip 1m. already added
+        if timeframe == '1m':
+            continue
+
+        store.candles.batch_add_candle(
+            batch_generate_candles_from_one_minutes(timeframe, candles),
+            exchange,
+            symbol,
+            timeframe,
+            with_generation=False
+        )
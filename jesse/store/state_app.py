@@ -10,3 +10,7 @@ class AppState:
     total_open_trades = 0
     total_open_pl = 0
     total_liquidations = 0
+
+    def __init__(self) -> None:
+        # an instance attribute so it doesn't carry over between store resets
+        self.daily_balance = []
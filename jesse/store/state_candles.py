@@ -1,3 +1,5 @@
+from math import ceil
+
 import numpy as np
 
 import jesse.helpers as jh
@@ -5,7 +7,9 @@ import jesse.services.selectors as selectors
 from jesse.config import config
 from jesse.enums import timeframes
 from jesse.exceptions import RouteNotFound
+from jesse.indicators.cache import cache as indicators_cache
 from jesse.libs import DynamicNumpyArray
+from jesse.libs.dynamic_numpy_array import read_only
 from jesse.models import store_candle_into_db
 from jesse.services.candle import generate_candle_from_one_minutes
 from timeloop import Timeloop
@@ -78,7 +82,19 @@ class CandlesState:
                 f"Bellow route is required but missing in your routes:\n('{exchange}', '{symbol}', '{timeframe}')"
             )
 
-    def init_storage(self, bucket_size: int = 1000) -> None:
+    def init_storage(self, bucket_size: int = 1000, max_candles: int = None) -> None:
+        """
+        max_candles is the number of 1m candles worth of candles to keep in memory
+        for each timeframe. Older candles get dropped. If None, nothing is dropped
+        except in live mode where it defaults to twice the warm-up candles of the
+        biggest timeframe, so long-running sessions use a bounded amount of memory.
+        """
+        if max_candles is None and jh.is_live():
+            max_candles = 2 * jh.get_config('env.data.warmup_candles_num', 210) * jh.timeframe_to_one_minutes(
+                jh.max_timeframe(config['app']['considering_timeframes'])
+            )
+
+        indicators_cache.clear()
         for c in config['app']['considering_candles']:
             exchange, symbol = c[0], c[1]
 
@@ -86,7 +102,8 @@ class CandlesState:
                 key = jh.key(exchange, symbol, timeframe)
                 # ex: 1440 / 60 + 1 (reserve one for forming candle)
                 total_bigger_timeframe = int((bucket_size / jh.timeframe_to_one_minutes(timeframe)) + 1)
-                self.storage[key] = DynamicNumpyArray((total_bigger_timeframe, 6))
+                drop_at = None if max_candles is None else ceil(max_candles / jh.timeframe_to_one_minutes(timeframe))
+                self.storage[key] = DynamicNumpyArray((total_bigger_timeframe, 6), drop_at=drop_at)
 
     def add_candle(
             self,
@@ -98,6 +115,8 @@ class CandlesState:
             with_generation: bool = True,
             with_skip: bool = True
     ) -> None:
+        # the results of the indicators are of the previous candles
+        indicators_cache.clear()
 
         # add only 1 candle
         if len(candle.shape) == 1:
@@ -321,6 +340,18 @@ class CandlesState:
 
     def batch_add_candle(self, candles: np.ndarray, exchange: str, symbol: str, timeframe: str,
                          with_generation: bool = True) -> None:
+        if len(candles) == 0:
+            return
+
+        # bulk path: candles that are newer than the stored ones and don't need
+        # any per-candle side effects are written into the storage at once
+        if not with_generation and not jh.is_live() and not jh.is_collecting_data():
+            arr: DynamicNumpyArray = self.get_storage(exchange, symbol, timeframe)
+            if len(arr) == 0 or candles[0][0] > arr[-1][0]:
+                indicators_cache.clear()
+                arr.append_multiple(candles)
+                return
+
         for c in candles:
             self.add_candle(c, exchange, symbol, timeframe, with_execution=False, with_generation=with_generation,
                             with_skip=False)
@@ -329,7 +360,8 @@ class CandlesState:
         long_key = jh.key(exchange, symbol, timeframe)
         short_key = jh.key(exchange, symbol, '1m')
         required_1m_to_complete_count = jh.timeframe_to_one_minutes(timeframe)
-        current_1m_count = len(self.get_storage(exchange, symbol, '1m'))
+        # dropped candles are counted too, so dropping doesn't change the alignment
+        current_1m_count = self.get_storage(exchange, symbol, '1m').total_count
 
         dif = current_1m_count % required_1m_to_complete_count
         return dif, long_key, short_key
@@ -338,13 +370,18 @@ class CandlesState:
     # # # # # getters
     # # # # # # # # #
     def get_candles(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
+        """
+        returns a read-only view (not a copy) of the stored candles. For bigger
+        timeframes, the forming candle (if any) is written into the slot reserved
+        after the last stored candle, so it's included without any concatenation.
+        """
         # no need to worry for forming candles when timeframe == 1m
         if timeframe == '1m':
             arr: DynamicNumpyArray = self.get_storage(exchange, symbol, '1m')
             if len(arr) == 0:
                 return np.zeros((0, 6))
             else:
-                return arr[:]
+                return read_only(arr[:])
 
         # other timeframes
         dif, long_key, short_key = self.forming_estimation(exchange, symbol, timeframe)
@@ -356,22 +393,15 @@ class CandlesState:
 
         # complete candle
         if dif == 0 or self.storage[long_key][:long_count][-1][0] == self.storage[short_key][short_count - dif][0]:
-            return self.storage[long_key][:long_count]
+            return read_only(self.storage[long_key][:long_count])
         # generate forming
         else:
-            return np.concatenate(
-                (
-                    self.storage[long_key][:long_count],
-                    np.array(
-                        (
-                            generate_candle_from_one_minutes(
-                                timeframe,
-                                self.storage[short_key][short_count - dif:short_count],
-                                True
-                            ),
-                        )
-                    )
-                ), axis=0
+            return self.storage[long_key].get_view_with_forming_item(
+                generate_candle_from_one_minutes(
+                    timeframe,
+                    self.storage[short_key][short_count - dif:short_count],
+                    True
+                )
             )
 
     def get_current_candle(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
@@ -381,7 +411,7 @@ class CandlesState:
             if len(arr) == 0:
                 return np.zeros((0, 6))
             else:
-                return arr[-1]
+                return read_only(arr[-1])
 
         # other timeframes
         dif, long_key, short_key = self.forming_estimation(exchange, symbol, timeframe)
@@ -397,4 +427,4 @@ class CandlesState:
         if long_count == 0:
             return np.zeros((0, 6))
         else:
-            return self.storage[long_key][-1]
+            return read_only(self.storage[long_key][-1])
@@ -1,5 +1,6 @@
 from typing import List
 
+import numpy as np
 import pydash
 
 from jesse.config import config
@@ -12,6 +13,8 @@ class OrdersState:
         self.to_execute = []
 
         self.storage = {}
+        # sorted prices of the active orders of each key, see _get_price_index()
+        self._price_indexes = {}
 
         for exchange in config['app']['trading_exchanges']:
             for symbol in config['app']['trading_symbols']:
@@ -21,16 +24,24 @@ class OrdersState:
     def reset(self) -> None:
         for key in self.storage:
             self.storage[key].clear()
+        self._price_indexes.clear()
+
+    def clear_orders(self, exchange: str, symbol: str) -> None:
+        key = f'{exchange}-{symbol}'
+        self.storage[key].clear()
+        self._price_indexes.pop(key, None)
 
     def add_order(self, order: Order) -> None:
         key = f'{order.exchange}-{order.symbol}'
         self.storage[key].append(order)
+        self._price_indexes.pop(key, None)
 
     def remove_order(self, order: Order) -> None:
         key = f'{order.exchange}-{order.symbol}'
         self.storage[key] = [
             o for o in self.storage[key] if o.id != order.id
         ]
+        self._price_indexes.pop(key, None)
 
     # getters
     def get_orders(self, exchange, symbol) -> List[Order]:
@@ -62,6 +73,46 @@ class OrdersState:
 
         return pydash.find(self.storage[key], lambda o: o.id == id)
 
+    def get_touched_orders(self, exchange: str, symbol: str, candle: np.ndarray) -> List[Order]:
+        """
+        returns the active orders whose price is within the candle's range, in the order the
+        candle's price reaches them: open => low => high => close for bullish candles and
+        open => high => low => close for bearish ones.
+        """
+        prices, orders = self._get_price_index(f'{exchange}-{symbol}')
+
+        start = np.searchsorted(prices, candle[4], side='left')
+        end = np.searchsorted(prices, candle[3], side='right')
+        if start == end:
+            return []
+
+        o = candle[1]
+        touched = [order for order in orders[start:end] if order.is_active]
+        if candle[2] >= o:
+            return [order for order in reversed(touched) if order.price <= o] + \
+                   [order for order in touched if order.price > o]
+        return [order for order in touched if order.price >= o] + \
+               [order for order in reversed(touched) if order.price < o]
+
+    def _get_price_index(self, key: str) -> tuple:
+        """
+        returns the prices of the active orders of the key in ascending order, and the orders
+        themselves in the same order. It's dropped whenever the orders of the key are added,
+        removed or cleared (see clear_orders()), and orders deactivated after that are
+        filtered by get_touched_orders().
+        """
+        index = self._price_indexes.get(key)
+
+        if index is None:
+            # orders without a price (NaN) can't be touched
+            active_orders = sorted(
+                (o for o in self.storage.get(key, []) if o.is_active and o.price == o.price), key=lambda o: o.price
+            )
+            index = (np.array([o.price for o in active_orders], dtype=float), active_orders)
+            self._price_indexes[key] = index
+
+        return index
+
     def execute_pending_market_orders(self) -> None:
         if not self.to_execute:
             return
@@ -15,7 +15,7 @@ class TickersState:
     def init_storage(self) -> None:
         for c in config['app']['considering_candles']:
             key = jh.key(c[0], c[1])
-            self.storage[key] = DynamicNumpyArray((60, 5), drop_at=120)
+            self.storage[key] = DynamicNumpyArray((60, 5), drop_at=121)
 
     def add_ticker(self, ticker: np.ndarray, exchange: str, symbol: str) -> None:
         key = jh.key(exchange, symbol)
@@ -17,7 +17,7 @@ class TradesState:
     def init_storage(self) -> None:
         for c in config['app']['considering_candles']:
             key = jh.key(c[0], c[1])
-            self.storage[key] = DynamicNumpyArray((60, 6), drop_at=120)
+            self.storage[key] = DynamicNumpyArray((60, 6), drop_at=121)
             self.temp_storage[key] = DynamicNumpyArray((100, 4))
 
     def add_trade(self, trade: np.ndarray, exchange: str, symbol: str) -> None:
@@ -0,0 +1,26 @@
+from jesse.strategies import Strategy
+
+
+# benchmarks: no indicators, trades often. Mostly measures the order/position simulation.
+class Benchmark01(Strategy):
+    def should_long(self) -> bool:
+        return self.index % 20 == 0
+
+    def should_short(self) -> bool:
+        return self.index % 20 == 10
+
+    def go_long(self):
+        self.buy = 1, self.price
+        self.stop_loss = 1, self.price * 0.99
+        self.take_profit = 1, self.price * 1.01
+
+    def go_short(self):
+        self.sell = 1, self.price
+        self.stop_loss = 1, self.price * 1.01
+        self.take_profit = 1, self.price * 0.99
+
+    def should_cancel(self):
+        return False
+
+    def filters(self):
+        return []
@@ -0,0 +1,39 @@
+from jesse.strategies import Strategy
+import jesse.indicators as ta
+
+
+# benchmarks: a moving average crossover with ATR based exits
+class Benchmark02(Strategy):
+    @property
+    def fast_sma(self):
+        return ta.sma(self.candles, 20)
+
+    @property
+    def slow_sma(self):
+        return ta.sma(self.candles, 50)
+
+    @property
+    def atr(self):
+        return ta.atr(self.candles, 14)
+
+    def should_long(self) -> bool:
+        return self.fast_sma > self.slow_sma
+
+    def should_short(self) -> bool:
+        return self.fast_sma < self.slow_sma
+
+    def go_long(self):
+        self.buy = 1, self.price
+        self.stop_loss = 1, self.price - self.atr * 2
+        self.take_profit = 1, self.price + self.atr * 3
+
+    def go_short(self):
+        self.sell = 1, self.price
+        self.stop_loss = 1, self.price + self.atr * 2
+        self.take_profit = 1, self.price - self.atr * 3
+
+    def should_cancel(self):
+        return False
+
+    def filters(self):
+        return []
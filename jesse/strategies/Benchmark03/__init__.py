@@ -0,0 +1,35 @@
+from jesse.strategies import Strategy
+import jesse.indicators as ta
+
+
+# benchmarks: several indicators per candle, entries with limit orders that get canceled
+class Benchmark03(Strategy):
+    def before(self):
+        self.vars['rsi'] = ta.rsi(self.candles, 14)
+        self.vars['bb'] = ta.bollinger_bands(self.candles, 20)
+        self.vars['macd'] = ta.macd(self.candles)
+        self.vars['atr'] = ta.atr(self.candles, 14)
+
+    def should_long(self) -> bool:
+        return self.vars['rsi'] < 40 and self.vars['macd'].hist > 0
+
+    def should_short(self) -> bool:
+        return self.vars['rsi'] > 60 and self.vars['macd'].hist < 0
+
+    def go_long(self):
+        entry = min(self.price, self.vars['bb'].middleband) - self.vars['atr'] * 0.1
+        self.buy = 1, entry
+        self.stop_loss = 1, entry - self.vars['atr'] * 2
+        self.take_profit = 1, self.vars['bb'].upperband
+
+    def go_short(self):
+        entry = max(self.price, self.vars['bb'].middleband) + self.vars['atr'] * 0.1
+        self.sell = 1, entry
+        self.stop_loss = 1, entry + self.vars['atr'] * 2
+        self.take_profit = 1, self.vars['bb'].lowerband
+
+    def should_cancel(self):
+        return True
+
+    def filters(self):
+        return []
@@ -10,9 +10,10 @@ import jesse.services.logger as logger
 import jesse.services.selectors as selectors
 from jesse import exceptions
 from jesse.enums import sides, trade_types, order_roles
+from jesse.indicators.streaming import Stream
 from jesse.models import CompletedTrade, Order, Route, FuturesExchange, SpotExchange, Position
 from jesse.models.utils import store_completed_trade_into_db, store_order_into_db
-from jesse.services import metrics
+from jesse.services import metrics, precomputed_indicators
 from jesse.services.broker import Broker
 from jesse.store import store
 from jesse.services.cache import cached
@@ -61,6 +62,9 @@ class Strategy(ABC):
 
         self._cached_methods = {}
         self._cached_metrics = {}
+        self._streams = {}
+        self._precomputed = {}
+        self._declared_indicators = None
 
     def _init_objects(self) -> None:
         """
@@ -160,6 +164,21 @@ class Strategy(ABC):
     def hyperparameters(self) -> list:
         return []
 
+    def precomputed_indicators(self) -> list:
+        """
+        Indicators which in backtests are computed once over all the candles before the
+        simulation starts, and read with self.indicator(name). Example:
+
+            return [
+                {'name': 'fast_ema', 'indicator': 'ema', 'params': {'period': self.hp['fast']}},
+                {'name': 'daily_atr', 'indicator': 'atr', 'params': {'period': 14}, 'timeframe': '1D'},
+            ]
+
+        "indicator" is the name of a function of jesse.indicators, "params" and "timeframe"
+        (default: the route's) are optional.
+        """
+        return []
+
     def _execute_long(self) -> None:
         self.go_long()
 
@@ -391,7 +410,7 @@ class Strategy(ABC):
         self.on_cancel()
 
         if not jh.is_unit_testing() and not jh.is_live():
-            store.orders.storage[f'{self.exchange}-{self.symbol}'].clear()
+            store.orders.clear_orders(self.exchange, self.symbol)
 
     def _reset(self) -> None:
         self.buy = None
@@ -873,11 +892,11 @@ class Strategy(ABC):
     @property
     def current_candle(self) -> np.ndarray:
         """
-        Returns current trading candle
+        Returns current trading candle (read-only)
 
         :return: np.ndarray
         """
-        return store.candles.get_current_candle(self.exchange, self.symbol, self.timeframe).copy()
+        return store.candles.get_current_candle(self.exchange, self.symbol, self.timeframe)
 
     @property
     def open(self) -> float:
@@ -950,6 +969,55 @@ class Strategy(ABC):
         """
         return store.candles.get_candles(exchange, symbol, timeframe)
 
+    def stream(self, indicator: type, *args, exchange: str = None, symbol: str = None, timeframe: str = None,
+               **kwargs):
+        """
+        Returns the current value of an incremental indicator (from jesse.indicators.streaming)
+        bound to this route, or to the passed exchange, symbol and timeframe. The indicator is
+        created on the first call and then only updated with the candles added since the
+        previous call, which costs O(1) per candle:
+
+            self.stream(streaming.EMA, 20)
+            self.stream(streaming.ATR, 14, timeframe='4h')
+
+        :param indicator: type - a subclass of StreamingIndicator
+        :param exchange: str - default: the route's
+        :param symbol: str - default: the route's
+        :param timeframe: str - default: the route's
+
+        :return: float | tuple
+        """
+        exchange = exchange or self.exchange
+        symbol = symbol or self.symbol
+        timeframe = timeframe or self.timeframe
+
+        key = (indicator, args, tuple(sorted(kwargs.items())), exchange, symbol, timeframe)
+        bound = self._streams.get(key)
+        if bound is None:
+            bound = self._streams[key] = Stream(indicator(*args, **kwargs), timeframe)
+
+        return bound.read(store.candles.get_candles(exchange, symbol, timeframe))
+
+    def indicator(self, name: str):
+        """
+        Returns the value of an indicator declared in precomputed_indicators() for the
+        latest closed candle. In backtests it is read from the precomputed values,
+        otherwise it is computed on the spot.
+
+        :param name: str
+
+        :return: float | tuple
+        """
+        precomputed = self._precomputed.get(name)
+        if precomputed is not None:
+            return precomputed.value_at(jh.now())
+
+        if self._declared_indicators is None:
+            self._declared_indicators = precomputed_indicators.declarations(self)
+        if name not in self._declared_indicators:
+            raise ValueError(f'"{name}" is not declared in precomputed_indicators()')
+        return precomputed_indicators.current_value(self._declared_indicators[name])
+
     @property
     def orders(self) -> List[Order]:
         """
@@ -0,0 +1,42 @@
+import numpy as np
+
+import jesse.indicators as ta
+from jesse.indicators import streaming
+from jesse.strategies import Strategy
+
+
+# compares the incremental indicators bound with self.stream() to the batch ones
+class Test49(Strategy):
+    def before(self):
+        self.vars['checked'] = self.vars.get('checked', 0) + 1
+
+        candles = self.candles
+        np.testing.assert_allclose(self.stream(streaming.EMA, 10), ta.ema(candles, 10, sequential=True)[-1])
+        np.testing.assert_allclose(self.stream(streaming.RSI, 14), ta.rsi(candles, 14, sequential=True)[-1])
+        np.testing.assert_allclose(self.stream(streaming.ATR, period=14), ta.atr(candles, 14, sequential=True)[-1])
+        np.testing.assert_allclose(
+            self.stream(streaming.MACD, 5, 12, 4), [v[-1] for v in ta.macd(candles, 5, 12, 4, sequential=True)]
+        )
+
+        # the 15m candles include the forming one (once one is complete)
+        if self.index < 3:
+            return
+        candles_15m = self.get_candles(self.exchange, self.symbol, '15m')
+        np.testing.assert_allclose(
+            self.stream(streaming.EMA, 3, timeframe='15m'), ta.ema(candles_15m, 3, sequential=True)[-1]
+        )
+
+    def should_long(self) -> bool:
+        return False
+
+    def should_short(self) -> bool:
+        return False
+
+    def go_long(self):
+        pass
+
+    def go_short(self):
+        pass
+
+    def should_cancel(self) -> bool:
+        return False
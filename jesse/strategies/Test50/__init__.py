@@ -0,0 +1,47 @@
+import numpy as np
+
+import jesse.indicators as ta
+from jesse.strategies import Strategy
+
+
+# compares the precomputed indicators to the ones computed on the spot
+class Test50(Strategy):
+    def hyperparameters(self) -> list:
+        return [{'name': 'ema_period', 'type': int, 'min': 5, 'max': 30, 'default': 10}]
+
+    def precomputed_indicators(self) -> list:
+        return [
+            {'name': 'ema', 'indicator': 'ema', 'params': {'period': self.hp['ema_period']}},
+            {'name': 'macd', 'indicator': 'macd'},
+            {'name': 'atr_15m', 'indicator': 'atr', 'params': {'period': 3}, 'timeframe': '15m'},
+        ]
+
+    def before(self):
+        self.vars['checked'] = self.vars.get('checked', 0) + 1
+
+        np.testing.assert_equal(self.indicator('ema'), ta.ema(self.candles, self.hp['ema_period'], sequential=True)[-1])
+        np.testing.assert_equal(self.indicator('macd'), [v[-1] for v in ta.macd(self.candles, sequential=True)])
+
+        # the value is the one of the latest closed 15m candle
+        if self.index < 2:
+            assert np.isnan(self.indicator('atr_15m'))
+            return
+        candles_15m = self.get_candles(self.exchange, self.symbol, '15m')
+        if self.index % 3 != 2:
+            candles_15m = candles_15m[:-1]
+        np.testing.assert_equal(self.indicator('atr_15m'), ta.atr(candles_15m, 3, sequential=True)[-1])
+
+    def should_long(self) -> bool:
+        return False
+
+    def should_short(self) -> bool:
+        return False
+
+    def go_long(self):
+        pass
+
+    def go_short(self):
+        pass
+
+    def should_cancel(self) -> bool:
+        return False
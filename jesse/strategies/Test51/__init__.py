@@ -0,0 +1,22 @@
+from jesse.strategies import Strategy
+
+
+# rma's values depend on the candles after them
+class Test51(Strategy):
+    def precomputed_indicators(self) -> list:
+        return [{'name': 'rma', 'indicator': 'rma', 'params': {'length': 14}}]
+
+    def should_long(self) -> bool:
+        return False
+
+    def should_short(self) -> bool:
+        return False
+
+    def go_long(self):
+        pass
+
+    def go_short(self):
+        pass
+
+    def should_cancel(self) -> bool:
+        return False
@@ -32,7 +32,7 @@ setup(
     version=VERSION,
     author="Saleh Mir",
     author_email="algo@hey.com",
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     description=DESCRIPTION,
     long_description=long_description,
     long_description_content_type="text/markdown",
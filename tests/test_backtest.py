@@ -1,8 +1,11 @@
+import pytest
+
 import jesse.helpers as jh
 import jesse.services.selectors as selectors
+from jesse import exceptions
 from jesse.config import reset_config
 from jesse.enums import timeframes, exchanges
-from jesse.factories import fake_range_candle
+from jesse.factories import fake_range_candle, fake_range_candle_from_range_prices
 from jesse.modes import backtest_mode
 from jesse.routes import router
 from jesse.store import store
@@ -190,4 +193,114 @@ def test_backtesting_three_routes_and_three_extra_candles():
         assert p.current_price == last_candle[2]
 
         # assert that the strategy has been initiated
-        assert r.strategy is not None
\ No newline at end of file
+        assert r.strategy is not None
+
+def _backtest_three_routes(shards: int = 1) -> tuple:
+    reset_config()
+    router.set_routes([
+        (exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, 'Test01'),
+        (exchanges.SANDBOX, 'ETH-USDT', timeframes.MINUTE_5, 'Test01'),
+        (exchanges.SANDBOX, 'XRP-USDT', timeframes.MINUTE_15, 'Test01'),
+    ])
+    config['env']['exchanges'][exchanges.SANDBOX]['type'] = 'futures'
+    store.reset(True)
+
+    candles = {}
+    for i, symbol in enumerate(['BTC-USDT', 'ETH-USDT', 'XRP-USDT']):
+        candles[jh.key(exchanges.SANDBOX, symbol)] = {
+            'exchange': exchanges.SANDBOX,
+            'symbol': symbol,
+            'candles': fake_range_candle_from_range_prices(
+                list(range(100 + i, 3000 + i)) + list(range(3000 + i, 100, -1))
+            )
+        }
+
+    # run backtest (dates are fake just to pass)
+    backtest_mode.run('2019-04-01', '2019-04-02', candles, shards=shards)
+
+    trades = sorted(
+        [(t.symbol, t.opened_at, t.closed_at, t.pnl) for t in store.completed_trades.trades],
+        key=lambda t: (t[2], t[0])
+    )
+    return trades, store.app.daily_balance, selectors.get_exchange(exchanges.SANDBOX).assets['USDT']
+
+
+def test_backtesting_routes_in_shards():
+    trades, daily_balance, balance = _backtest_three_routes(1)
+    sharded_trades, sharded_daily_balance, sharded_balance = _backtest_three_routes(3)
+
+    assert len(trades) == 3
+    assert sharded_trades == trades
+    assert sharded_daily_balance == daily_balance
+    assert sharded_balance == balance
+    # strategies are initiated for reporting
+    for r in router.routes:
+        assert r.strategy is not None
+
+
+def test_event_engine_matches_skip_engine():
+    trades, daily_balance, balance = _backtest_three_routes()
+
+    config['env']['backtest']['engine'] = 'event'
+    try:
+        event_trades, event_daily_balance, event_balance = _backtest_three_routes()
+    finally:
+        config['env']['backtest']['engine'] = 'skip'
+
+    assert len(trades) == 3
+    assert event_trades == trades
+    assert event_daily_balance == daily_balance
+    assert event_balance == balance
+
+
+def test_shards_use_the_configured_engine(monkeypatch):
+    trades, daily_balance, balance = _backtest_three_routes()
+
+    def skip_simulator(*args, **kwargs):
+        raise AssertionError('the skip engine is not the configured one')
+
+    # the shards are forked, so they inherit it
+    monkeypatch.setattr(backtest_mode, 'skip_simulator', skip_simulator)
+    config['env']['backtest']['engine'] = 'event'
+    try:
+        sharded_trades, sharded_daily_balance, sharded_balance = _backtest_three_routes(3)
+    finally:
+        config['env']['backtest']['engine'] = 'skip'
+
+    assert sharded_trades == trades
+    assert sharded_daily_balance == daily_balance
+    assert sharded_balance == balance
+
+
+def test_skip_simulator_early_termination():
+    reset_config()
+    router.set_routes([
+        (exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, 'Test19')
+    ])
+    config['env']['exchanges'][exchanges.SANDBOX]['type'] = 'futures'
+    store.reset(True)
+    store.candles.init_storage(5000)
+
+    candles = {
+        jh.key(exchanges.SANDBOX, 'BTC-USDT'): {
+            'exchange': exchanges.SANDBOX,
+            'symbol': 'BTC-USDT',
+            'candles': fake_range_candle(1440 * 4)
+        }
+    }
+
+    # Test19 never opens a position, so it is given up on at the end of the first day
+    with pytest.raises(exceptions.EarlyTermination):
+        backtest_mode.skip_simulator(candles, early_termination={'no_trades_after': 0.2})
+    assert store.app.time == candles[jh.key(exchanges.SANDBOX, 'BTC-USDT')]['candles'][1439][0] + 60_000
+
+    store.reset(True)
+    store.candles.init_storage(5000)
+    with pytest.raises(exceptions.EarlyTermination):
+        backtest_mode.skip_simulator(candles, early_termination={'min_balance': 20_000})
+
+    # rules that aren't met don't affect the simulation
+    store.reset(True)
+    store.candles.init_storage(5000)
+    backtest_mode.skip_simulator(candles, early_termination={'min_balance': 5000, 'max_drawdown': 10})
+    assert len(store.app.daily_balance) == 6
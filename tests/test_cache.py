@@ -0,0 +1,90 @@
+import numpy as np
+
+from jesse.config import config
+from jesse.services.cache import Cache
+
+
+def fake_one_minute_candles(start_timestamp: int, count: int) -> np.ndarray:
+    candles = np.zeros((count, 6))
+    candles[:, 0] = start_timestamp + np.arange(count) * 60_000
+    candles[:, 1:] = np.arange(count).reshape(-1, 1) + np.arange(5)
+    return candles
+
+
+def test_get_candles_slices_a_cached_range(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+    candles = fake_one_minute_candles(1609459200000, 1000)
+    cache.set_candles('Sandbox', 'BTC-USDT', candles)
+
+    np.testing.assert_equal(cache.get_candles('Sandbox', 'BTC-USDT', candles[0][0], candles[-1][0]), candles)
+    np.testing.assert_equal(cache.get_candles('Sandbox', 'BTC-USDT', candles[100][0], candles[200][0]),
+                            candles[100:201])
+
+    # not (fully) cached
+    assert cache.get_candles('Sandbox', 'BTC-USDT', candles[500][0], candles[-1][0] + 60_000) is None
+    assert cache.get_candles('Sandbox', 'ETH-USDT', candles[0][0], candles[1][0]) is None
+
+    # the index is persisted
+    np.testing.assert_equal(Cache(f'{tmp_path}/').get_candles('Sandbox', 'BTC-USDT', candles[0][0], candles[9][0]),
+                            candles[:10])
+
+
+def test_set_candles_merges_overlapping_and_adjacent_ranges(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+    candles = fake_one_minute_candles(1609459200000, 3000)
+    cache.set_candles('Sandbox', 'BTC-USDT', candles[:1000])
+    cache.set_candles('Sandbox', 'BTC-USDT', candles[2000:])
+    assert len(cache.db['Sandbox-BTC-USDT']) == 2
+
+    # overlaps the first one and touches the second one
+    cache.set_candles('Sandbox', 'BTC-USDT', candles[500:2000])
+
+    assert len(cache.db['Sandbox-BTC-USDT']) == 1
+    assert len(list(tmp_path.glob('*.npy'))) == 1
+    np.testing.assert_equal(cache.get_candles('Sandbox', 'BTC-USDT', candles[0][0], candles[-1][0]), candles)
+
+
+def test_set_candles_ignores_incomplete_ranges(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+    candles = np.delete(fake_one_minute_candles(1609459200000, 100), 50, axis=0)
+    cache.set_candles('Sandbox', 'BTC-USDT', candles)
+
+    assert cache.db == {}
+
+
+def test_least_recently_used_ranges_are_evicted(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+    backup = config['env']['caching'].get('max_size_mb')
+    # room for ~2 of the 48000 bytes ranges
+    config['env']['caching']['max_size_mb'] = 100_000 / 1024 / 1024
+
+    btc = fake_one_minute_candles(1609459200000, 1000)
+    eth = fake_one_minute_candles(1609459200000, 1000)
+    ltc = fake_one_minute_candles(1609459200000, 1000)
+    try:
+        cache.set_candles('Sandbox', 'BTC-USDT', btc)
+        cache.set_candles('Sandbox', 'ETH-USDT', eth)
+        # use BTC-USDT so ETH-USDT is the least recently used one
+        cache.get_candles('Sandbox', 'BTC-USDT', btc[0][0], btc[-1][0])
+        cache.set_candles('Sandbox', 'LTC-USDT', ltc)
+    finally:
+        config['env']['caching']['max_size_mb'] = backup
+
+    assert cache.get_candles('Sandbox', 'ETH-USDT', eth[0][0], eth[-1][0]) is None
+    assert cache.get_candles('Sandbox', 'BTC-USDT', btc[0][0], btc[-1][0]) is not None
+    assert cache.get_candles('Sandbox', 'LTC-USDT', ltc[0][0], ltc[-1][0]) is not None
+
+
+def test_reads_do_not_overwrite_the_index_of_other_processes(tmp_path):
+    reader = Cache(f'{tmp_path}/')
+    writer = Cache(f'{tmp_path}/')
+    btc = fake_one_minute_candles(1609459200000, 100)
+    eth = fake_one_minute_candles(1609459200000, 100)
+
+    writer.set_candles('Sandbox', 'BTC-USDT', btc)
+    reader.set_candles('Sandbox', 'BTC-USDT', btc)
+    writer.set_candles('Sandbox', 'ETH-USDT', eth)
+    # the reader's index doesn't have ETH-USDT
+    assert reader.get_candles('Sandbox', 'BTC-USDT', btc[0][0], btc[-1][0]) is not None
+
+    assert Cache(f'{tmp_path}/').get_candles('Sandbox', 'ETH-USDT', eth[0][0], eth[-1][0]) is not None
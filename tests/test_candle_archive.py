@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import jesse.helpers as jh
+from jesse.exceptions import CandleNotFoundInDatabase
+from jesse.services.candle_archive import CandleArchive
+
+
+def fake_one_minute_candles(start_date: str, count: int) -> np.ndarray:
+    start = jh.date_to_timestamp(start_date)
+    candles = np.zeros((count, 6))
+    candles[:, 0] = start + np.arange(count) * 60_000
+    candles[:, 1] = np.arange(count) + 100
+    candles[:, 2] = np.arange(count) + 101
+    candles[:, 3] = np.arange(count) + 102
+    candles[:, 4] = np.arange(count) + 99
+    candles[:, 5] = np.arange(count) % 7
+    return candles
+
+
+def test_store_and_load_candles_across_months(tmp_path):
+    archive = CandleArchive(f'{tmp_path}/')
+    # 2021-01-31 00:00 => 2021-02-01 23:59
+    candles = fake_one_minute_candles('2021-01-31', 1440 * 2)
+
+    archive.store(candles, 'Sandbox', 'BTC-USDT')
+
+    assert (tmp_path / 'Sandbox' / 'BTC-USDT' / '2021-01.npy').is_file()
+    assert (tmp_path / 'Sandbox' / 'BTC-USDT' / '2021-02.npy').is_file()
+
+    np.testing.assert_equal(archive.load('Sandbox', 'BTC-USDT', candles[0][0], candles[-1][0]), candles)
+    # a sub-range
+    np.testing.assert_equal(archive.load('Sandbox', 'BTC-USDT', candles[1000][0], candles[2000][0]),
+                            candles[1000:2001])
+
+
+def test_store_overwrites_already_archived_candles(tmp_path):
+    archive = CandleArchive(f'{tmp_path}/')
+    candles = fake_one_minute_candles('2021-01-01', 100)
+    archive.store(candles, 'Sandbox', 'BTC-USDT')
+
+    updated = candles[50:60].copy()
+    updated[:, 2] = 1
+    archive.store(updated, 'Sandbox', 'BTC-USDT')
+
+    loaded = archive.load('Sandbox', 'BTC-USDT', candles[0][0], candles[-1][0])
+    np.testing.assert_equal(loaded[:50], candles[:50])
+    np.testing.assert_equal(loaded[50:60], updated)
+    np.testing.assert_equal(loaded[60:], candles[60:])
+
+
+def test_load_raises_for_missing_candles(tmp_path):
+    archive = CandleArchive(f'{tmp_path}/')
+    candles = fake_one_minute_candles('2021-01-01', 100)
+    archive.store(np.delete(candles, 10, axis=0), 'Sandbox', 'BTC-USDT')
+
+    with pytest.raises(CandleNotFoundInDatabase):
+        archive.load('Sandbox', 'BTC-USDT', candles[0][0], candles[-1][0])
+
+    # missing month file
+    with pytest.raises(CandleNotFoundInDatabase):
+        archive.load('Sandbox', 'BTC-USDT', candles[0][0], jh.date_to_timestamp('2021-02-02'))
+
+    # complete sub-range is still loadable
+    np.testing.assert_equal(archive.load('Sandbox', 'BTC-USDT', candles[20][0], candles[30][0]), candles[20:31])
@@ -26,6 +26,19 @@ def test_generate_candle_from_one_minutes():
     assert five_minutes_candle[5] == candles[:, 5].sum()
 
 
+def test_batch_generate_candles_from_one_minutes():
+    candles = fake_range_candle(62)
+
+    five_minutes_candles = batch_generate_candles_from_one_minutes('5m', candles)
+
+    # the 2 trailing candles don't form a complete candle
+    assert len(five_minutes_candles) == 12
+    for i in range(12):
+        np.testing.assert_allclose(
+            five_minutes_candles[i], generate_candle_from_one_minutes('5m', candles[i * 5:(i + 1) * 5])
+        )
+
+
 def test_is_bearish():
     c = np.array([1543387200000, 200, 190, 220, 180, 195])
     assert is_bearish(c)
@@ -0,0 +1,90 @@
+import struct
+
+import numpy as np
+
+from jesse.services import candle_schema
+from jesse.services.candle_schema import partition_statements
+from jesse.services.db import _copy_binary
+from tests.data import test_candles_0
+
+
+def test_copy_binary_encodes_the_candles_in_the_binary_format_of_copy():
+    candles = np.array(test_candles_0[:3], dtype=np.float64)
+    data = _copy_binary(candles)
+
+    assert data[:11] == b'PGCOPY\n\xff\r\n\x00'
+    assert struct.unpack('>ii', data[11:19]) == (0, 0)
+    assert struct.unpack('>h', data[-2:]) == (-1,)
+
+    offset = 19
+    for candle in candles:
+        assert struct.unpack_from('>h', data, offset) == (6,)
+        offset += 2
+        values = []
+        for kind in ['q', 'd', 'd', 'd', 'd', 'd']:
+            length, value = struct.unpack_from(f'>i{kind}', data, offset)
+            assert length == 8
+            values.append(value)
+            offset += 12
+        assert values == [int(candle[0])] + candle[1:].tolist()
+    assert offset == len(data) - 2
+
+
+def test_partition_statements_cover_the_months_of_the_range():
+    # 2021-01-31 23:59 to 2021-03-01 00:00
+    statements = partition_statements(1612137540000, 1614556800000)
+
+    assert statements == [
+        'CREATE TABLE IF NOT EXISTS candle_compact_2021_01 PARTITION OF candle_compact '
+        'FOR VALUES FROM (1609459200000) TO (1612137600000)',
+        'CREATE TABLE IF NOT EXISTS candle_compact_2021_02 PARTITION OF candle_compact '
+        'FOR VALUES FROM (1612137600000) TO (1614556800000)',
+        'CREATE TABLE IF NOT EXISTS candle_compact_2021_03 PARTITION OF candle_compact '
+        'FOR VALUES FROM (1614556800000) TO (1617235200000)',
+    ]
+
+
+class FakeCursor:
+    def __init__(self, markets: dict):
+        self.markets = markets
+        # the sequence of the ids, which never gives the same one twice
+        self.last_id = max(markets.values(), default=0)
+        self.queries = []
+        self._row = None
+
+    def execute(self, sql: str, params: tuple) -> None:
+        self.queries.append(sql)
+        if sql.startswith('INSERT'):
+            self.last_id += 1
+            self.markets.setdefault(params, self.last_id)
+        self._row = (self.markets[params],) if params in self.markets else None
+
+    def fetchone(self):
+        return self._row
+
+
+def test_market_id_only_inserts_missing_markets_once(monkeypatch):
+    monkeypatch.setattr(candle_schema, '_market_ids', {})
+    cursor = FakeCursor({('Binance', 'BTC-USDT'): 1})
+
+    assert candle_schema.market_id(cursor, 'Binance', 'BTC-USDT') == 1
+    assert candle_schema.market_id(cursor, 'Binance', 'ETH-USDT') == 2
+    assert [q.split()[0] for q in cursor.queries] == ['SELECT', 'SELECT', 'INSERT']
+
+    # the inserted one is cached once it's read back, so storing more candles of the markets doesn't query them
+    assert candle_schema.market_id(cursor, 'Binance', 'ETH-USDT') == 2
+    assert candle_schema.market_id(cursor, 'Binance', 'BTC-USDT') == 1
+    assert candle_schema.market_id(cursor, 'Binance', 'ETH-USDT') == 2
+    assert [q.split()[0] for q in cursor.queries] == ['SELECT', 'SELECT', 'INSERT', 'SELECT']
+
+
+def test_market_id_is_not_cached_before_the_insert_commits(monkeypatch):
+    monkeypatch.setattr(candle_schema, '_market_ids', {})
+    cursor = FakeCursor({})
+
+    assert candle_schema.market_id(cursor, 'Binance', 'BTC-USDT') == 1
+    # the transaction that inserted it rolled back
+    del cursor.markets[('Binance', 'BTC-USDT')]
+
+    assert candle_schema.market_id(cursor, 'Binance', 'BTC-USDT') == 2
+    assert candle_schema.market_id(cursor, 'Binance', 'BTC-USDT') == 2
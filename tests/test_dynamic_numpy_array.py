@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from jesse.libs import DynamicNumpyArray
+
+
+def test_append_grows_the_array():
+    a = DynamicNumpyArray((10, 2))
+    for i in range(100):
+        a.append(np.array([i, i * 2]))
+
+    assert len(a) == 100
+    assert a.total_count == 100
+    np.testing.assert_equal(a[:][:, 0], np.arange(100))
+    np.testing.assert_equal(a[-1], [99, 198])
+    np.testing.assert_equal(a[-10:][:, 0], np.arange(90, 100))
+    np.testing.assert_equal(a.get_past_item(5), [94, 188])
+
+    a.append_multiple(np.array([[100, 200], [101, 202]]))
+    assert len(a) == 102
+    np.testing.assert_equal(a[-2:][:, 0], [100, 101])
+
+
+def test_append_multiple_to_an_empty_array():
+    a = DynamicNumpyArray((10, 2))
+    items = np.arange(500).reshape(250, 2)
+    a.append_multiple(items)
+
+    assert len(a) == 250
+    np.testing.assert_equal(a[:], items)
+
+
+def test_drop_at_keeps_only_the_latest_items():
+    a = DynamicNumpyArray((10, 2), drop_at=10)
+    for i in range(25):
+        a.append(np.array([i, i]))
+
+    assert len(a) == 10
+    assert a.total_count == 25
+    # contiguous view of the kept items
+    np.testing.assert_equal(a[:][:, 0], np.arange(15, 25))
+    np.testing.assert_equal(a[0], [15, 15])
+    np.testing.assert_equal(a.get_past_item(9), [15, 15])
+    with pytest.raises(IndexError):
+        a.get_past_item(10)
+
+    a[-1] = np.array([-1, -1])
+    np.testing.assert_equal(a[-1], [-1, -1])
+    np.testing.assert_equal(a[:][-1], [-1, -1])
+
+    # wraps around the ring
+    a.append_multiple(np.array([[25, 25], [26, 26], [27, 27]]))
+    np.testing.assert_equal(a[:][:, 0], [18, 19, 20, 21, 22, 23, -1, 25, 26, 27])
+
+    # more items than drop_at
+    a.append_multiple(np.array([[i, i] for i in range(100, 120)]))
+    np.testing.assert_equal(a[:][:, 0], np.arange(110, 120))
+    assert a.total_count == 48
+
+    a.flush()
+    assert len(a) == 0
+    assert a.total_count == 0
+
+
+def test_get_view_with_forming_item():
+    for drop_at in (None, 5):
+        a = DynamicNumpyArray((5, 2), drop_at=drop_at)
+        for i in range(12):
+            a.append(np.array([i, i]))
+            view = a.get_view_with_forming_item(np.array([-1, -1]))
+            np.testing.assert_equal(view[-1], [-1, -1])
+            np.testing.assert_equal(view[:-1], a[:])
+            assert not view.flags.writeable
+
+        # the forming item isn't appended
+        assert a[-1][0] == 11
@@ -0,0 +1,35 @@
+import jesse.helpers as jh
+from jesse.modes.optimize_mode.fitness_cache import FitnessCache
+
+strategy_hp = [
+    {'name': 'period', 'type': int, 'min': 1, 'max': 3, 'default': 2},
+    {'name': 'ratio', 'type': float, 'min': 0.1, 'max': 0.9, 'default': 0.5},
+]
+identity = {'strategy_name': 'Test01', 'training_candles': (1, 2), 'testing_candles': (3, 4)}
+result = (0.5, {'win-rate': 50, 'total': 10, 'PNL': 1.5}, {'win-rate': 40, 'total': 2, 'PNL': 0.5})
+
+
+def test_dnas_with_the_same_hyperparameters_share_the_result(tmp_path):
+    cache = FitnessCache(f'{tmp_path}/', strategy_hp, identity)
+
+    # both decode into the same hyperparameters
+    assert jh.dna_to_hp(strategy_hp, '(A') == jh.dna_to_hp(strategy_hp, ')A')
+
+    assert cache.get('(A') is None
+    cache.set('(A', result)
+    assert cache.get(')A') == result
+    assert cache.get('(B') is None
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert cache.hit_rate == 1 / 3
+
+
+def test_results_are_persisted_per_identity(tmp_path):
+    cache = FitnessCache(f'{tmp_path}/', strategy_hp, identity)
+    cache.set('(A', result)
+    cache.save()
+
+    assert FitnessCache(f'{tmp_path}/', strategy_hp, identity).get('(A') == result
+    # different candles (or anything else in the identity) must not share results
+    assert FitnessCache(f'{tmp_path}/', strategy_hp, {**identity, 'testing_candles': (3, 5)}).get('(A') is None
@@ -0,0 +1,61 @@
+import os
+
+from jesse.config import reset_config
+from jesse.enums import exchanges, timeframes
+from jesse.modes.optimize_mode.Genetics import Genetics
+from jesse.routes import router
+from jesse.store import store
+
+log = {'win-rate': 50, 'total': 10, 'PNL': 1.5}
+options = {
+    'strategy_name': 'Test01', 'exchange': exchanges.SANDBOX, 'symbol': 'BTC-USDT', 'timeframe': timeframes.MINUTE_5,
+    'start_date': '2019-04-01', 'finish_date': '2019-04-02', 'csv': False, 'json': False,
+}
+
+
+class FakeGenetics(Genetics):
+    def fitness(self, dna: str) -> tuple:
+        if dna == 'X':
+            # like jh.terminate_app() from a strategy
+            os._exit(1)
+        if dna == 'Y':
+            raise SystemExit
+        return 0.5, log, log
+
+
+def make_genetics(tmp_path, monkeypatch, **kwargs) -> FakeGenetics:
+    monkeypatch.chdir(tmp_path)
+    reset_config()
+    router.set_routes([(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, 'Test01')])
+    store.reset(True)
+
+    genetics = FakeGenetics(options=options, **kwargs)
+    genetics.cpu_cores = 2
+    return genetics
+
+
+def test_a_dead_worker_does_not_block_the_evaluation(tmp_path, monkeypatch):
+    genetics = make_genetics(tmp_path, monkeypatch, iterations=10, population_size=10, solution_len=1)
+
+    try:
+        people = genetics._evaluate_dnas(['A', 'X', 'Y'])
+        # X killed its worker (and maybe the DNAs that were in flight with it) and Y failed
+        assert {p['dna'] for p in people} <= {'A'}
+
+        # a new pool is made for the next ones
+        people = genetics._evaluate_dnas(['B', 'C'])
+        assert sorted(p['dna'] for p in people) == ['B', 'C']
+    finally:
+        genetics._close_pool()
+
+
+def test_initial_population_stops_when_there_are_no_more_dnas(tmp_path, monkeypatch):
+    # only 3 different DNAs for a population of 10
+    genetics = make_genetics(tmp_path, monkeypatch, iterations=10, population_size=10, solution_len=1, charset='ABC')
+
+    try:
+        genetics.generate_initial_population()
+    finally:
+        genetics._close_pool()
+
+    assert sorted(p['dna'] for p in genetics.population) == ['A', 'B', 'C']
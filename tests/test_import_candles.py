@@ -1,5 +1,12 @@
+import threading
+import time
+
+import pytest
+
 import jesse.helpers as jh
 import jesse.modes.import_candles_mode as importer
+from jesse.modes.import_candles_mode.pipeline import ImportPipeline, TokenBucket
+from jesse.services.candle_coverage import chunk_starts
 from tests.data import test_candles_0
 
 test_object_candles = []
@@ -76,3 +83,85 @@ def test_more_than_one_set_of_candles_in_the_middle_are_absent():
     assert len(candles) == 7
     assert candles[0]['timestamp'] == start
     assert candles[-1]['timestamp'] == end
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50)
+    begin = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    # the first one is immediate, the next ones 20 milliseconds apart
+    assert time.monotonic() - begin >= 0.19
+
+
+def test_import_pipeline_stores_every_chunk_with_backpressure():
+    stored = []
+    pending = []
+    max_pending = [0]
+    lock = threading.Lock()
+
+    def fetch_chunk(start_timestamp):
+        with lock:
+            pending.append(start_timestamp)
+            max_pending[0] = max(max_pending[0], len(pending))
+        return [{'timestamp': start_timestamp}]
+
+    def store(candles):
+        # a slow database
+        time.sleep(0.005)
+        with lock:
+            pending.remove(candles[0]['timestamp'])
+        stored.extend(c['timestamp'] for c in candles)
+
+    progress = []
+    pipeline = ImportPipeline(fetch_chunk, store, workers=4, queue_size=2, on_stored=progress.append)
+    pipeline.run(list(range(50)))
+
+    assert sorted(stored) == list(range(50))
+    assert len(progress) == 50
+    # at most: the queue, one chunk per worker waiting for room in it, and the one being stored
+    assert max_pending[0] <= 2 + 4 + 1
+
+
+def test_import_pipeline_raises_the_errors_of_the_workers():
+    stored = []
+
+    def fetch_chunk(start_timestamp):
+        if start_timestamp == 3:
+            raise ValueError('unsupported symbol')
+        return [start_timestamp]
+
+    pipeline = ImportPipeline(fetch_chunk, stored.extend, workers=1, queue_size=1)
+    with pytest.raises(ValueError):
+        pipeline.run(list(range(10)))
+
+    # the chunks that were fetched before the error are stored
+    assert stored == [0, 1, 2]
+
+
+def test_chunk_starts_cover_the_missing_ranges_only():
+    minute = 60_000
+    ranges = [(0, 10 * minute), (20 * minute, 20 * minute), (30 * minute, 33 * minute)]
+
+    assert chunk_starts(ranges, 4 * minute) == [0, 4 * minute, 8 * minute, 20 * minute, 30 * minute]
+    assert chunk_starts([], 4 * minute) == []
+
+
+def test_fill_absent_candles_prices_of_the_filler_candles():
+    start = smaller_data_set[0]['timestamp']
+    end = smaller_data_set[-1]['timestamp']
+    candles = importer._fill_absent_candles(smaller_data_set[2:4] + smaller_data_set[5:6], start, end)
+
+    # leading gap: the open of the first fetched candle
+    for c in candles[:2]:
+        assert c['open'] == c['close'] == c['high'] == c['low'] == smaller_data_set[2]['open']
+        assert c['volume'] == 0
+    # the fetched candles themselves are kept
+    assert candles[2] is smaller_data_set[2]
+    assert candles[3] is smaller_data_set[3]
+    # gaps in the middle and at the end: the close of the latest fetched candle
+    assert candles[4]['open'] == candles[4]['close'] == smaller_data_set[3]['close']
+    assert candles[4]['volume'] == 0
+    assert candles[5] is smaller_data_set[5]
+    assert candles[6]['open'] == candles[6]['close'] == smaller_data_set[5]['close']
+    assert [c['timestamp'] for c in candles] == [c['timestamp'] for c in smaller_data_set]
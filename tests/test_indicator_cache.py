@@ -0,0 +1,75 @@
+import numpy as np
+
+import jesse.indicators as ta
+from jesse.config import reset_config
+from jesse.enums import exchanges, timeframes
+from jesse.factories import fake_range_candle, fake_range_candle_from_range_prices
+from jesse.indicators.cache import cache
+from jesse.routes import router
+from jesse.store import store
+
+
+def set_up():
+    reset_config()
+    router.set_routes([(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1, 'Test19')])
+    store.reset(True)
+    store.candles.init_storage()
+    store.candles.batch_add_candle(fake_range_candle(100), exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1,
+                                   with_generation=False)
+
+
+def test_identical_calls_on_the_candles_of_the_store_are_computed_once():
+    set_up()
+    candles = store.candles.get_candles(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1)
+    hits = cache.hits
+
+    first = ta.ema(candles, 20, sequential=True)
+    # another view of the same candles
+    second = ta.ema(store.candles.get_candles(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1), 20,
+                    sequential=True)
+    assert cache.hits == hits + 1
+    np.testing.assert_equal(second, first)
+    np.testing.assert_equal(first, ta.ema(np.array(candles), 20, sequential=True))
+
+    # each caller gets its own copy, which it can modify without affecting the others
+    expected = first.copy()
+    first[first > 0] = 0
+    second[:] = 1
+    np.testing.assert_equal(ta.ema(candles, 20, sequential=True), expected)
+    ta.macd(candles, sequential=True)
+    macd = ta.macd(candles, sequential=True)
+    assert type(macd).__name__ == 'MACD'
+    macd.hist[0] = 1
+    assert ta.macd(candles, sequential=True).hist[0] != 1
+
+    # different parameters
+    assert ta.ema(candles, 21) != ta.ema(candles, 20)
+    assert ta.ema(candles, 20) == expected[-1]
+
+
+def test_indicator_cache_is_cleared_when_a_candle_is_added():
+    set_up()
+    candles = store.candles.get_candles(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1)
+    first = ta.sma(candles, 10, sequential=True)
+
+    new_candle = candles[-1].copy()
+    new_candle[0] += 60_000
+    new_candle[2] += 10
+    store.candles.add_candle(new_candle, exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1,
+                             with_execution=False, with_generation=False)
+    assert cache._results == {}
+
+    candles = store.candles.get_candles(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_1)
+    assert len(ta.sma(candles, 10, sequential=True)) == len(first) + 1
+    assert ta.sma(candles, 10) == ta.sma(np.array(candles), 10)
+    assert ta.sma(candles, 10) != first[-1]
+
+
+def test_writeable_candles_are_not_cached():
+    candles = fake_range_candle_from_range_prices(range(1, 100))
+    misses = cache.misses
+
+    first = ta.ema(candles, 10, sequential=True)
+    assert ta.ema(candles, 10, sequential=True) is not first
+    assert first.flags.writeable
+    assert cache.misses == misses
@@ -0,0 +1,49 @@
+import importlib
+import inspect
+import pkgutil
+
+import numpy as np
+import pytest
+from numba.core.registry import CPUDispatcher
+
+import jesse.indicators
+from .data.test_candles_indicators import test_candles_19
+
+
+def modules_with_kernels() -> list:
+    res = []
+    for module_info in pkgutil.iter_modules(jesse.indicators.__path__):
+        module = importlib.import_module(f'jesse.indicators.{module_info.name}')
+        if hasattr(module, module_info.name) and any(isinstance(v, CPUDispatcher) for v in vars(module).values()):
+            res.append(module_info.name)
+    return res
+
+
+def values_of(res) -> list:
+    return [np.asarray(v, dtype=float) for v in res] if isinstance(res, tuple) else [np.asarray(res, dtype=float)]
+
+
+@pytest.mark.parametrize('name', modules_with_kernels())
+def test_compiled_kernels_match_the_python_fallback(name, monkeypatch):
+    """
+    the outputs of the compiled kernels (which tests/test_indicators.py checks against the
+    reference values) must be the same as the ones of the python code they are compiled from,
+    which is what runs without numba
+    """
+    module = importlib.import_module(f'jesse.indicators.{name}')
+    indicator = getattr(module, name)
+    candles = np.array(test_candles_19)
+    kwargs = {'sequential': True} if 'sequential' in inspect.signature(indicator).parameters else {}
+
+    compiled = values_of(indicator(candles, **kwargs))
+
+    # kernels are looked up in the module they are called from
+    for key, value in list(vars(module).items()):
+        if isinstance(value, CPUDispatcher):
+            monkeypatch.setattr(module, key, value.py_func)
+
+    python = values_of(indicator(candles, **kwargs))
+
+    assert len(compiled) == len(python)
+    for c, p in zip(compiled, python):
+        np.testing.assert_allclose(c, p, rtol=1e-9, atol=1e-9, equal_nan=True)
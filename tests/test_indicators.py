@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import numpy as np
 
 import jesse.indicators as ta
@@ -2306,3 +2309,30 @@ def test_zscore():
     assert round(single, 1) == -3.2
     assert len(seq) == len(candles)
     assert seq[-1] == single
+
+
+def test_batch_of_periods():
+    candles = np.array(test_candles_19)
+    periods = [2, 5, 14, 50]
+
+    for indicator in [ta.sma, ta.ema, ta.rsi, ta.atr]:
+        seq = indicator(candles, periods, sequential=True)
+        single = indicator(candles, periods)
+
+        assert seq.shape == (len(periods), len(candles))
+        for row, period in zip(seq, periods):
+            np.testing.assert_allclose(row, indicator(candles, period, sequential=True), rtol=1e-12, equal_nan=True)
+        np.testing.assert_array_equal(single, seq[:, -1])
+
+
+def test_indicators_are_imported_lazily():
+    code = '; '.join([
+        'import sys',
+        'import jesse.indicators as ta',
+        'assert "talib" not in sys.modules',
+        'assert callable(ta.ema) and "talib" in sys.modules',
+        # importing the module of an indicator must not hide the indicator
+        'import jesse.indicators.sma',
+        'assert callable(ta.sma)',
+    ])
+    subprocess.run([sys.executable, '-c', code], check=True)
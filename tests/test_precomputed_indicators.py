@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import jesse.helpers as jh
+import jesse.indicators as ta
+from jesse import exceptions
+from jesse.config import config, reset_config
+from jesse.enums import exchanges, timeframes
+from jesse.factories import fake_range_candle_from_range_prices
+from jesse.modes import backtest_mode
+from jesse.routes import router
+from jesse.services.precomputed_indicators import PrecomputedIndicator, SeriesCache, series_cache
+from jesse.store import store
+
+
+def get_candles() -> dict:
+    return {
+        jh.key(exchanges.SANDBOX, 'BTC-USDT'): {
+            'exchange': exchanges.SANDBOX,
+            'symbol': 'BTC-USDT',
+            'candles': fake_range_candle_from_range_prices(np.linspace(100, 150, 1200) + np.sin(np.arange(1200)) * 5)
+        }
+    }
+
+
+def backtest(strategy_name: str, candles: dict = None, trading_mode: str = '') -> None:
+    reset_config()
+    config['app']['trading_mode'] = trading_mode
+    router.set_routes([(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, strategy_name)])
+    router.set_extra_candles([(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_15)])
+    store.reset(True)
+
+    backtest_mode.run('2019-04-01', '2019-04-02', candles or get_candles())
+
+
+def test_precomputed_indicators_match_the_ones_computed_on_the_spot():
+    backtest('Test50')
+
+    strategy = router.routes[0].strategy
+    assert strategy.vars['checked'] == 240
+
+    # computed on the spot when not precomputed (like in live trading)
+    strategy._precomputed = {}
+    assert strategy.indicator('ema') == ta.ema(strategy.candles, 10)
+    with pytest.raises(ValueError):
+        strategy.indicator('sma')
+
+
+def test_precomputed_indicators_must_not_look_ahead():
+    with pytest.raises(exceptions.LookAheadBias):
+        backtest('Test51')
+
+
+def test_precomputed_indicator_reads_the_latest_closed_candle():
+    # 5m candles with a gap of 10 minutes after the third one
+    timestamps = np.array([0, 300_000, 600_000, 1_500_000, 1_800_000])
+    indicator = PrecomputedIndicator(np.array([1.0, 2.0, 3.0, 4.0, 5.0]), timestamps, timeframes.MINUTE_5)
+
+    assert np.isnan(indicator.value_at(299_999))
+    assert indicator.value_at(300_000) == 1
+    assert indicator.value_at(599_999) == 1
+    assert indicator.value_at(900_000) == 3
+    assert indicator.value_at(1_700_000) == 3
+    assert indicator.value_at(1_800_000) == 4
+    assert indicator.value_at(10_000_000) == 5
+
+
+def test_optimize_mode_computes_every_period_of_the_hyperparameter_at_once():
+    series_cache.clear()
+    candles = get_candles()
+    try:
+        backtest('Test50', candles, 'optimize')
+    finally:
+        config['app']['trading_mode'] = ''
+
+    # ema for periods 5 to 30, plus macd and atr
+    assert len(series_cache._values) == 26 + 2
+
+    # the next DNAs (and backtests) on the same candles reuse them
+    hits = series_cache.hits
+    backtest('Test50', candles)
+    assert series_cache.hits == hits + 3
+
+
+def test_series_cache_drops_the_least_recently_used_values():
+    reset_config()
+    config['env']['optimization']['indicator_cache_size'] = 3 * 8000 / 1024 ** 2
+    try:
+        cache = SeriesCache()
+        for key in 'abc':
+            cache.set(key, np.zeros(1000))
+        assert cache.get('a') is not None
+
+        cache.set('d', np.zeros(1000))
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.nbytes == 3 * 8000
+    finally:
+        reset_config()
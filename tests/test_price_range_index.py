@@ -0,0 +1,39 @@
+import numpy as np
+
+from jesse.libs import PriceRangeIndex
+
+
+def fake_candles(count: int) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    candles = np.zeros((count, 6))
+    candles[:, 3] = rng.random(count) * 100 + 50
+    candles[:, 4] = candles[:, 3] - rng.random(count) * 60
+    return candles
+
+
+def test_max_high_and_min_low():
+    candles = fake_candles(1000)
+    index = PriceRangeIndex(candles, block_size=8)
+
+    for start, end in [(0, 1), (0, 1000), (3, 7), (5, 70), (64, 128), (100, 999), (999, 1000)]:
+        assert index.max_high(start, end) == candles[start:end, 3].max()
+        assert index.min_low(start, end) == candles[start:end, 4].min()
+
+
+def test_first_touch():
+    candles = np.zeros((200, 6))
+    candles[:, 3] = 101
+    candles[:, 4] = 99
+    candles[150, 3] = 110
+    candles[170, 4] = 80
+    index = PriceRangeIndex(candles, block_size=16)
+
+    assert index.first_touch(100, 10, 200) == 10
+    assert index.first_touch(105, 10, 200) == 150
+    assert index.first_touch(105, 151, 200) is None
+    assert index.first_touch(85, 0, 200) == 170
+    assert index.first_touch(85, 0, 170) is None
+    assert index.first_touch(200, 0, 200) is None
+
+    # the previous close counts as touched from the first candle on
+    assert index.first_touch(105, 10, 200, previous_close=106) == 10
@@ -0,0 +1,45 @@
+import jesse.helpers as jh
+from jesse.config import config, reset_config
+from jesse.enums import exchanges, timeframes
+from jesse.factories import fake_range_candle_from_range_prices
+from jesse.modes import backtest_mode
+from jesse.routes import router
+from jesse.services.profiler import profiler
+from jesse.store import store
+from jesse.strategies import Strategy
+
+
+def test_profiling_a_backtest(tmp_path):
+    reset_config()
+    router.set_routes([
+        (exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, 'Test01')
+    ])
+    config['env']['exchanges'][exchanges.SANDBOX]['type'] = 'futures'
+    store.reset(True)
+
+    candles = {
+        jh.key(exchanges.SANDBOX, 'BTC-USDT'): {
+            'exchange': exchanges.SANDBOX,
+            'symbol': 'BTC-USDT',
+            'candles': fake_range_candle_from_range_prices(range(100, 200))
+        }
+    }
+    original_execute = Strategy._execute
+
+    backtest_mode.run('2019-04-01', '2019-04-02', candles, profile=True, profile_output=f'{tmp_path}/profile.txt')
+
+    # 100 candles of 1m => 20 candles of 5m
+    assert profiler.stats['Strategy._execute']['calls'] == 20
+    assert profiler.stats['Strategy._check']['calls'] == 20
+    # buy, stop-loss and take-profit orders: the buy and the take-profit get executed
+    assert profiler.stats['Order.execute']['calls'] == 2
+    assert profiler.stats['simulation']['total'] >= profiler.stats['Strategy._execute']['total']
+
+    # the instrumentation is removed afterwards
+    assert Strategy._execute is original_execute
+    assert not profiler.enabled
+
+    with open(f'{tmp_path}/profile.txt') as f:
+        lines = f.read().splitlines()
+    assert 'simulation;_execute_candles;Strategy._execute;Strategy._check' in [line.rsplit(' ', 1)[0] for line in lines]
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
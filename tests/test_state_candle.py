@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from jesse.config import config, reset_config
 from jesse.factories import fake_candle, fake_range_candle
@@ -28,6 +29,21 @@ def test_batch_add_candles():
     np.testing.assert_equal(store.candles.get_candles('Sandbox', 'BTC-USD', '1m'), candles_to_add)
 
 
+def test_batch_add_candles_without_generation_bigger_than_storage_bucket():
+    set_up()
+
+    candles_to_add = fake_range_candle(5000)
+    store.candles.batch_add_candle(candles_to_add, 'Sandbox', 'BTC-USD', '1m', with_generation=False)
+    np.testing.assert_equal(store.candles.get_candles('Sandbox', 'BTC-USD', '1m'), candles_to_add)
+
+    # newer candles are appended
+    more_candles = fake_range_candle(10)
+    more_candles[:, 0] = candles_to_add[-1][0] + 60_000 * np.arange(1, 11)
+    store.candles.batch_add_candle(more_candles, 'Sandbox', 'BTC-USD', '1m', with_generation=False)
+    assert len(store.candles.get_candles('Sandbox', 'BTC-USD', '1m')) == 5010
+    np.testing.assert_equal(store.candles.get_candles('Sandbox', 'BTC-USD', '1m')[-10:], more_candles)
+
+
 def test_can_add_new_candle():
     set_up()
 
@@ -105,6 +121,54 @@ def test_get_candles_including_forming():
     assert candles[-1][0] == candles_to_add[10][0]
 
 
+def test_get_candles_returns_read_only_views():
+    set_up()
+
+    candles_to_add = fake_range_candle(12)
+    store.candles.batch_add_candle(candles_to_add, 'Sandbox', 'BTC-USD', '1m')
+    store.candles.add_candle(generate_candle_from_one_minutes('5m', candles_to_add[0:5]), 'Sandbox', 'BTC-USD', '5m')
+    store.candles.add_candle(generate_candle_from_one_minutes('5m', candles_to_add[5:10]), 'Sandbox', 'BTC-USD', '5m')
+
+    one_minute_candles = store.candles.get_candles('Sandbox', 'BTC-USD', '1m')
+    # includes the forming candle
+    five_minutes_candles = store.candles.get_candles('Sandbox', 'BTC-USD', '5m')
+    assert len(five_minutes_candles) == 3
+    np.testing.assert_equal(five_minutes_candles[-1],
+                            generate_candle_from_one_minutes('5m', candles_to_add[10:12], True))
+
+    # no copies are made
+    assert np.shares_memory(one_minute_candles, store.candles.get_storage('Sandbox', 'BTC-USD', '1m').array)
+    assert np.shares_memory(five_minutes_candles, store.candles.get_storage('Sandbox', 'BTC-USD', '5m').array)
+    # the forming candle isn't stored as a complete candle
+    assert len(store.candles.get_storage('Sandbox', 'BTC-USD', '5m')) == 2
+
+    for candles in (one_minute_candles, five_minutes_candles,
+                    store.candles.get_current_candle('Sandbox', 'BTC-USD', '1m')):
+        with pytest.raises(ValueError):
+            candles[-1] = 0
+
+
+def test_init_storage_with_max_candles_drops_old_candles():
+    set_up()
+    store.candles.init_storage(max_candles=10)
+
+    candles_to_add = fake_range_candle(23)
+    store.candles.batch_add_candle(candles_to_add, 'Sandbox', 'BTC-USD', '1m')
+    for i in range(4):
+        store.candles.add_candle(
+            generate_candle_from_one_minutes('5m', candles_to_add[i * 5:(i + 1) * 5]), 'Sandbox', 'BTC-USD', '5m'
+        )
+
+    np.testing.assert_equal(store.candles.get_candles('Sandbox', 'BTC-USD', '1m'), candles_to_add[-10:])
+
+    five_minutes_candles = store.candles.get_candles('Sandbox', 'BTC-USD', '5m')
+    assert len(five_minutes_candles) == 3
+    assert five_minutes_candles[0][0] == candles_to_add[10][0]
+    # the forming candle is still estimated correctly after dropping candles
+    np.testing.assert_equal(five_minutes_candles[-1],
+                            generate_candle_from_one_minutes('5m', candles_to_add[20:23], True))
+
+
 def test_get_forming_candle():
     set_up()
 
@@ -1,5 +1,7 @@
+import numpy as np
+
 from jesse.config import config, reset_config
-from jesse.enums import exchanges
+from jesse.enums import exchanges, order_statuses
 from jesse.factories import fake_order
 from jesse.store import store
 
@@ -67,3 +69,45 @@ def test_state_order_get_orders():
     assert store.orders.get_orders(exchanges.SANDBOX,'ETH-USD') == [o1, o2]
 
 
+
+
+def test_get_touched_orders():
+    set_up()
+
+    orders = [fake_order({'exchange': exchanges.SANDBOX, 'symbol': 'ETH-USD', 'price': price})
+              for price in [90, 120, 95, 105, 110, 130]]
+    for o in orders:
+        store.orders.add_order(o)
+
+    # bullish: open(100) => low(92) => high(112) => close(108)
+    assert store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD',
+                                           np.array([0, 100, 108, 112, 92, 1])) == [orders[2], orders[3], orders[4]]
+    # bearish: open(100) => high(112) => low(92) => close(96)
+    assert store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD',
+                                           np.array([0, 100, 96, 112, 92, 1])) == [orders[3], orders[4], orders[2]]
+    # nothing within the range
+    assert store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD', np.array([0, 100, 101, 102, 99, 1])) == []
+
+    # inactive orders are never touched
+    orders[3].status = order_statuses.EXECUTED
+    assert store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD',
+                                           np.array([0, 100, 108, 112, 92, 1])) == [orders[2], orders[4]]
+    store.orders.clear_orders(exchanges.SANDBOX, 'ETH-USD')
+    assert store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD', np.array([0, 100, 108, 112, 92, 1])) == []
+
+
+def test_get_touched_orders_after_clearing_and_resubmitting_the_orders():
+    set_up()
+
+    for price in [90, 95]:
+        store.orders.add_order(fake_order({'exchange': exchanges.SANDBOX, 'symbol': 'ETH-USD', 'price': price}))
+    candle = np.array([0, 100, 108, 112, 92, 1])
+    assert len(store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD', candle)) == 1
+
+    # the same number of orders, at new prices
+    store.orders.clear_orders(exchanges.SANDBOX, 'ETH-USD')
+    new_orders = [fake_order({'exchange': exchanges.SANDBOX, 'symbol': 'ETH-USD', 'price': price})
+                  for price in [105, 110]]
+    for o in new_orders:
+        store.orders.add_order(o)
+    assert store.orders.get_touched_orders(exchanges.SANDBOX, 'ETH-USD', candle) == new_orders
@@ -0,0 +1,96 @@
+import numpy as np
+
+import jesse.helpers as jh
+import jesse.indicators as ta
+from jesse.config import reset_config
+from jesse.enums import exchanges, timeframes
+from jesse.factories import fake_range_candle_from_range_prices
+from jesse.indicators import streaming
+from jesse.modes import backtest_mode
+from jesse.routes import router
+from jesse.store import store
+from .data.test_candles_indicators import test_candles_19
+
+
+def stream_sequential(indicator: streaming.StreamingIndicator, candles: np.ndarray) -> list:
+    return [indicator.update(candle) for candle in candles]
+
+
+def assert_matches(indicator: streaming.StreamingIndicator, batch: np.ndarray, candles: np.ndarray) -> None:
+    np.testing.assert_allclose(stream_sequential(indicator, candles), batch, rtol=1e-9)
+
+
+def test_streaming_indicators_match_the_batch_ones():
+    candles = np.array(test_candles_19)
+
+    assert_matches(streaming.SMA(20), ta.sma(candles, 20, sequential=True), candles)
+    assert_matches(streaming.EMA(8), ta.ema(candles, 8, sequential=True), candles)
+    assert_matches(streaming.EMA(21, 'hl2'), ta.ema(candles, 21, 'hl2', sequential=True), candles)
+    assert_matches(streaming.SMMA(7), ta.smma(candles, 7, sequential=True), candles)
+    assert_matches(streaming.RSI(14), ta.rsi(candles, 14, sequential=True), candles)
+    assert_matches(streaming.ATR(14), ta.atr(candles, 14, sequential=True), candles)
+    assert_matches(streaming.ATR(1), ta.atr(candles, 1, sequential=True), candles)
+    assert_matches(streaming.SuperSmoother(14), ta.supersmoother(candles, 14, sequential=True), candles)
+
+    for fast, slow, signal in [(12, 26, 9), (5, 5, 3), (26, 12, 9)]:
+        values = stream_sequential(streaming.MACD(fast, slow, signal), candles)
+        batch = ta.macd(candles, fast, slow, signal, sequential=True)
+        for i in range(3):
+            np.testing.assert_allclose([v[i] for v in values], batch[i], rtol=1e-9)
+
+    # the batch rma starts from a different seed, which fades out
+    candles = fake_range_candle_from_range_prices(100 + np.sin(np.arange(1000) / 10) * 20)
+    np.testing.assert_allclose(
+        stream_sequential(streaming.RMA(14), candles)[-100:], ta.rma(candles, 14, sequential=True)[-100:], rtol=1e-9
+    )
+
+
+def test_peek_does_not_change_the_state():
+    candles = np.array(test_candles_19)
+    ema = streaming.EMA(8)
+    ema.warm_up(candles[:-1])
+    value = ema.value
+
+    assert ema.peek(candles[-1]) == ta.ema(candles, 8)
+    assert ema.peek(candles[-1]) == ta.ema(candles, 8)
+    assert ema.value == value
+    assert ema.update(candles[-1]) == ta.ema(candles, 8)
+
+    ema.reset()
+    assert np.isnan(ema.value)
+    assert ema.warm_up(candles) == ta.ema(candles, 8)
+
+
+def test_stream_commits_only_new_candles():
+    candles = fake_range_candle_from_range_prices(range(1, 60))
+    stream = streaming.Stream(streaming.SMA(5), timeframes.MINUTE_1)
+
+    assert stream.read(candles[:10]) == ta.sma(candles[:10], 5)
+    assert stream.indicator.count == 9
+    # the latest candle is read again, for instance because it was forming
+    assert stream.read(candles[:10]) == ta.sma(candles[:10], 5)
+    assert stream.indicator.count == 9
+    assert stream.read(candles[:13]) == ta.sma(candles[:13], 5)
+    assert stream.indicator.count == 12
+
+    # starts over if the candles go back in time
+    assert stream.read(candles[:7]) == ta.sma(candles[:7], 5)
+    assert stream.indicator.count == 6
+
+
+def test_strategy_stream():
+    reset_config()
+    router.set_routes([(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_5, 'Test49')])
+    router.set_extra_candles([(exchanges.SANDBOX, 'BTC-USDT', timeframes.MINUTE_15)])
+    store.reset(True)
+
+    candles = {
+        jh.key(exchanges.SANDBOX, 'BTC-USDT'): {
+            'exchange': exchanges.SANDBOX,
+            'symbol': 'BTC-USDT',
+            'candles': fake_range_candle_from_range_prices(np.linspace(100, 150, 1200) + np.sin(np.arange(1200)) * 5)
+        }
+    }
+    backtest_mode.run('2019-04-01', '2019-04-02', candles)
+
+    assert router.routes[0].strategy.vars['checked'] == 240